@@ -0,0 +1,427 @@
+"""
+Spotify Web API Client Benchmarks
+=================================
+
+Measures throughput and p50/p99 latency of SpotifyAPI's hot paths against
+the local mock server (spotify_mock_server.py), so no quota is used and
+runs are repeatable:
+
+- single_get_track: sequential get_track calls
+- fanout_1k_tracks: get_tracks over 1,000 IDs
+- playlist_10k_sequential / playlist_10k_parallel: full pagination of a
+  10,000-item playlist
+- search_burst: concurrent search calls with distinct queries
+- cache_cold / cache_warm: the same fan-out with an empty and a filled
+  ResponseCache
+- json_decode: decoding large payloads, without any network, with the
+  stdlib and each installed fast decoder (json_decode_orjson, ...)
+
+The mock runs in separate processes so it doesn't compete with the client
+for the GIL. Results are written as JSON; pass ``--compare`` with an earlier
+results file to print the change per benchmark.
+
+Example Usage:
+    python spotify_benchmarks.py
+    python spotify_benchmarks.py --latency 0.02 --workers 32 --output bench.json
+    python spotify_benchmarks.py --only fanout_1k_tracks,cache_warm --compare bench.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from spotify_mock_server import MockCatalog, MockConfig, MockSpotifyServer, make_id
+from spotify_web_api_skill import (
+    JSON_DECODERS,
+    RequestEvent,
+    ResponseCache,
+    SpotifyAPI,
+    TransportConfig,
+    get_json_decoder,
+)
+
+
+BIG_PLAYLIST_ID = "benchmark10kPlaylist00"
+
+
+@dataclass
+class BenchmarkResult:
+    """One benchmark's numbers; latencies are per request, in milliseconds."""
+    name: str
+    requests: int
+    seconds: float
+    throughput: float
+    p50_ms: float
+    p99_ms: float
+    max_ms: float
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of ``values`` (0 <= q <= 100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(q / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+class LatencyRecorder:
+    """Request hook collecting per-request latencies."""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.retries = 0
+        self.cache_hits = 0
+
+    def __call__(self, event: RequestEvent) -> None:
+        # list.append is atomic, so worker threads can share the recorder
+        self.latencies.append(event.latency)
+        self.retries += event.retries
+        if event.cache == "hit":
+            self.cache_hits += 1
+
+    def reset(self) -> None:
+        self.latencies = []
+        self.retries = 0
+        self.cache_hits = 0
+
+
+class MockProcess:
+    """
+    The mock server running in child processes.
+    
+    One Python process serves roughly a thousand requests per second, which
+    would cap the fan-out benchmarks. Several processes (forked after the
+    listening socket is bound) share the accept queue instead. Each process
+    holds its own playlist/library state, which the read-only benchmarks
+    don't mind.
+    
+    Forking is only used where it is the platform's default start method.
+    Elsewhere (Windows, macOS) the bound socket can't be handed to children,
+    so the server runs in a thread of this process instead.
+    """
+
+    def __init__(self, config: MockConfig, processes: int = 4):
+        server = MockSpotifyServer(config)
+        self.base_url = server.base_url
+        self.auth_url = server.auth_url
+        self.server: Optional[MockSpotifyServer] = None
+        self.processes: List[multiprocessing.Process] = []
+        if processes <= 1 or multiprocessing.get_all_start_methods()[0] != "fork":
+            self.server = server.start()
+            return
+
+        ctx = multiprocessing.get_context("fork")
+        self.processes = [
+            ctx.Process(target=server.serve_forever, daemon=True) for _ in range(processes)
+        ]
+        for process in self.processes:
+            process.start()
+        # The children keep the listening socket open
+        server.server_close()
+
+    def client(self, **kwargs) -> SpotifyAPI:
+        bound = type("BenchmarkSpotifyAPI", (SpotifyAPI,),
+                     {"BASE_URL": self.base_url, "AUTH_URL": self.auth_url})
+        kwargs.setdefault("access_token", "mock-token")
+        return bound(**kwargs)
+
+    def stop(self) -> None:
+        if self.server is not None:
+            self.server.stop()
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            process.join()
+
+
+class BenchmarkSuite:
+    """
+    The benchmarks, sharing one mock server process.
+
+    Args:
+        mock: Running MockProcess
+        workers: max_workers for the clients under test
+        transport: TransportConfig for the clients under test
+        repeat: How many times each network benchmark runs (results are pooled)
+    """
+
+    def __init__(
+        self,
+        mock: MockProcess,
+        workers: int = 32,
+        transport: Optional[TransportConfig] = None,
+        repeat: int = 3
+    ):
+        self.mock = mock
+        self.workers = workers
+        self.transport = transport
+        self.repeat = repeat
+
+    def _client(self, recorder: LatencyRecorder, **kwargs) -> SpotifyAPI:
+        kwargs.setdefault("max_workers", self.workers)
+        return self.mock.client(transport=self.transport, hooks=[recorder], **kwargs)
+
+    def _measure(
+        self,
+        name: str,
+        run: Callable[[SpotifyAPI], Any],
+        recorder: Optional[LatencyRecorder] = None,
+        client: Optional[SpotifyAPI] = None,
+        warmup: bool = True,
+        **extra: Any
+    ) -> BenchmarkResult:
+        """Time ``run(client)`` ``repeat`` times and pool the request latencies."""
+        recorder = recorder or LatencyRecorder()
+        client = client or self._client(recorder)
+        if warmup:
+            # Open pooled connections before timing
+            run(client)
+        recorder.reset()
+
+        start = time.perf_counter()
+        for _ in range(self.repeat):
+            run(client)
+        seconds = time.perf_counter() - start
+        client.close()
+
+        latencies_ms = [latency * 1000 for latency in recorder.latencies]
+        requests_made = len(latencies_ms)
+        extra.setdefault("retries", recorder.retries)
+        if recorder.cache_hits:
+            extra["cache_hits"] = recorder.cache_hits
+        return BenchmarkResult(
+            name=name,
+            requests=requests_made,
+            seconds=round(seconds, 4),
+            throughput=round(requests_made / seconds, 1) if seconds else 0.0,
+            p50_ms=round(percentile(latencies_ms, 50), 3),
+            p99_ms=round(percentile(latencies_ms, 99), 3),
+            max_ms=round(max(latencies_ms, default=0.0), 3),
+            extra=extra,
+        )
+
+    def single_get_track(self, count: int = 200) -> BenchmarkResult:
+        ids = [make_id("bench-single", i) for i in range(count)]
+
+        def run(client: SpotifyAPI) -> None:
+            for track_id in ids:
+                client.get_track(track_id)
+
+        return self._measure("single_get_track", run)
+
+    def fanout_1k_tracks(self) -> BenchmarkResult:
+        ids = [make_id("bench-fanout", i) for i in range(1000)]
+        return self._measure("fanout_1k_tracks", lambda client: client.get_tracks(ids),
+                             workers=self.workers)
+
+    def playlist_10k(self, parallel: bool) -> BenchmarkResult:
+        name = "playlist_10k_parallel" if parallel else "playlist_10k_sequential"
+
+        def run(client: SpotifyAPI) -> None:
+            count = sum(1 for _ in client.iter_playlist_items(BIG_PLAYLIST_ID, parallel=parallel))
+            assert count == 10_000, count
+
+        return self._measure(name, run, items=10_000)
+
+    def search_burst(self, count: int = 200) -> BenchmarkResult:
+        queries = [f"benchmark query {i}" for i in range(count)]
+
+        def run(client: SpotifyAPI) -> None:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                list(executor.map(lambda q: client.search(q, ["track"], limit=20), queries))
+
+        return self._measure("search_burst", run, queries=count)
+
+    def cache(self) -> List[BenchmarkResult]:
+        """The same fan-out against an empty cache and then a filled one."""
+        ids = [make_id("bench-cache", i) for i in range(500)]
+        results = []
+        for name, warm in (("cache_cold", False), ("cache_warm", True)):
+            recorder = LatencyRecorder()
+
+            def run(client: SpotifyAPI) -> None:
+                if not warm:
+                    client.cache.clear()
+                client.get_tracks(ids)
+
+            client = self._client(recorder, cache=ResponseCache())
+            if warm:
+                client.get_tracks(ids)
+            results.append(self._measure(name, run, recorder, client, warmup=False))
+        return results
+
+    @staticmethod
+    def json_decode(items: int = 10_000, repeat: int = 5) -> List[BenchmarkResult]:
+        """
+        Decode cost of big pages, measured without the network, for every
+        installed decoder ("json_decode" is the stdlib baseline).
+        """
+        catalog = MockCatalog(MockConfig())
+        base_url = "http://127.0.0.1/v1"
+        uris = [f"spotify:track:{make_id('bench-json', i)}" for i in range(items)]
+        payloads = [
+            json.dumps(catalog.paging(
+                f"/v1/playlists/{BIG_PLAYLIST_ID}/items", uris,
+                lambda uri: catalog.playlist_item(uri, base_url), offset, 100, base_url
+            )).encode()
+            for offset in range(0, items, 100)
+        ]
+        total_bytes = sum(map(len, payloads))
+
+        results = []
+        for decoder_name in reversed(JSON_DECODERS):
+            try:
+                decode = get_json_decoder(decoder_name)
+            except ImportError:
+                continue
+
+            timings = []
+            start = time.perf_counter()
+            for _ in range(repeat):
+                for payload in payloads:
+                    t = time.perf_counter()
+                    decode(payload)
+                    timings.append((time.perf_counter() - t) * 1000)
+            seconds = time.perf_counter() - start
+
+            results.append(BenchmarkResult(
+                name="json_decode" if decoder_name == "json" else f"json_decode_{decoder_name}",
+                requests=len(timings),
+                seconds=round(seconds, 4),
+                throughput=round(len(timings) / seconds, 1),
+                p50_ms=round(percentile(timings, 50), 3),
+                p99_ms=round(percentile(timings, 99), 3),
+                max_ms=round(max(timings), 3),
+                extra={
+                    "page_bytes": total_bytes // len(payloads),
+                    "mb_per_second": round(total_bytes * repeat / seconds / 1e6, 1),
+                },
+            ))
+        return results
+
+    def run(self, only: Optional[List[str]] = None) -> List[BenchmarkResult]:
+        benchmarks: Dict[str, Callable[[], Any]] = {
+            "single_get_track": self.single_get_track,
+            "fanout_1k_tracks": self.fanout_1k_tracks,
+            "playlist_10k_sequential": lambda: self.playlist_10k(parallel=False),
+            "playlist_10k_parallel": lambda: self.playlist_10k(parallel=True),
+            "search_burst": self.search_burst,
+            "cache": self.cache,
+            "json_decode": self.json_decode,
+        }
+        results: List[BenchmarkResult] = []
+        for name, bench in benchmarks.items():
+            wanted = only is None or name in only or (
+                name == "cache" and {"cache_cold", "cache_warm"} & set(only)
+            ) or (
+                name == "json_decode" and any(n.startswith("json_decode") for n in only)
+            )
+            if not wanted:
+                continue
+            outcome = bench()
+            for result in outcome if isinstance(outcome, list) else [outcome]:
+                results.append(result)
+                print(format_result(result), flush=True)
+        return results
+
+
+def format_result(result: BenchmarkResult) -> str:
+    return (
+        f"{result.name:<26} {result.requests:>7} req {result.seconds:>9.3f}s "
+        f"{result.throughput:>10.1f}/s  p50 {result.p50_ms:>8.3f}ms  p99 {result.p99_ms:>8.3f}ms"
+    )
+
+
+def compare(results: List[BenchmarkResult], baseline_path: str) -> None:
+    """Print throughput and p99 changes relative to an earlier results file."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {r["name"]: r for r in json.load(f)["results"]}
+
+    print(f"\nCompared with {baseline_path}:")
+    for result in results:
+        old = baseline.get(result.name)
+        if not old:
+            continue
+        throughput = (result.throughput / old["throughput"] - 1) * 100 if old["throughput"] else 0.0
+        p99 = (result.p99_ms / old["p99_ms"] - 1) * 100 if old["p99_ms"] else 0.0
+        print(f"{result.name:<26} throughput {throughput:+7.1f}%   p99 {p99:+7.1f}%")
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark SpotifyAPI against the local mock server")
+    parser.add_argument("--latency", type=float, default=0.01, help="mock server latency in seconds")
+    parser.add_argument("--latency-jitter", type=float, default=0.005)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--workers", type=int, default=32, help="client max_workers")
+    parser.add_argument("--server-processes", type=int, default=max(1, min(4, (os.cpu_count() or 2) // 2)),
+                        help="mock server processes (default: half the CPUs, up to 4)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark")
+    parser.add_argument("--no-compression", action="store_true", help="disable gzip in the client transport")
+    parser.add_argument("--only", help="comma-separated benchmark names")
+    parser.add_argument("--output", default="bench_results.json", help="JSON results file")
+    parser.add_argument("--compare", metavar="FILE", help="earlier results file to diff against")
+    args = parser.parse_args()
+
+    config = MockConfig(
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=0.1,
+        error_rate=args.error_rate,
+        playlist_sizes={BIG_PLAYLIST_ID: 10_000},
+    )
+    transport = TransportConfig(compression=not args.no_compression)
+    only = args.only.split(",") if args.only else None
+
+    mock = MockProcess(config, args.server_processes)
+    try:
+        suite = BenchmarkSuite(mock, workers=args.workers, transport=transport, repeat=args.repeat)
+        results = suite.run(only)
+    finally:
+        mock.stop()
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "git_revision": _git_revision(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "workers": args.workers,
+            "server_processes": args.server_processes,
+            "repeat": args.repeat,
+            "transport": asdict(transport),
+            "mock": {k: v for k, v in asdict(config).items() if k != "playlist_sizes"},
+        },
+        "results": [asdict(result) for result in results],
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,620 @@
+"""
+Spotify Library Export
+======================
+
+Streams a user's library to NDJSON, CSV or Parquet with bounded memory and
+resumable checkpoints, on top of SpotifyAPI's paging endpoints.
+
+Sources:
+- saved_tracks: GET /me/tracks
+- saved_albums: GET /me/albums
+- playlists: the current user's playlists (GET /me/playlists)
+- followed_artists: GET /me/following (cursor-based)
+- playlist:<id>: the items of one playlist
+
+Pages are written as they arrive, so only a few pages (or one Parquet row
+group) are held in memory. After every flushed page the position in the
+source and the size of the output are saved to a checkpoint file next to
+the output. An interrupted export started again with the same arguments
+truncates the output to the last checkpoint and continues from there. The
+checkpoint is removed once the export completes.
+
+Formats:
+- ndjson: one full Web API object per line
+- csv: one flat row per item (multi-valued fields joined with "; ")
+- parquet: a directory of part files holding the same flat rows; one part
+  per ``row_group_size`` rows (requires pyarrow)
+
+Example Usage:
+    from spotify_web_api_skill import SpotifyAPI
+    from spotify_export import export_library
+
+    spotify = SpotifyAPI(access_token="...")
+    result = export_library(spotify, "saved_tracks", "saved_tracks.ndjson")
+    print(result.records)
+
+    python spotify_export.py saved_tracks saved_tracks.csv
+    python spotify_export.py playlist:3cEYpjA9oz9GiPac4AsH4n items.parquet --format parquet
+"""
+
+import argparse
+import csv
+import json
+import os
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from spotify_web_api_skill import FileTokenStore, SpotifyAPI, get_cached_access_token
+
+try:
+    import pyarrow
+    import pyarrow.parquet as parquet
+except ImportError:  # Parquet export is optional
+    pyarrow = None
+    parquet = None
+
+
+FORMATS = ("ndjson", "csv", "parquet")
+LIST_SEPARATOR = "; "
+
+
+# ==================== RECORDS ====================
+
+def _join(values: List[Any]) -> str:
+    return LIST_SEPARATOR.join(str(v) for v in values if v is not None)
+
+
+def _artists(obj: Dict[str, Any]) -> Dict[str, str]:
+    artists = obj.get("artists") or []
+    return {
+        "artist_ids": _join([a.get("id") for a in artists]),
+        "artist_names": _join([a.get("name") for a in artists]),
+    }
+
+
+def _track_row(item: Dict[str, Any]) -> Dict[str, Any]:
+    track = item.get("track") or item.get("item") or {}
+    album = track.get("album") or {}
+    added_by = item.get("added_by")
+    return {
+        "added_at": item.get("added_at"),
+        "added_by": added_by.get("id") if isinstance(added_by, dict) else None,
+        "track_id": track.get("id"),
+        "track_name": track.get("name"),
+        "track_uri": track.get("uri"),
+        **_artists(track),
+        "album_id": album.get("id"),
+        "album_name": album.get("name"),
+        "release_date": album.get("release_date"),
+        "duration_ms": track.get("duration_ms"),
+        "explicit": track.get("explicit"),
+        "popularity": track.get("popularity"),
+        "isrc": (track.get("external_ids") or {}).get("isrc"),
+        "is_local": item.get("is_local", track.get("is_local")),
+    }
+
+
+def _album_row(item: Dict[str, Any]) -> Dict[str, Any]:
+    album = item.get("album") or {}
+    return {
+        "added_at": item.get("added_at"),
+        "album_id": album.get("id"),
+        "album_name": album.get("name"),
+        "album_uri": album.get("uri"),
+        "album_type": album.get("album_type"),
+        **_artists(album),
+        "release_date": album.get("release_date"),
+        "total_tracks": album.get("total_tracks"),
+        "label": album.get("label"),
+        "popularity": album.get("popularity"),
+        "upc": (album.get("external_ids") or {}).get("upc"),
+    }
+
+
+def _playlist_row(playlist: Dict[str, Any]) -> Dict[str, Any]:
+    owner = playlist.get("owner") or {}
+    items = playlist.get("items") or playlist.get("tracks") or {}
+    return {
+        "playlist_id": playlist.get("id"),
+        "playlist_name": playlist.get("name"),
+        "playlist_uri": playlist.get("uri"),
+        "owner_id": owner.get("id"),
+        "owner_name": owner.get("display_name"),
+        "public": playlist.get("public"),
+        "collaborative": playlist.get("collaborative"),
+        "items_total": items.get("total"),
+        "snapshot_id": playlist.get("snapshot_id"),
+        "description": playlist.get("description"),
+    }
+
+
+def _artist_row(artist: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "artist_id": artist.get("id"),
+        "artist_name": artist.get("name"),
+        "artist_uri": artist.get("uri"),
+        "genres": _join(artist.get("genres") or []),
+        "popularity": artist.get("popularity"),
+        "followers": (artist.get("followers") or {}).get("total"),
+    }
+
+
+@dataclass(frozen=True)
+class ExportSource:
+    """
+    A paged collection that can be exported.
+
+    ``columns`` maps each flat column to its Parquet type ("string",
+    "int64" or "bool"); ``to_row`` flattens one Web API item into them.
+    """
+    name: str
+    columns: Tuple[Tuple[str, str], ...]
+    to_row: Callable[[Dict[str, Any]], Dict[str, Any]]
+    cursor_based: bool = False
+
+    @property
+    def column_names(self) -> List[str]:
+        return [name for name, _ in self.columns]
+
+
+TRACK_COLUMNS = (
+    ("added_at", "string"), ("added_by", "string"), ("track_id", "string"),
+    ("track_name", "string"), ("track_uri", "string"), ("artist_ids", "string"),
+    ("artist_names", "string"), ("album_id", "string"), ("album_name", "string"),
+    ("release_date", "string"), ("duration_ms", "int64"), ("explicit", "bool"),
+    ("popularity", "int64"), ("isrc", "string"), ("is_local", "bool"),
+)
+
+SOURCES: Dict[str, ExportSource] = {
+    "saved_tracks": ExportSource("saved_tracks", TRACK_COLUMNS, _track_row),
+    "saved_albums": ExportSource(
+        "saved_albums",
+        (
+            ("added_at", "string"), ("album_id", "string"), ("album_name", "string"),
+            ("album_uri", "string"), ("album_type", "string"), ("artist_ids", "string"),
+            ("artist_names", "string"), ("release_date", "string"), ("total_tracks", "int64"),
+            ("label", "string"), ("popularity", "int64"), ("upc", "string"),
+        ),
+        _album_row
+    ),
+    "playlists": ExportSource(
+        "playlists",
+        (
+            ("playlist_id", "string"), ("playlist_name", "string"), ("playlist_uri", "string"),
+            ("owner_id", "string"), ("owner_name", "string"), ("public", "bool"),
+            ("collaborative", "bool"), ("items_total", "int64"), ("snapshot_id", "string"),
+            ("description", "string"),
+        ),
+        _playlist_row
+    ),
+    "followed_artists": ExportSource(
+        "followed_artists",
+        (
+            ("artist_id", "string"), ("artist_name", "string"), ("artist_uri", "string"),
+            ("genres", "string"), ("popularity", "int64"), ("followers", "int64"),
+        ),
+        _artist_row,
+        cursor_based=True
+    ),
+    "playlist": ExportSource("playlist", TRACK_COLUMNS, _track_row),
+}
+
+
+def get_source(name: str) -> ExportSource:
+    """Look up a source by name ("playlist:<id>" resolves to the playlist source)."""
+    key = name.split(":", 1)[0]
+    if key not in SOURCES or (key == "playlist") != (":" in name):
+        raise ValueError(f"Unknown export source {name!r}; use one of {', '.join(SOURCES)} (playlist:<id>)")
+    return SOURCES[key]
+
+
+# ==================== WRITERS ====================
+
+class ExportWriter(ABC):
+    """
+    Appends records to an export and reports how far it has durably written.
+
+    ``state()`` returns a JSON-serializable position (after flushing) that
+    ``open(state)`` can later truncate back to when resuming.
+    """
+
+    flat = True
+
+    @property
+    def needs_flush(self) -> bool:
+        """Whether to checkpoint after the current page (buffering writers wait)."""
+        return True
+
+    @abstractmethod
+    def open(self, state: Optional[Any] = None) -> None:
+        ...
+
+    @abstractmethod
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        ...
+
+    @abstractmethod
+    def state(self) -> Any:
+        ...
+
+    @abstractmethod
+    def close(self) -> None:
+        ...
+
+
+class _FileWriter(ExportWriter):
+    """Text file writer resumed by truncating to the checkpointed byte size."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = None
+
+    def open(self, state: Optional[int] = None) -> None:
+        if state is None:
+            self.file = open(self.path, "w", encoding="utf-8", newline="")
+            self._start()
+        else:
+            self.file = open(self.path, "r+", encoding="utf-8", newline="")
+            # Drop whatever was written after the last checkpoint
+            self.file.truncate(state)
+            self.file.seek(state)
+
+    def _start(self) -> None:
+        pass
+
+    def state(self) -> int:
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return self.file.tell()
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class NDJSONWriter(_FileWriter):
+    """One full Web API object per line."""
+
+    flat = False
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        self.file.writelines(
+            json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+            for record in records
+        )
+
+
+class CSVWriter(_FileWriter):
+    """Flat rows with a header line."""
+
+    def __init__(self, path: str, columns: List[str]):
+        super().__init__(path)
+        self.columns = columns
+        self.writer = None
+
+    def open(self, state: Optional[int] = None) -> None:
+        super().open(state)
+        self.writer = csv.DictWriter(self.file, fieldnames=self.columns, extrasaction="ignore")
+        if state is None:
+            self.writer.writeheader()
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        self.writer.writerows(records)
+
+
+class ParquetWriter(ExportWriter):
+    """
+    A directory of Parquet part files, one per ``row_group_size`` rows.
+
+    Parquet files can't be appended to, so each flush writes a new part and
+    resuming deletes parts written after the last checkpoint.
+    """
+
+    def __init__(self, path: str, columns: Tuple[Tuple[str, str], ...], row_group_size: int = 10_000):
+        if pyarrow is None:
+            raise ImportError("Parquet export requires pyarrow (pip install pyarrow)")
+        self.path = path
+        self.row_group_size = row_group_size
+        types = {"string": pyarrow.string(), "int64": pyarrow.int64(), "bool": pyarrow.bool_()}
+        self.schema = pyarrow.schema([(name, types[kind]) for name, kind in columns])
+        self.rows: List[Dict[str, Any]] = []
+        self.parts = 0
+
+    def _part_path(self, index: int) -> str:
+        return os.path.join(self.path, f"part-{index:05d}.parquet")
+
+    def open(self, state: Optional[int] = None) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        self.parts = state or 0
+        for name in os.listdir(self.path):
+            if name.startswith("part-") and name.endswith(".parquet"):
+                if int(name[5:10]) >= self.parts:
+                    os.remove(os.path.join(self.path, name))
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        self.rows.extend(records)
+
+    @property
+    def needs_flush(self) -> bool:
+        return len(self.rows) >= self.row_group_size
+
+    def state(self) -> int:
+        if self.rows:
+            table = pyarrow.Table.from_pylist(self.rows, schema=self.schema)
+            tmp_path = self._part_path(self.parts) + ".tmp"
+            parquet.write_table(table, tmp_path)
+            os.replace(tmp_path, self._part_path(self.parts))
+            self.parts += 1
+            self.rows = []
+        return self.parts
+
+    def close(self) -> None:
+        self.rows = []
+
+
+def make_writer(
+    fmt: str,
+    path: str,
+    source: ExportSource,
+    row_group_size: int = 10_000
+) -> ExportWriter:
+    """Create the writer for an output format."""
+    if fmt == "ndjson":
+        return NDJSONWriter(path)
+    if fmt == "csv":
+        return CSVWriter(path, source.column_names)
+    if fmt == "parquet":
+        return ParquetWriter(path, source.columns, row_group_size)
+    raise ValueError(f"Unknown export format {fmt!r}; use one of {', '.join(FORMATS)}")
+
+
+def guess_format(path: str) -> str:
+    """Output format implied by a path's extension (default: ndjson)."""
+    extension = os.path.splitext(path.rstrip("/"))[1].lower()
+    return {".csv": "csv", ".parquet": "parquet", ".pq": "parquet"}.get(extension, "ndjson")
+
+
+# ==================== CHECKPOINTS ====================
+
+class ExportCheckpoint:
+    """
+    Progress of one export, stored as JSON and replaced atomically.
+
+    Holds the source, format, position in the source (offset or cursor),
+    records written, the writer's state and, for playlists, the
+    snapshot_id the export started from.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save(self, state: Dict[str, Any]) -> None:
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+@dataclass
+class ExportResult:
+    """Outcome of export_library."""
+    source: str
+    path: str
+    format: str
+    records: int
+    resumed: bool = False
+    restarted: bool = False
+
+
+# ==================== EXPORT ====================
+
+class LibraryExporter:
+    """
+    Streams one source to one output file with checkpoints.
+
+    Args:
+        api: SpotifyAPI client (user token required except for public playlists)
+        source: "saved_tracks", "saved_albums", "playlists",
+                "followed_artists" or "playlist:<id>"
+        path: Output file (a directory for Parquet)
+        fmt: "ndjson", "csv" or "parquet" (default: from the extension)
+        checkpoint_path: Where progress is saved (default: ``<path>.checkpoint.json``)
+        prefetch: Pages fetched ahead of the writer (offset-based sources)
+        row_group_size: Rows per Parquet part file
+    """
+
+    def __init__(
+        self,
+        api: SpotifyAPI,
+        source: str,
+        path: str,
+        fmt: Optional[str] = None,
+        checkpoint_path: Optional[str] = None,
+        prefetch: int = 4,
+        row_group_size: int = 10_000
+    ):
+        self.api = api
+        self.source_name = source
+        self.source = get_source(source)
+        self.path = path
+        self.format = fmt or guess_format(path)
+        self.checkpoint = ExportCheckpoint(checkpoint_path or f"{path.rstrip('/')}.checkpoint.json")
+        self.prefetch = max(1, prefetch)
+        self.writer = make_writer(self.format, path, self.source, row_group_size)
+
+    def _fetch(self, position: Union[int, str, None]) -> Dict[str, Any]:
+        """Fetch the page starting at an offset (or after a cursor)."""
+        api = self.api
+        name = self.source.name
+        if name == "saved_tracks":
+            return api.get_user_saved_tracks(limit=api.MAX_PAGE_SIZE, offset=position)
+        if name == "saved_albums":
+            return api.get_user_saved_albums(limit=api.MAX_PAGE_SIZE, offset=position)
+        if name == "playlists":
+            return api.get_current_user_playlists(limit=api.MAX_PAGE_SIZE, offset=position)
+        if name == "followed_artists":
+            return api.get_followed_artists(after=position, limit=api.MAX_PAGE_SIZE)
+        return api.get_playlist_items(
+            self.source_name.split(":", 1)[1],
+            limit=api.MAX_PLAYLIST_PAGE_SIZE,
+            offset=position
+        )
+
+    def _pages(self, start: Union[int, str, None]) -> Iterator[Tuple[Union[int, str, None], List[Dict[str, Any]]]]:
+        """
+        Yield (position after the page, items) in order, resuming at ``start``.
+
+        Offset-based sources keep up to ``prefetch`` pages in flight once
+        the first page has revealed ``total``; cursor-based ones follow
+        ``after`` one page at a time.
+        """
+        cursor_based = self.source.cursor_based
+        if start is None and not cursor_based:
+            start = 0
+        for position, page in self.api.iter_pages(
+            self._fetch,
+            start=start,
+            container="artists" if self.source.name == "followed_artists" else None,
+            parallel=not cursor_based,
+            max_workers=self.prefetch
+        ):
+            yield position, page.get("items") or []
+
+    def _snapshot_id(self) -> Optional[str]:
+        if self.source.name != "playlist":
+            return None
+        playlist_id = self.source_name.split(":", 1)[1]
+        with self.api.untyped():
+            return self.api.get_playlist(playlist_id, fields="snapshot_id").get("snapshot_id")
+
+    def run(self) -> ExportResult:
+        """Run (or resume) the export and return what was written."""
+        result = ExportResult(self.source_name, self.path, self.format, 0)
+        snapshot_id = self._snapshot_id()
+        state = self.checkpoint.load()
+        if state is not None:
+            if state.get("source") != self.source_name or state.get("format") != self.format:
+                raise ValueError(
+                    f"Checkpoint {self.checkpoint.path} belongs to a {state.get('format')} "
+                    f"export of {state.get('source')}; remove it to start over"
+                )
+            if state.get("snapshot_id") != snapshot_id:
+                # The playlist changed since the export began; offsets no longer line up
+                state = None
+                result.restarted = True
+            else:
+                result.resumed = True
+
+        position = state["position"] if state else None
+        result.records = state["records"] if state else 0
+        self.writer.open(state["writer"] if state else None)
+        try:
+            # Exports need the raw dicts even when the client returns typed models
+            with self.api.untyped():
+                for position, items in self._pages(position):
+                    records = [self.source.to_row(item) for item in items] if self.writer.flat else items
+                    self.writer.write(records)
+                    result.records += len(items)
+                    if self.writer.needs_flush:
+                        self.checkpoint.save({
+                            "source": self.source_name,
+                            "format": self.format,
+                            "position": position,
+                            "records": result.records,
+                            "writer": self.writer.state(),
+                            "snapshot_id": snapshot_id,
+                        })
+            self.writer.state()
+        finally:
+            self.writer.close()
+
+        self.checkpoint.clear()
+        return result
+
+
+def export_library(
+    api: SpotifyAPI,
+    source: str,
+    path: str,
+    fmt: Optional[str] = None,
+    **kwargs
+) -> ExportResult:
+    """
+    Export a library source to a file, resuming from its checkpoint if one exists.
+
+    See LibraryExporter for the arguments.
+
+    Example:
+        export_library(spotify, "saved_tracks", "tracks.csv")
+        export_library(spotify, "playlist:3cEYpjA9oz9GiPac4AsH4n", "items.parquet", "parquet")
+    """
+    return LibraryExporter(api, source, path, fmt, **kwargs).run()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export a Spotify library to NDJSON, CSV or Parquet")
+    parser.add_argument("source", help="saved_tracks, saved_albums, playlists, followed_artists or playlist:<id>")
+    parser.add_argument("output", help="output file (a directory for Parquet)")
+    parser.add_argument("--format", choices=FORMATS, help="default: from the output extension")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: <output>.checkpoint.json)")
+    parser.add_argument("--prefetch", type=int, default=4, help="pages fetched ahead of the writer")
+    parser.add_argument("--row-group-size", type=int, default=10_000, help="rows per Parquet part")
+    parser.add_argument(
+        "--scope",
+        default="playlist-read-private playlist-read-collaborative",
+        help="scope of the cached user token to use (default: the one get_spotify_auth_token.py logs in with)"
+    )
+    args = parser.parse_args()
+
+    client_id = os.getenv("SPOTIFY_CLIENT_ID")
+    client_secret = os.getenv("SPOTIFY_CLIENT_SECRET")
+    # Without SPOTIFY_ACCESS_TOKEN, reuse the user token cached by spotify_scripts/get_spotify_auth_token.py
+    access_token = os.getenv("SPOTIFY_ACCESS_TOKEN") or get_cached_access_token(
+        client_id, client_secret, scope=args.scope
+    )
+    if not access_token:
+        raise SystemExit(
+            "No user token: set SPOTIFY_ACCESS_TOKEN, or log in with spotify_scripts/get_spotify_auth_token.py"
+        )
+
+    spotify = SpotifyAPI(
+        client_id=client_id,
+        client_secret=client_secret,
+        access_token=access_token,
+        refresh_token=os.getenv("SPOTIFY_REFRESH_TOKEN"),
+        token_store=FileTokenStore(),
+        scope=args.scope
+    )
+    with spotify:
+        result = export_library(
+            spotify,
+            args.source,
+            args.output,
+            args.format,
+            checkpoint_path=args.checkpoint,
+            prefetch=args.prefetch,
+            row_group_size=args.row_group_size
+        )
+    note = " (resumed)" if result.resumed else " (restarted: playlist changed)" if result.restarted else ""
+    print(f"Exported {result.records} records to {result.path}{note}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,514 @@
+"""
+Spotify Bulk Jobs
+=================
+
+Runs long enrichment jobs (thousands of IDs, URLs or search queries) on top
+of SpotifyAPI with bounded concurrency, and keeps their progress in a local
+SQLite checkpoint store, so a job killed by a transient error or a restart
+resumes exactly where it stopped.
+
+Each work item is recorded with its status:
+- pending: not finished yet (also items that were in flight at a crash)
+- done: the handler's result is stored
+- failed: the handler raised; the item is on the dead-letter list with
+  its error and can be retried later with ``retry_failed()``
+
+Running the same job again over the same input skips every done or failed
+item and processes only the rest. Handlers should be idempotent, since an
+item in flight during a crash runs again.
+
+Example Usage:
+    from spotify_web_api_skill import SpotifyAPI
+    from spotify_jobs import BulkJob, JobStore, lookup
+
+    spotify = SpotifyAPI(client_id="...", client_secret="...")
+    job = BulkJob(spotify, "enrich", lookup, JobStore("jobs.sqlite"), concurrency=8)
+    report = job.run(open("urls.txt").read().split())
+    for key, error in job.dead_letters():
+        print(key, error)
+    job.retry_failed()
+
+    python spotify_jobs.py enrich urls.txt --handler lookup --output results.ndjson
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from spotify_web_api_skill import FileTokenStore, SpotifyAPI, SpotifyError, get_cached_access_token
+
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+
+# ==================== HANDLERS ====================
+
+_REF_PATTERN = re.compile(
+    r"^(?:spotify:(?P<uri_type>[a-z]+):(?P<uri_id>[0-9A-Za-z]+)"
+    r"|https?://open\.spotify\.com/(?:intl-[a-z-]+/)?(?P<url_type>[a-z]+)/(?P<url_id>[0-9A-Za-z]+)"
+    r"(?:[?#].*)?)$"
+)
+
+
+def parse_spotify_ref(value: str, default_type: str = "track") -> Tuple[str, str]:
+    """
+    Split a Spotify URI, open.spotify.com URL or bare ID into (type, id).
+
+    Example:
+        parse_spotify_ref("https://open.spotify.com/album/4aawyAB9vmqN3uQ7FjRGTy?si=x")
+        # ("album", "4aawyAB9vmqN3uQ7FjRGTy")
+    """
+    value = value.strip()
+    match = _REF_PATTERN.match(value)
+    if match:
+        return (
+            match.group("uri_type") or match.group("url_type"),
+            match.group("uri_id") or match.group("url_id"),
+        )
+    if re.fullmatch(r"[0-9A-Za-z]{22}", value):
+        return default_type, value
+    raise ValueError(f"Not a Spotify URI, URL or ID: {value!r}")
+
+
+def lookup(api: SpotifyAPI, item: str) -> Dict[str, Any]:
+    """Fetch the object a URI, URL or bare track ID refers to."""
+    item_type, item_id = parse_spotify_ref(item)
+    fetchers = {
+        "track": api.get_track,
+        "album": api.get_album,
+        "artist": api.get_artist,
+        "playlist": api.get_playlist,
+        "show": api.get_show,
+        "episode": api.get_episode,
+        "audiobook": api.get_audiobook,
+        "chapter": api.get_chapter,
+    }
+    if item_type not in fetchers:
+        raise ValueError(f"Unsupported Spotify object type: {item_type}")
+    return fetchers[item_type](item_id)
+
+
+def search_track(api: SpotifyAPI, query: str) -> Optional[Dict[str, Any]]:
+    """Best track match for a search query (e.g. "artist:radiohead track:creep"), or None."""
+    items = api.search(query, ["track"], limit=1).get("tracks", {}).get("items") or []
+    return items[0] if items else None
+
+
+HANDLERS: Dict[str, Callable[[SpotifyAPI, Any], Any]] = {
+    "lookup": lookup,
+    "search_track": search_track,
+}
+
+
+# ==================== CHECKPOINT STORE ====================
+
+class JobStore:
+    """
+    Progress and results of bulk jobs in a SQLite file.
+
+    One row per (job, item key) holds the item, its status, the number of
+    attempts, the JSON result or the last error. Several jobs can share a
+    file. The database runs in WAL mode like SQLiteCacheBackend, so
+    results can be read while a job is running.
+
+    Args:
+        path: Database file (created if missing)
+        timeout: Seconds to wait for another process's write lock
+    """
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        self.path = os.path.expanduser(path)
+        self.timeout = timeout
+        self._local = threading.local()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS job_items ("
+            " job TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " seq INTEGER NOT NULL,"
+            " item TEXT NOT NULL,"
+            " status TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " result TEXT,"
+            " error TEXT,"
+            " updated_at REAL NOT NULL,"
+            " PRIMARY KEY (job, key))"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS job_items_status ON job_items (job, status, seq)"
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread; sqlite3 connections can't be shared."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def statuses(self, job: str, keys: List[str]) -> Dict[str, str]:
+        """Status of each known key (unknown keys are left out)."""
+        if not keys:
+            return {}
+        placeholders = ",".join("?" * len(keys))
+        rows = self._conn().execute(
+            f"SELECT key, status FROM job_items WHERE job = ? AND key IN ({placeholders})",
+            [job, *keys]
+        )
+        return dict(rows)
+
+    def enqueue(self, job: str, items: List[Tuple[str, Any]]) -> None:
+        """Record items as pending unless they are already known."""
+        conn = self._conn()
+        now = time.time()
+        with conn:
+            conn.execute("BEGIN")
+            (seq,) = conn.execute(
+                "SELECT COALESCE(MAX(seq), -1) + 1 FROM job_items WHERE job = ?", (job,)
+            ).fetchone()
+            conn.executemany(
+                "INSERT OR IGNORE INTO job_items (job, key, seq, item, status, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                [(job, key, seq + i, json.dumps(item), PENDING, now) for i, (key, item) in enumerate(items)]
+            )
+
+    def complete(self, job: str, outcomes: List[Tuple[str, str, Any, Optional[str]]]) -> None:
+        """Store (key, status, result, error) for finished items in one transaction."""
+        conn = self._conn()
+        now = time.time()
+        with conn:
+            conn.execute("BEGIN")
+            conn.executemany(
+                "UPDATE job_items SET status = ?, attempts = attempts + 1, result = ?, error = ?,"
+                " updated_at = ? WHERE job = ? AND key = ?",
+                [
+                    (status, json.dumps(result) if status == DONE else None, error, now, job, key)
+                    for key, status, result, error in outcomes
+                ]
+            )
+
+    def items(self, job: str, status: str, page_size: int = 1000) -> Iterator[Tuple[str, Any]]:
+        """(key, item) of every item with a status, in input order, read a page at a time."""
+        seq = -1
+        while True:
+            rows = self._conn().execute(
+                "SELECT seq, key, item FROM job_items WHERE job = ? AND status = ? AND seq > ?"
+                " ORDER BY seq LIMIT ?",
+                (job, status, seq, page_size)
+            ).fetchall()
+            for seq, key, item in rows:
+                yield key, json.loads(item)
+            if len(rows) < page_size:
+                return
+
+    def results(self, job: str) -> Iterator[Tuple[str, Any]]:
+        """(key, result) of every done item, in input order."""
+        rows = self._conn().execute(
+            "SELECT key, result FROM job_items WHERE job = ? AND status = ? ORDER BY seq",
+            (job, DONE)
+        )
+        for key, result in rows:
+            yield key, json.loads(result)
+
+    def dead_letters(self, job: str) -> List[Tuple[str, str]]:
+        """(key, last error) of every failed item, in input order."""
+        return self._conn().execute(
+            "SELECT key, error FROM job_items WHERE job = ? AND status = ? ORDER BY seq",
+            (job, FAILED)
+        ).fetchall()
+
+    def counts(self, job: str) -> Dict[str, int]:
+        """Number of items per status."""
+        rows = self._conn().execute(
+            "SELECT status, COUNT(*) FROM job_items WHERE job = ? GROUP BY status", (job,)
+        )
+        return {PENDING: 0, DONE: 0, FAILED: 0, **dict(rows)}
+
+    def reset(self, job: str, status: str = FAILED) -> int:
+        """Set items with a status back to pending; returns how many."""
+        conn = self._conn()
+        with conn:
+            return conn.execute(
+                "UPDATE job_items SET status = ?, updated_at = ? WHERE job = ? AND status = ?",
+                (PENDING, time.time(), job, status)
+            ).rowcount
+
+    def clear(self, job: str) -> None:
+        """Forget a job entirely."""
+        with self._conn() as conn:
+            conn.execute("DELETE FROM job_items WHERE job = ?", (job,))
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+# ==================== ENGINE ====================
+
+@dataclass
+class JobReport:
+    """What one run of a BulkJob did."""
+    job: str
+    processed: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    skipped: int = 0
+    seconds: float = 0.0
+
+
+class BulkJob:
+    """
+    Processes a stream of work items with bounded concurrency and checkpoints.
+
+    The input is read lazily in batches of ``batch_size``; each batch is
+    recorded in the store before it runs, and results are written back in
+    batches as they complete. At most ``concurrency`` items are in flight
+    at once (the client's RateLimiter still applies on top).
+
+    Args:
+        api: SpotifyAPI client passed to the handler
+        name: Job name; runs with the same name share progress
+        handler: Callable ``handler(api, item)`` returning a JSON-serializable
+                 result (see ``lookup`` and ``search_track``)
+        store: JobStore holding the checkpoints
+        concurrency: Items processed at the same time
+        batch_size: Items enqueued and checkpointed together
+        key: Function giving an item's unique key (default: the item itself
+             for strings, its sorted JSON otherwise)
+        permanent_errors: HTTP statuses that fail an item without retrying it
+                          within the run (other SpotifyErrors and connection
+                          errors are retried up to ``max_attempts`` times,
+                          with the client's retry backoff in between)
+        max_attempts: Attempts per item within one run before it is dead-lettered
+    """
+
+    # Finished items are written at least this often (seconds), so a crash
+    # repeats at most this much work
+    CHECKPOINT_INTERVAL = 1.0
+
+    def __init__(
+        self,
+        api: SpotifyAPI,
+        name: str,
+        handler: Callable[[SpotifyAPI, Any], Any],
+        store: JobStore,
+        concurrency: int = 8,
+        batch_size: int = 500,
+        key: Optional[Callable[[Any], str]] = None,
+        permanent_errors: Tuple[int, ...] = (400, 403, 404),
+        max_attempts: int = 2
+    ):
+        self.api = api
+        self.name = name
+        self.handler = handler
+        self.store = store
+        self.concurrency = max(1, concurrency)
+        self.batch_size = max(1, batch_size)
+        self.key = key or self._default_key
+        self.permanent_errors = permanent_errors
+        self.max_attempts = max(1, max_attempts)
+
+    @staticmethod
+    def _default_key(item: Any) -> str:
+        return item if isinstance(item, str) else json.dumps(item, sort_keys=True)
+
+    def _attempt(self, item: Any) -> Any:
+        """Run the handler, retrying errors that may be transient."""
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                # Results are stored as JSON, so work with dicts even in typed mode
+                with self.api.untyped():
+                    return self.handler(self.api, item)
+            except SpotifyError as e:
+                if e.status_code in self.permanent_errors or attempt == self.max_attempts:
+                    raise
+            except (ValueError, TypeError, KeyError):
+                # Bad input or an unexpected response shape won't fix itself
+                raise
+            except Exception:
+                if attempt == self.max_attempts:
+                    raise
+            time.sleep(self.api.retry_policy.backoff(attempt - 1))
+
+    def _batches(self, items: Iterable[Any]) -> Iterator[List[Tuple[str, Any]]]:
+        batch: Dict[str, Any] = {}
+        for item in items:
+            batch.setdefault(self.key(item), item)
+            if len(batch) >= self.batch_size:
+                yield list(batch.items())
+                batch = {}
+        if batch:
+            yield list(batch.items())
+
+    def _process(self, batches: Iterable[List[Tuple[str, Any]]], report: JobReport) -> None:
+        """Run pending items of each batch on a bounded pool, checkpointing as they finish."""
+        in_flight: Dict[Future, str] = {}
+        outcomes: List[Tuple[str, str, Any, Optional[str]]] = []
+        # Keys submitted in this run; their outcome may not be stored yet
+        submitted = set()
+        last_checkpoint = time.monotonic()
+
+        def drain(until: int) -> None:
+            nonlocal last_checkpoint
+            while len(in_flight) > until:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    key = in_flight.pop(future)
+                    try:
+                        outcomes.append((key, DONE, future.result(), None))
+                        report.succeeded += 1
+                    except Exception as e:
+                        outcomes.append((key, FAILED, None, f"{type(e).__name__}: {e}"))
+                        report.failed += 1
+                    report.processed += 1
+                now = time.monotonic()
+                if (
+                    len(outcomes) >= self.batch_size
+                    or now - last_checkpoint >= self.CHECKPOINT_INTERVAL
+                    or not in_flight
+                ):
+                    self.store.complete(self.name, outcomes)
+                    outcomes.clear()
+                    last_checkpoint = now
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            try:
+                for batch in batches:
+                    statuses = self.store.statuses(self.name, [key for key, _ in batch])
+                    new = [(key, item) for key, item in batch if key not in statuses]
+                    if new:
+                        self.store.enqueue(self.name, new)
+                    for key, item in batch:
+                        if statuses.get(key, PENDING) != PENDING or key in submitted:
+                            report.skipped += 1
+                            continue
+                        submitted.add(key)
+                        drain(self.concurrency - 1)
+                        in_flight[executor.submit(self._attempt, item)] = key
+                drain(0)
+            finally:
+                # Keep what finished; items still in flight stay pending for the next run
+                for future in in_flight:
+                    future.cancel()
+                if outcomes:
+                    self.store.complete(self.name, outcomes)
+
+    def run(self, items: Iterable[Any]) -> JobReport:
+        """
+        Process every item not already done or failed in an earlier run.
+
+        Returns:
+            JobReport for this run (``skipped`` counts items finished earlier
+            and repeats of a key already seen in this run)
+        """
+        report = JobReport(self.name)
+        started = time.perf_counter()
+        try:
+            self._process(self._batches(items), report)
+        finally:
+            report.seconds = time.perf_counter() - started
+        return report
+
+    def resume(self) -> JobReport:
+        """Finish the pending items of an earlier run without re-reading the input."""
+        report = JobReport(self.name)
+        started = time.perf_counter()
+        pending = self.store.items(self.name, PENDING)
+        try:
+            self._process(self._batches_of(pending), report)
+        finally:
+            report.seconds = time.perf_counter() - started
+        return report
+
+    def _batches_of(self, pairs: Iterable[Tuple[str, Any]]) -> Iterator[List[Tuple[str, Any]]]:
+        batch = []
+        for pair in pairs:
+            batch.append(pair)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def retry_failed(self) -> JobReport:
+        """Move the dead-letter list back to pending and process it again."""
+        self.store.reset(self.name, FAILED)
+        return self.resume()
+
+    def results(self) -> Iterator[Tuple[str, Any]]:
+        """(key, result) of every finished item, in input order."""
+        return self.store.results(self.name)
+
+    def dead_letters(self) -> List[Tuple[str, str]]:
+        """(key, last error) of every failed item."""
+        return self.store.dead_letters(self.name)
+
+    def counts(self) -> Dict[str, int]:
+        return self.store.counts(self.name)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a resumable bulk Spotify job")
+    parser.add_argument("job", help="job name (progress is shared by runs with the same name)")
+    parser.add_argument("input", nargs="?", help="file with one work item per line (omit to resume)")
+    parser.add_argument("--handler", choices=sorted(HANDLERS), default="lookup")
+    parser.add_argument("--store", default="spotify_jobs.sqlite", help="checkpoint database")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--retry-failed", action="store_true", help="retry the dead-letter list")
+    parser.add_argument("--output", help="write all results to this NDJSON file")
+    args = parser.parse_args()
+
+    client_id = os.getenv("SPOTIFY_CLIENT_ID")
+    client_secret = os.getenv("SPOTIFY_CLIENT_SECRET")
+    # Catalog lookups only need the Client Credentials token shared through the token cache
+    spotify = SpotifyAPI(
+        client_id=client_id,
+        client_secret=client_secret,
+        access_token=os.getenv("SPOTIFY_ACCESS_TOKEN") or get_cached_access_token(client_id, client_secret),
+        token_store=FileTokenStore()
+    )
+    store = JobStore(args.store)
+    job = BulkJob(spotify, args.job, HANDLERS[args.handler], store, concurrency=args.concurrency)
+    with spotify:
+        if args.retry_failed:
+            report = job.retry_failed()
+        elif args.input:
+            with open(args.input, "r", encoding="utf-8") as f:
+                report = job.run(line.strip() for line in f if line.strip())
+        else:
+            report = job.resume()
+
+    print(
+        f"{report.job}: {report.succeeded} done, {report.failed} failed, "
+        f"{report.skipped} skipped in {report.seconds:.1f}s ({job.counts()})"
+    )
+    for key, error in job.dead_letters()[:20]:
+        print(f"  dead letter {key}: {error}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            for key, result in job.results():
+                f.write(json.dumps({"key": key, "result": result}, ensure_ascii=False) + "\n")
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
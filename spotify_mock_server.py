@@ -0,0 +1,1259 @@
+"""
+Spotify Mock Server
+===================
+
+A local stand-in for the Spotify Web API, for benchmarking and load-testing
+SpotifyAPI without touching the real service or its quota.
+
+It serves the endpoint shapes the client uses, with deterministic synthetic
+data generated from the requested IDs:
+- Albums, artists and tracks (GET /albums/{id}, /albums/{id}/tracks, ...)
+- Playlists with /items paging, plus add/remove/reorder/replace and snapshot_id
+- Search (GET /search) with offset paging
+- Library (/me/tracks, /me/albums, PUT/DELETE /me/library, /me/library/contains)
+- Player (/me/player/*)
+- The accounts token endpoint (POST /api/token)
+
+Faults can be injected for testing concurrency and retry behavior: fixed and
+jittered latency, 429s with Retry-After, and 5xx errors at configurable rates.
+GET responses carry an ETag and honor If-None-Match. Responses are gzipped
+when the client asks for it.
+
+Record/replay: with ``--record DIR --upstream https://api.spotify.com`` every
+request is proxied to the real API and the response saved as a fixture; with
+``--replay DIR`` recorded fixtures are served first and synthetic data fills
+in the rest.
+
+Example Usage:
+    from spotify_mock_server import MockSpotifyServer, MockConfig
+
+    with MockSpotifyServer(MockConfig(latency=0.02, rate_limit_rate=0.01)) as server:
+        spotify = server.client(max_workers=32)
+        tracks = spotify.get_tracks(track_ids)
+
+    # Command line
+    python spotify_mock_server.py --port 8999 --latency 0.02 --error-rate 0.01
+"""
+
+import argparse
+import base64
+import gzip
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+
+
+_BASE62 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+_MARKETS = [
+    "AD", "AR", "AT", "AU", "BE", "BR", "CA", "CH", "CL", "CO", "DE", "DK",
+    "ES", "FI", "FR", "GB", "HK", "IE", "IT", "JP", "MX", "NL", "NO", "NZ",
+    "PL", "PT", "SE", "SG", "TW", "US"
+]
+_LIBRARY_TYPES = ("tracks", "albums", "shows", "episodes", "audiobooks")
+
+
+def make_id(*parts: Any) -> str:
+    """Deterministic 22-character base62 ID, shaped like a Spotify ID."""
+    digest = hashlib.sha1(":".join(map(str, parts)).encode()).digest()
+    n = int.from_bytes(digest, "big")
+    chars = []
+    for _ in range(22):
+        n, r = divmod(n, 62)
+        chars.append(_BASE62[r])
+    return "".join(chars)
+
+
+def _seed(*parts: Any) -> int:
+    return int.from_bytes(hashlib.md5(":".join(map(str, parts)).encode()).digest()[:4], "big")
+
+
+@dataclass
+class MockConfig:
+    """
+    Behavior of a MockSpotifyServer.
+
+    Args:
+        latency: Seconds added to every response
+        latency_jitter: Extra random latency, uniform in [0, latency_jitter]
+        rate_limit_rate: Fraction of API requests answered with 429
+        retry_after: Retry-After value (seconds) sent with injected 429s
+        error_rate: Fraction of API requests answered with ``error_status``
+        error_status: Status code used for injected server errors
+        seed: Seed for fault injection, so runs are reproducible
+        playlist_sizes: Items in specific playlists, by playlist ID
+        default_playlist_size: Items in any other playlist
+        tracks_per_album: Tracks on every album
+        saved_items: Initial size of each library collection
+        user_playlists: Number of playlists in /me/playlists
+        search_total: Total results reported for each searched type
+        gzip_min_size: Smallest body gzipped when the client accepts gzip
+        require_auth: Answer 401 to API requests without a bearer token
+        strict_snapshots: Reject playlist writes whose snapshot_id is not the
+                          current one (the real API applies them to the old
+                          version instead)
+        record_dir: Save every upstream response here as a fixture
+        replay_dir: Serve fixtures recorded in this directory
+        upstream: Real API origin proxied to in record mode
+    """
+    latency: float = 0.0
+    latency_jitter: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after: float = 1.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    seed: Optional[int] = 0
+    playlist_sizes: Dict[str, int] = field(default_factory=dict)
+    default_playlist_size: int = 100
+    tracks_per_album: int = 12
+    saved_items: int = 200
+    user_playlists: int = 20
+    search_total: int = 1000
+    gzip_min_size: int = 1024
+    require_auth: bool = True
+    strict_snapshots: bool = True
+    record_dir: Optional[str] = None
+    replay_dir: Optional[str] = None
+    upstream: str = "https://api.spotify.com"
+
+
+@dataclass
+class MockStats:
+    """Counters kept by the server, for checking what a client actually sent."""
+    requests: int = 0
+    rate_limited: int = 0
+    errors: int = 0
+    not_modified: int = 0
+    replayed: int = 0
+    recorded: int = 0
+    by_endpoint: Dict[str, int] = field(default_factory=dict)
+
+
+class MockError(Exception):
+    """An API error response produced by a route handler."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class MockCatalog:
+    """
+    Synthetic catalog and mutable user state behind the mock server.
+
+    Catalog objects are generated on demand from their IDs, so any ID can be
+    looked up and the same ID always yields the same object. Playlists,
+    library and player state change in response to write requests.
+    """
+
+    def __init__(self, config: MockConfig):
+        self.config = config
+        self.lock = threading.Lock()
+        self.playlists: Dict[str, Dict[str, Any]] = {}
+        self.library: Dict[str, List[str]] = {
+            item_type: [make_id(item_type, "saved", i) for i in range(config.saved_items)]
+            for item_type in _LIBRARY_TYPES
+        }
+        self.followed_artists = [make_id("artist", "followed", i) for i in range(50)]
+        self.user_playlist_ids = [make_id("playlist", "user", i) for i in range(config.user_playlists)]
+        self.player: Dict[str, Any] = {
+            "device": self.device("mock-device-1", active=True),
+            "is_playing": False,
+            "progress_ms": 0,
+            "shuffle_state": False,
+            "repeat_state": "off",
+            "track_uri": f"spotify:track:{make_id('track', 'now-playing')}",
+            "queue": [],
+        }
+        # Generated objects are immutable, so repeat lookups (fan-outs over the
+        # same IDs, re-reading a big playlist) skip regeneration
+        self.track = lru_cache(maxsize=200_000)(self.track)
+        self.album = lru_cache(maxsize=50_000)(self.album)
+        self.artist = lru_cache(maxsize=50_000)(self.artist)
+
+    # ---------- catalog objects ----------
+
+    @staticmethod
+    def _object(kind: str, object_id: str, base_url: str, name: str) -> Dict[str, Any]:
+        return {
+            "id": object_id,
+            "name": name,
+            "type": kind,
+            "uri": f"spotify:{kind}:{object_id}",
+            "href": f"{base_url}/v1/{kind}s/{object_id}",
+            "external_urls": {"spotify": f"https://open.spotify.com/{kind}/{object_id}"},
+        }
+
+    def images(self, object_id: str) -> List[Dict[str, Any]]:
+        return [
+            {"url": f"https://i.scdn.co/image/{make_id('image', object_id, size)}",
+             "height": size, "width": size}
+            for size in (640, 300, 64)
+        ]
+
+    def artist(self, artist_id: str, base_url: str, full: bool = False) -> Dict[str, Any]:
+        artist = self._object("artist", artist_id, base_url, f"Artist {artist_id[:6]}")
+        if full:
+            rng = random.Random(_seed("artist", artist_id))
+            artist.update({
+                "genres": rng.sample(["pop", "rock", "indie", "jazz", "hip hop", "electronic"], 2),
+                "images": self.images(artist_id),
+                "followers": {"href": None, "total": rng.randint(0, 10_000_000)},
+                "popularity": rng.randint(0, 100),
+            })
+        return artist
+
+    def album_artist_id(self, album_id: str) -> str:
+        return make_id("artist", _seed("album-artist", album_id) % 5000)
+
+    def album(self, album_id: str, base_url: str, full: bool = False) -> Dict[str, Any]:
+        rng = random.Random(_seed("album", album_id))
+        album = self._object("album", album_id, base_url, f"Album {album_id[:6]}")
+        album.update({
+            "album_type": "album",
+            "total_tracks": self.config.tracks_per_album,
+            "available_markets": _MARKETS,
+            "images": self.images(album_id),
+            "release_date": f"{rng.randint(1960, 2025)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "release_date_precision": "day",
+            "artists": [self.artist(self.album_artist_id(album_id), base_url)],
+        })
+        if full:
+            album.update({
+                "tracks": self.paging(
+                    f"/v1/albums/{album_id}/tracks",
+                    self.album_track_ids(album_id),
+                    lambda tid: self.track(tid, base_url, album_id=album_id, simplified=True),
+                    0, 50, base_url
+                ),
+                "copyrights": [{"text": f"(C) {album['release_date'][:4]} Mock Records", "type": "C"}],
+                "external_ids": {"upc": str(rng.randint(10 ** 11, 10 ** 12 - 1))},
+                "genres": [],
+                "label": "Mock Records",
+                "popularity": rng.randint(0, 100),
+            })
+        return album
+
+    def album_track_ids(self, album_id: str) -> List[str]:
+        return [make_id("track", album_id, i) for i in range(self.config.tracks_per_album)]
+
+    def track(
+        self,
+        track_id: str,
+        base_url: str,
+        album_id: Optional[str] = None,
+        simplified: bool = False
+    ) -> Dict[str, Any]:
+        rng = random.Random(_seed("track", track_id))
+        album_id = album_id or make_id("album", rng.randint(0, 20_000))
+        track = self._object("track", track_id, base_url, f"Track {track_id[:6]}")
+        track.update({
+            "artists": [self.artist(self.album_artist_id(album_id), base_url)],
+            "available_markets": _MARKETS,
+            "disc_number": 1,
+            "duration_ms": rng.randint(90_000, 420_000),
+            "explicit": rng.random() < 0.2,
+            "is_local": False,
+            "preview_url": None,
+            "track_number": rng.randint(1, self.config.tracks_per_album),
+        })
+        if not simplified:
+            track.update({
+                "album": self.album(album_id, base_url),
+                "external_ids": {"isrc": f"US{track_id[:10].upper()}"},
+                "popularity": rng.randint(0, 100),
+            })
+        return track
+
+    def device(self, device_id: str, active: bool = False) -> Dict[str, Any]:
+        return {
+            "id": device_id,
+            "is_active": active,
+            "is_private_session": False,
+            "is_restricted": False,
+            "name": "Mock Speaker",
+            "type": "Speaker",
+            "volume_percent": 50,
+            "supports_volume": True,
+        }
+
+    # ---------- paging ----------
+
+    @staticmethod
+    def paging(
+        path: str,
+        ids: List[Any],
+        render: Callable[[Any], Dict[str, Any]],
+        offset: int,
+        limit: int,
+        base_url: str,
+        query: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """Offset-based paging object with absolute next/previous URLs."""
+        total = len(ids)
+
+        def url(page_offset: int) -> str:
+            params = dict(query or {}, offset=page_offset, limit=limit)
+            return f"{base_url}{path}?{urlencode(params)}"
+
+        return {
+            "href": url(offset),
+            "items": [render(item) for item in ids[offset:offset + limit]],
+            "limit": limit,
+            "next": url(offset + limit) if offset + limit < total else None,
+            "offset": offset,
+            "previous": url(max(0, offset - limit)) if offset > 0 else None,
+            "total": total,
+        }
+
+    # ---------- playlists ----------
+
+    def playlist_state(self, playlist_id: str) -> Dict[str, Any]:
+        """Mutable state of a playlist, created on first access. Caller holds the lock."""
+        state = self.playlists.get(playlist_id)
+        if state is None:
+            size = self.config.playlist_sizes.get(playlist_id, self.config.default_playlist_size)
+            state = self.playlists[playlist_id] = {
+                "name": f"Playlist {playlist_id[:6]}",
+                "description": "",
+                "public": True,
+                "collaborative": False,
+                "version": 1,
+                "uris": [f"spotify:track:{make_id('track', playlist_id, i)}" for i in range(size)],
+            }
+        return state
+
+    def snapshot_id(self, playlist_id: str, state: Dict[str, Any]) -> str:
+        return base64.b64encode(f"{state['version']}:{playlist_id}".encode()).decode()
+
+    def playlist_item(self, uri: str, base_url: str) -> Dict[str, Any]:
+        return {
+            "added_at": "2024-01-01T00:00:00Z",
+            "added_by": {"id": "mock-user", "type": "user", "uri": "spotify:user:mock-user"},
+            "is_local": False,
+            "track": self.track(uri.rsplit(":", 1)[-1], base_url),
+        }
+
+    def playlist(self, playlist_id: str, base_url: str, full: bool = True) -> Dict[str, Any]:
+        with self.lock:
+            state = self.playlist_state(playlist_id)
+            uris = list(state["uris"])
+            snapshot = self.snapshot_id(playlist_id, state)
+
+        playlist = self._object("playlist", playlist_id, base_url, state["name"])
+        playlist.update({
+            "collaborative": state["collaborative"],
+            "description": state["description"],
+            "images": self.images(playlist_id),
+            "owner": {"id": "mock-user", "type": "user", "display_name": "Mock User"},
+            "public": state["public"],
+            "snapshot_id": snapshot,
+        })
+        if full:
+            playlist["followers"] = {"href": None, "total": 0}
+            playlist["tracks"] = self.paging(
+                f"/v1/playlists/{playlist_id}/items", uris,
+                lambda uri: self.playlist_item(uri, base_url), 0, 100, base_url
+            )
+        else:
+            playlist["tracks"] = {"href": f"{base_url}/v1/playlists/{playlist_id}/items",
+                                  "total": len(uris)}
+        return playlist
+
+
+def apply_fields(value: Any, spec: str) -> Any:
+    """
+    Filter a response with the Web API ``fields`` syntax, e.g.
+    ``items(track(name,id)),next`` or ``items.track.name``.
+    """
+    return _filter(value, _parse_fields(spec))
+
+
+def _parse_fields(spec: str) -> Dict[str, Any]:
+    """Parse a fields expression into a nested dict (None = keep whole value)."""
+    tree: Dict[str, Any] = {}
+    depth = 0
+    start = 0
+    parts = []
+    for i, ch in enumerate(spec + ","):
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            parts.append(spec[start:i].strip())
+            start = i + 1
+
+    for part in filter(None, parts):
+        if "(" in part and (part.index("(") < part.index(".") if "." in part else True):
+            name, inner = part.split("(", 1)
+            subtree: Optional[Dict[str, Any]] = _parse_fields(inner[:-1])
+        elif "." in part:
+            name, rest = part.split(".", 1)
+            subtree = _parse_fields(rest)
+        else:
+            name, subtree = part, None
+        existing = tree.get(name)
+        if isinstance(existing, dict) and isinstance(subtree, dict):
+            existing.update(subtree)
+        else:
+            tree[name] = subtree
+    return tree
+
+
+def _filter(value: Any, tree: Optional[Dict[str, Any]]) -> Any:
+    if tree is None:
+        return value
+    if isinstance(value, list):
+        return [_filter(item, tree) for item in value]
+    if isinstance(value, dict):
+        return {key: _filter(value[key], sub) for key, sub in tree.items() if key in value}
+    return value
+
+
+class _Router:
+    """Maps (method, path pattern) pairs to handler methods."""
+
+    def __init__(self):
+        self.routes: List[Tuple[str, re.Pattern, str]] = []
+
+    def add(self, method: str, pattern: str, handler: str) -> None:
+        regex = "^" + re.sub(r"\{(\w+)\}", r"(?P<\1>[^/]+)", pattern) + "$"
+        self.routes.append((method, re.compile(regex), handler))
+
+    def match(self, method: str, path: str) -> Tuple[Optional[str], Dict[str, str], bool]:
+        """Return (handler name, path params, whether the path exists at all)."""
+        path_exists = False
+        for route_method, regex, handler in self.routes:
+            m = regex.match(path)
+            if m:
+                path_exists = True
+                if route_method == method:
+                    return handler, m.groupdict(), True
+        return None, {}, path_exists
+
+
+_ROUTES = _Router()
+for _method, _pattern, _handler in (
+    ("POST", "/api/token", "token"),
+    ("GET", "/v1/albums/{id}", "get_album"),
+    ("GET", "/v1/albums/{id}/tracks", "get_album_tracks"),
+    ("GET", "/v1/artists/{id}", "get_artist"),
+    ("GET", "/v1/artists/{id}/albums", "get_artist_albums"),
+    ("GET", "/v1/tracks/{id}", "get_track"),
+    ("GET", "/v1/search", "search"),
+    ("GET", "/v1/me", "get_me"),
+    ("GET", "/v1/me/playlists", "get_my_playlists"),
+    ("POST", "/v1/me/playlists", "create_playlist"),
+    ("GET", "/v1/playlists/{id}", "get_playlist"),
+    ("PUT", "/v1/playlists/{id}", "change_playlist"),
+    ("GET", "/v1/playlists/{id}/images", "get_playlist_images"),
+    ("GET", "/v1/playlists/{id}/items", "get_playlist_items"),
+    ("POST", "/v1/playlists/{id}/items", "add_playlist_items"),
+    ("DELETE", "/v1/playlists/{id}/items", "remove_playlist_items"),
+    ("PUT", "/v1/playlists/{id}/items", "update_playlist_items"),
+    ("GET", "/v1/me/tracks", "get_saved"),
+    ("GET", "/v1/me/albums", "get_saved"),
+    ("GET", "/v1/me/shows", "get_saved"),
+    ("GET", "/v1/me/episodes", "get_saved"),
+    ("GET", "/v1/me/audiobooks", "get_saved"),
+    ("PUT", "/v1/me/library", "save_library"),
+    ("DELETE", "/v1/me/library", "remove_library"),
+    ("GET", "/v1/me/library/contains", "check_library"),
+    ("GET", "/v1/me/following", "get_following"),
+    ("GET", "/v1/me/top/{type}", "get_top"),
+    ("GET", "/v1/me/player", "get_player"),
+    ("PUT", "/v1/me/player", "transfer_playback"),
+    ("GET", "/v1/me/player/currently-playing", "get_currently_playing"),
+    ("GET", "/v1/me/player/devices", "get_devices"),
+    ("GET", "/v1/me/player/recently-played", "get_recently_played"),
+    ("GET", "/v1/me/player/queue", "get_queue"),
+    ("POST", "/v1/me/player/queue", "add_to_queue"),
+    ("PUT", "/v1/me/player/play", "play"),
+    ("PUT", "/v1/me/player/pause", "pause"),
+    ("POST", "/v1/me/player/next", "skip"),
+    ("POST", "/v1/me/player/previous", "skip"),
+    ("PUT", "/v1/me/player/seek", "seek"),
+    ("PUT", "/v1/me/player/repeat", "set_repeat"),
+    ("PUT", "/v1/me/player/volume", "set_volume"),
+    ("PUT", "/v1/me/player/shuffle", "set_shuffle"),
+):
+    _ROUTES.add(_method, _pattern, _handler)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Request handler; one instance per request, state lives on the server."""
+
+    protocol_version = "HTTP/1.1"
+    # Send headers and body in one segment; otherwise Nagle plus delayed ACKs
+    # add ~40ms to every keep-alive response
+    wbufsize = 1 << 16
+    disable_nagle_algorithm = True
+    server: "MockSpotifyServer"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+    def do_PUT(self) -> None:
+        self._dispatch("PUT")
+
+    def do_DELETE(self) -> None:
+        self._dispatch("DELETE")
+
+    # ---------- plumbing ----------
+
+    def _dispatch(self, method: str) -> None:
+        mock = self.server
+        parts = urlsplit(self.path)
+        path = parts.path.rstrip("/") or "/"
+        self.query = dict(parse_qsl(parts.query))
+        length = int(self.headers.get("Content-Length") or 0)
+        raw_body = self.rfile.read(length) if length else b""
+        try:
+            self.body = json.loads(raw_body) if raw_body else {}
+        except ValueError:
+            self.body = {}
+        self.base_url = f"http://{self.headers.get('Host') or mock.host_port}"
+
+        handler_name, path_params, path_exists = _ROUTES.match(method, path)
+        is_api = path.startswith("/v1/")
+        mock.count(method, handler_name or path)
+
+        delay = mock.delay()
+        if delay:
+            time.sleep(delay)
+
+        if is_api:
+            if mock.config.require_auth and not self.headers.get("Authorization", "").startswith("Bearer "):
+                return self._error(401, "No token provided")
+            fault = mock.fault()
+            if fault == 429:
+                return self._send(429, {"error": {"status": 429, "message": "API rate limit exceeded"}},
+                                  {"Retry-After": f"{mock.config.retry_after:g}"})
+            if fault:
+                return self._error(fault, "Injected server error")
+            if mock.config.record_dir:
+                return self._proxy(method, parts, raw_body)
+            fixture = mock.fixture(method, path, self.query)
+            if fixture is not None:
+                return self._send(fixture["status"], fixture["body"], fixture.get("headers"))
+
+        if handler_name is None:
+            if path_exists:
+                return self._error(405, "Method not allowed")
+            return self._error(404, "Service not found")
+
+        try:
+            status, body = getattr(self, "_" + handler_name)(**path_params)
+        except MockError as e:
+            return self._error(e.status, e.message)
+        self._send(status, body)
+
+    def _int(self, name: str, default: int, maximum: Optional[int] = None) -> int:
+        try:
+            value = int(self.query.get(name, default))
+        except ValueError:
+            raise MockError(400, f"Invalid {name}")
+        if value < 0 or (maximum is not None and value > maximum):
+            raise MockError(400, f"Invalid {name}")
+        return value
+
+    def _error(self, status: int, message: str) -> None:
+        self._send(status, {"error": {"status": status, "message": message}})
+
+    def _send(self, status: int, body: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        if body is None:
+            payload = b""
+        elif isinstance(body, (bytes, str)):
+            payload = body.encode() if isinstance(body, str) else body
+        else:
+            if self.command == "GET" and "fields" in self.query and status == 200:
+                body = apply_fields(body, self.query["fields"])
+            payload = json.dumps(body, separators=(",", ":")).encode()
+
+        extra = dict(headers or {})
+        if self.command == "GET" and status == 200 and payload:
+            etag = '"' + hashlib.md5(payload).hexdigest() + '"'
+            extra["ETag"] = etag
+            if self.headers.get("If-None-Match") == etag:
+                self.server.stats_add("not_modified")
+                status, payload = 304, b""
+
+        if payload and len(payload) >= self.server.config.gzip_min_size \
+                and "gzip" in self.headers.get("Accept-Encoding", ""):
+            payload = gzip.compress(payload, compresslevel=1)
+            extra["Content-Encoding"] = "gzip"
+
+        self.send_response(status)
+        if payload:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in extra.items():
+            self.send_header(name, value)
+        self.end_headers()
+        if payload:
+            self.wfile.write(payload)
+
+    def _proxy(self, method: str, parts: Any, raw_body: bytes) -> None:
+        """Forward a request to the real API and record the response."""
+        mock = self.server
+        headers = {
+            name: self.headers[name]
+            for name in ("Authorization", "Content-Type", "If-None-Match")
+            if self.headers.get(name)
+        }
+        url = mock.config.upstream.rstrip("/") + parts.path
+        response = requests.request(
+            method, url, params=self.query, data=raw_body or None, headers=headers, timeout=30
+        )
+        try:
+            body: Any = response.json() if response.content else None
+        except ValueError:
+            body = response.text
+        kept = {name: response.headers[name] for name in ("Retry-After",) if name in response.headers}
+        mock.record(method, parts.path, self.query, response.status_code, body, kept)
+        self._send(response.status_code, mock.rewrite(body), kept)
+
+    # ---------- accounts ----------
+
+    def _token(self) -> Tuple[int, Any]:
+        return 200, {
+            "access_token": f"mock-{make_id('token', time.time(), random.random())}",
+            "token_type": "Bearer",
+            "expires_in": 3600,
+        }
+
+    # ---------- catalog ----------
+
+    def _get_album(self, id: str) -> Tuple[int, Any]:
+        return 200, self.server.catalog.album(id, self.base_url, full=True)
+
+    def _get_album_tracks(self, id: str) -> Tuple[int, Any]:
+        catalog = self.server.catalog
+        return 200, catalog.paging(
+            f"/v1/albums/{id}/tracks", catalog.album_track_ids(id),
+            lambda tid: catalog.track(tid, self.base_url, album_id=id, simplified=True),
+            self._int("offset", 0), self._int("limit", 20, 50), self.base_url
+        )
+
+    def _get_artist(self, id: str) -> Tuple[int, Any]:
+        return 200, self.server.catalog.artist(id, self.base_url, full=True)
+
+    def _get_artist_albums(self, id: str) -> Tuple[int, Any]:
+        catalog = self.server.catalog
+        return 200, catalog.paging(
+            f"/v1/artists/{id}/albums", [make_id("album", id, i) for i in range(20)],
+            lambda aid: catalog.album(aid, self.base_url),
+            self._int("offset", 0), self._int("limit", 20, 50), self.base_url
+        )
+
+    def _get_track(self, id: str) -> Tuple[int, Any]:
+        return 200, self.server.catalog.track(id, self.base_url)
+
+    def _search(self) -> Tuple[int, Any]:
+        query = self.query.get("q")
+        types = [t for t in self.query.get("type", "").split(",") if t]
+        if not query or not types:
+            raise MockError(400, "No search query" if not query else "Missing parameter type")
+        offset, limit = self._int("offset", 0, 1000), self._int("limit", 20, 50)
+
+        catalog = self.server.catalog
+        renderers = {
+            "track": lambda i: catalog.track(make_id("track", query, i), self.base_url),
+            "album": lambda i: catalog.album(make_id("album", query, i), self.base_url),
+            "artist": lambda i: catalog.artist(make_id("artist", query, i), self.base_url, full=True),
+            "playlist": lambda i: catalog.playlist(make_id("playlist", query, i), self.base_url, full=False),
+        }
+        result = {}
+        for item_type in types:
+            render = renderers.get(item_type)
+            if render is None:
+                raise MockError(400, f"Unsupported search type: {item_type}")
+            result[item_type + "s"] = catalog.paging(
+                "/v1/search", range(self.server.config.search_total), render,
+                offset, limit, self.base_url, {"q": query, "type": item_type}
+            )
+        return 200, result
+
+    # ---------- playlists ----------
+
+    def _get_me(self) -> Tuple[int, Any]:
+        return 200, {
+            "id": "mock-user",
+            "display_name": "Mock User",
+            "type": "user",
+            "uri": "spotify:user:mock-user",
+            "country": "US",
+            "product": "premium",
+            "followers": {"href": None, "total": 0},
+            "images": [],
+        }
+
+    def _get_my_playlists(self) -> Tuple[int, Any]:
+        catalog = self.server.catalog
+        return 200, catalog.paging(
+            "/v1/me/playlists", catalog.user_playlist_ids,
+            lambda pid: catalog.playlist(pid, self.base_url, full=False),
+            self._int("offset", 0), self._int("limit", 20, 50), self.base_url
+        )
+
+    def _create_playlist(self) -> Tuple[int, Any]:
+        catalog = self.server.catalog
+        if not self.body.get("name"):
+            raise MockError(400, "Missing required field: name")
+        playlist_id = make_id("playlist", "created", time.time(), random.random())
+        with catalog.lock:
+            catalog.config.playlist_sizes[playlist_id] = 0
+            state = catalog.playlist_state(playlist_id)
+            state["name"] = self.body["name"]
+            state["description"] = self.body.get("description", "")
+            state["public"] = self.body.get("public", True)
+            state["collaborative"] = self.body.get("collaborative", False)
+            catalog.user_playlist_ids.insert(0, playlist_id)
+        return 201, catalog.playlist(playlist_id, self.base_url)
+
+    def _get_playlist(self, id: str) -> Tuple[int, Any]:
+        return 200, self.server.catalog.playlist(id, self.base_url)
+
+    def _change_playlist(self, id: str) -> Tuple[int, Any]:
+        catalog = self.server.catalog
+        with catalog.lock:
+            state = catalog.playlist_state(id)
+            for key in ("name", "description", "public", "collaborative"):
+                if key in self.body:
+                    state[key] = self.body[key]
+        return 200, None
+
+    def _get_playlist_images(self, id: str) -> Tuple[int, Any]:
+        return 200, self.server.catalog.images(id)
+
+    def _get_playlist_items(self, id: str) -> Tuple[int, Any]:
+        catalog = self.server.catalog
+        with catalog.lock:
+            uris = list(catalog.playlist_state(id)["uris"])
+        return 200, catalog.paging(
+            f"/v1/playlists/{id}/items", uris,
+            lambda uri: catalog.playlist_item(uri, self.base_url),
+            self._int("offset", 0), self._int("limit", 20, 100), self.base_url,
+            {k: v for k, v in self.query.items() if k in ("fields", "market")}
+        )
+
+    def _modify_playlist(self, id: str, change: Callable[[List[str]], None]) -> Tuple[int, Any]:
+        catalog = self.server.catalog
+        with catalog.lock:
+            state = catalog.playlist_state(id)
+            snapshot = self.body.get("snapshot_id")
+            if catalog.config.strict_snapshots and snapshot \
+                    and snapshot != catalog.snapshot_id(id, state):
+                # Catches clients that don't chain snapshot_id between writes
+                raise MockError(400, "Snapshot ID is out of date")
+            change(state["uris"])
+            state["version"] += 1
+            return 200, {"snapshot_id": catalog.snapshot_id(id, state)}
+
+    def _add_playlist_items(self, id: str) -> Tuple[int, Any]:
+        uris = self.body.get("uris") or [u for u in self.query.get("uris", "").split(",") if u]
+        if not uris or len(uris) > 100:
+            raise MockError(400, "You can add a maximum of 100 items per request")
+        position = self.body.get("position")
+
+        def change(items: List[str]) -> None:
+            at = len(items) if position is None else position
+            if not 0 <= at <= len(items):
+                raise MockError(400, "Index out of bounds")
+            items[at:at] = uris
+
+        status, body = self._modify_playlist(id, change)
+        return 201, body
+
+    def _remove_playlist_items(self, id: str) -> Tuple[int, Any]:
+        tracks = self.body.get("tracks") or self.body.get("items") or []
+        if not tracks or len(tracks) > 100:
+            raise MockError(400, "You can remove a maximum of 100 items per request")
+
+        def change(items: List[str]) -> None:
+            drop = set()
+            for track in tracks:
+                uri = track["uri"]
+                positions = track.get("positions")
+                if positions is None:
+                    drop.update(i for i, item in enumerate(items) if item == uri)
+                else:
+                    for i in positions:
+                        if i >= len(items) or items[i] != uri:
+                            raise MockError(400, f"Item at position {i} is not {uri}")
+                        drop.add(i)
+            items[:] = [item for i, item in enumerate(items) if i not in drop]
+
+        return self._modify_playlist(id, change)
+
+    def _update_playlist_items(self, id: str) -> Tuple[int, Any]:
+        if "uris" in self.body or "uris" in self.query:
+            uris = self.body.get("uris")
+            if uris is None:
+                uris = [u for u in self.query["uris"].split(",") if u]
+            if len(uris) > 100:
+                raise MockError(400, "You can set a maximum of 100 items per request")
+
+            def change(items: List[str]) -> None:
+                items[:] = uris
+            return self._modify_playlist(id, change)
+
+        range_start = self.body.get("range_start")
+        insert_before = self.body.get("insert_before")
+        range_length = self.body.get("range_length", 1)
+        if range_start is None or insert_before is None:
+            raise MockError(400, "Missing range_start or insert_before")
+
+        def change(items: List[str]) -> None:
+            end = range_start + range_length
+            if range_start < 0 or end > len(items) or not 0 <= insert_before <= len(items):
+                raise MockError(400, "Index out of bounds")
+            block = items[range_start:end]
+            if range_start <= insert_before <= end:
+                return
+            del items[range_start:end]
+            at = insert_before - range_length if insert_before > range_start else insert_before
+            items[at:at] = block
+
+        return self._modify_playlist(id, change)
+
+    # ---------- library ----------
+
+    def _library_type(self) -> str:
+        item_type = self.query.get("type", "")
+        if item_type not in _LIBRARY_TYPES:
+            raise MockError(400, f"Invalid type: {item_type}")
+        return item_type
+
+    def _library_ids(self) -> List[str]:
+        ids = self.body.get("ids") or [i for i in self.query.get("ids", "").split(",") if i]
+        if not ids or len(ids) > 50:
+            raise MockError(400, "Between 1 and 50 ids are allowed")
+        return ids
+
+    def _get_saved(self) -> Tuple[int, Any]:
+        catalog = self.server.catalog
+        item_type = self.path.split("?")[0].rstrip("/").rsplit("/", 1)[-1]
+        renderers = {
+            "tracks": lambda i: {"added_at": "2024-01-01T00:00:00Z",
+                                 "track": catalog.track(i, self.base_url)},
+            "albums": lambda i: {"added_at": "2024-01-01T00:00:00Z",
+                                 "album": catalog.album(i, self.base_url, full=True)},
+        }
+        render = renderers.get(item_type, lambda i: {
+            "added_at": "2024-01-01T00:00:00Z",
+            item_type[:-1]: catalog._object(item_type[:-1], i, self.base_url, f"{item_type[:-1].title()} {i[:6]}")
+        })
+        with catalog.lock:
+            ids = list(catalog.library[item_type])
+        return 200, catalog.paging(
+            f"/v1/me/{item_type}", ids, render,
+            self._int("offset", 0), self._int("limit", 20, 50), self.base_url
+        )
+
+    def _save_library(self) -> Tuple[int, Any]:
+        item_type, ids = self._library_type(), self._library_ids()
+        catalog = self.server.catalog
+        with catalog.lock:
+            saved = catalog.library[item_type]
+            existing = set(saved)
+            saved[0:0] = [i for i in dict.fromkeys(ids) if i not in existing]
+        return 200, None
+
+    def _remove_library(self) -> Tuple[int, Any]:
+        item_type, ids = self._library_type(), set(self._library_ids())
+        catalog = self.server.catalog
+        with catalog.lock:
+            catalog.library[item_type][:] = [i for i in catalog.library[item_type] if i not in ids]
+        return 200, None
+
+    def _check_library(self) -> Tuple[int, Any]:
+        item_type, ids = self._library_type(), self._library_ids()
+        catalog = self.server.catalog
+        with catalog.lock:
+            saved = set(catalog.library[item_type])
+        return 200, [i in saved for i in ids]
+
+    def _get_following(self) -> Tuple[int, Any]:
+        if self.query.get("type") != "artist":
+            raise MockError(400, "Only type=artist is supported")
+        catalog = self.server.catalog
+        limit = self._int("limit", 20, 50)
+        ids = catalog.followed_artists
+        after = self.query.get("after")
+        start = ids.index(after) + 1 if after in ids else 0
+        page = ids[start:start + limit]
+        has_more = start + limit < len(ids)
+        next_url = None
+        if has_more:
+            params = urlencode({"type": "artist", "after": page[-1], "limit": limit})
+            next_url = f"{self.base_url}/v1/me/following?{params}"
+        return 200, {"artists": {
+            "href": f"{self.base_url}/v1/me/following?type=artist",
+            "items": [catalog.artist(i, self.base_url, full=True) for i in page],
+            "limit": limit,
+            "next": next_url,
+            "cursors": {"after": page[-1] if has_more else None},
+            "total": len(ids),
+        }}
+
+    def _get_top(self, type: str) -> Tuple[int, Any]:
+        catalog = self.server.catalog
+        if type not in ("artists", "tracks"):
+            raise MockError(400, f"Invalid type: {type}")
+        render = (lambda i: catalog.artist(i, self.base_url, full=True)) if type == "artists" \
+            else (lambda i: catalog.track(i, self.base_url))
+        return 200, catalog.paging(
+            f"/v1/me/top/{type}", [make_id("top", type, i) for i in range(50)], render,
+            self._int("offset", 0), self._int("limit", 20, 50), self.base_url
+        )
+
+    # ---------- player ----------
+
+    def _playback(self, full: bool) -> Dict[str, Any]:
+        catalog = self.server.catalog
+        player = catalog.player
+        state = {
+            "timestamp": int(time.time() * 1000),
+            "progress_ms": player["progress_ms"],
+            "is_playing": player["is_playing"],
+            "currently_playing_type": "track",
+            "item": catalog.track(player["track_uri"].rsplit(":", 1)[-1], self.base_url),
+            "context": None,
+            "actions": {"disallows": {}},
+        }
+        if full:
+            state.update({
+                "device": player["device"],
+                "shuffle_state": player["shuffle_state"],
+                "repeat_state": player["repeat_state"],
+            })
+        return state
+
+    def _get_player(self) -> Tuple[int, Any]:
+        return 200, self._playback(full=True)
+
+    def _get_currently_playing(self) -> Tuple[int, Any]:
+        return 200, self._playback(full=False)
+
+    def _get_devices(self) -> Tuple[int, Any]:
+        return 200, {"devices": [self.server.catalog.player["device"]]}
+
+    def _get_recently_played(self) -> Tuple[int, Any]:
+        catalog = self.server.catalog
+        limit = self._int("limit", 20, 50)
+        return 200, {
+            "href": f"{self.base_url}/v1/me/player/recently-played",
+            "items": [
+                {"track": catalog.track(make_id("recent", i), self.base_url),
+                 "played_at": "2024-01-01T00:00:00Z", "context": None}
+                for i in range(limit)
+            ],
+            "limit": limit,
+            "next": None,
+            "cursors": {"after": None, "before": None},
+        }
+
+    def _get_queue(self) -> Tuple[int, Any]:
+        catalog = self.server.catalog
+        with catalog.lock:
+            queue = list(catalog.player["queue"])
+            current = catalog.player["track_uri"]
+        return 200, {
+            "currently_playing": catalog.track(current.rsplit(":", 1)[-1], self.base_url),
+            "queue": [catalog.track(uri.rsplit(":", 1)[-1], self.base_url) for uri in queue],
+        }
+
+    def _add_to_queue(self) -> Tuple[int, Any]:
+        uri = self.query.get("uri")
+        if not uri:
+            raise MockError(400, "Missing uri")
+        with self.server.catalog.lock:
+            self.server.catalog.player["queue"].append(uri)
+        return 204, None
+
+    def _transfer_playback(self) -> Tuple[int, Any]:
+        device_ids = self.body.get("device_ids") or []
+        if len(device_ids) != 1:
+            raise MockError(400, "Exactly one device_id is required")
+        with self.server.catalog.lock:
+            player = self.server.catalog.player
+            player["device"] = self.server.catalog.device(device_ids[0], active=True)
+            if self.body.get("play"):
+                player["is_playing"] = True
+        return 204, None
+
+    def _play(self) -> Tuple[int, Any]:
+        with self.server.catalog.lock:
+            player = self.server.catalog.player
+            uris = self.body.get("uris")
+            if uris:
+                player["track_uri"] = uris[0]
+                player["progress_ms"] = 0
+            player["is_playing"] = True
+        return 204, None
+
+    def _pause(self) -> Tuple[int, Any]:
+        with self.server.catalog.lock:
+            self.server.catalog.player["is_playing"] = False
+        return 204, None
+
+    def _skip(self) -> Tuple[int, Any]:
+        with self.server.catalog.lock:
+            player = self.server.catalog.player
+            if player["queue"] and self.path.startswith("/v1/me/player/next"):
+                player["track_uri"] = player["queue"].pop(0)
+            player["progress_ms"] = 0
+        return 204, None
+
+    def _seek(self) -> Tuple[int, Any]:
+        position = self._int("position_ms", 0)
+        with self.server.catalog.lock:
+            self.server.catalog.player["progress_ms"] = position
+        return 204, None
+
+    def _set_repeat(self) -> Tuple[int, Any]:
+        state = self.query.get("state")
+        if state not in ("track", "context", "off"):
+            raise MockError(400, "Invalid state")
+        with self.server.catalog.lock:
+            self.server.catalog.player["repeat_state"] = state
+        return 204, None
+
+    def _set_volume(self) -> Tuple[int, Any]:
+        volume = self._int("volume_percent", 0, 100)
+        with self.server.catalog.lock:
+            self.server.catalog.player["device"]["volume_percent"] = volume
+        return 204, None
+
+    def _set_shuffle(self) -> Tuple[int, Any]:
+        with self.server.catalog.lock:
+            self.server.catalog.player["shuffle_state"] = self.query.get("state") == "true"
+        return 204, None
+
+
+class MockSpotifyServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server implementing the mock API on ``host:port``.
+
+    Use ``start()``/``stop()`` or a ``with`` block to run it on a background
+    thread. Port 0 picks a free port; ``base_url`` has the real one.
+
+    Args:
+        config: MockConfig (default: no latency, no faults)
+        host: Interface to bind
+        port: Port to bind (0 = any free port)
+        verbose: Log every request to stderr
+    """
+
+    daemon_threads = True
+    # Benchmarks open many keep-alive connections at once
+    request_queue_size = 1024
+
+    def __init__(
+        self,
+        config: Optional[MockConfig] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        verbose: bool = False
+    ):
+        self.config = config or MockConfig()
+        self.verbose = verbose
+        self.catalog = MockCatalog(self.config)
+        self.stats = MockStats()
+        self._stats_lock = threading.Lock()
+        self._random = random.Random(self.config.seed)
+        self._thread: Optional[threading.Thread] = None
+        super().__init__((host, port), _Handler)
+        self.host_port = f"{self.server_address[0]}:{self.server_address[1]}"
+
+    @property
+    def base_url(self) -> str:
+        """Value for SpotifyAPI.BASE_URL."""
+        return f"http://{self.host_port}/v1"
+
+    @property
+    def auth_url(self) -> str:
+        """Value for SpotifyAPI.AUTH_URL."""
+        return f"http://{self.host_port}/api/token"
+
+    def start(self) -> "MockSpotifyServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="spotify-mock-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "MockSpotifyServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def client(self, cls: Optional[type] = None, **kwargs) -> Any:
+        """
+        Create a client (SpotifyAPI by default) pointed at this server.
+
+        A bearer token is filled in unless client credentials are given, in
+        which case the token is minted from the mock's token endpoint.
+        """
+        from spotify_web_api_skill import SpotifyAPI
+
+        cls = cls or SpotifyAPI
+        # Patch the class-level URLs on a throwaway subclass so the token
+        # request made inside __init__ already goes to the mock
+        bound = type(cls.__name__, (cls,), {"BASE_URL": self.base_url, "AUTH_URL": self.auth_url})
+        if not kwargs.get("client_id"):
+            kwargs.setdefault("access_token", "mock-token")
+        return bound(**kwargs)
+
+    # ---------- faults and accounting ----------
+
+    def delay(self) -> float:
+        jitter = self.config.latency_jitter
+        with self._stats_lock:
+            extra = self._random.uniform(0, jitter) if jitter else 0.0
+        return self.config.latency + extra
+
+    def fault(self) -> Optional[int]:
+        """Status of an injected failure for this request, or None."""
+        with self._stats_lock:
+            roll = self._random.random()
+            if roll < self.config.rate_limit_rate:
+                self.stats.rate_limited += 1
+                return 429
+            if roll < self.config.rate_limit_rate + self.config.error_rate:
+                self.stats.errors += 1
+                return self.config.error_status
+        return None
+
+    def count(self, method: str, route: str) -> None:
+        key = f"{method} {route}"
+        with self._stats_lock:
+            self.stats.requests += 1
+            self.stats.by_endpoint[key] = self.stats.by_endpoint.get(key, 0) + 1
+
+    def stats_add(self, name: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            setattr(self.stats, name, getattr(self.stats, name) + amount)
+
+    # ---------- fixtures ----------
+
+    @staticmethod
+    def fixture_name(method: str, path: str, query: Dict[str, str]) -> str:
+        key = f"{method} {path}?{urlencode(sorted(query.items()))}"
+        return hashlib.sha1(key.encode()).hexdigest()[:20] + ".json"
+
+    def record(
+        self,
+        method: str,
+        path: str,
+        query: Dict[str, str],
+        status: int,
+        body: Any,
+        headers: Dict[str, str]
+    ) -> None:
+        os.makedirs(self.config.record_dir, exist_ok=True)
+        fixture = {
+            "method": method,
+            "path": path,
+            "query": query,
+            "status": status,
+            "headers": headers,
+            "body": body,
+        }
+        target = os.path.join(self.config.record_dir, self.fixture_name(method, path, query))
+        tmp_path = f"{target}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(fixture, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, target)
+        self.stats_add("recorded")
+
+    def fixture(self, method: str, path: str, query: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """A recorded response for this request, with URLs pointed at the mock."""
+        if not self.config.replay_dir:
+            return None
+        target = os.path.join(self.config.replay_dir, self.fixture_name(method, path, query))
+        try:
+            with open(target, encoding="utf-8") as f:
+                fixture = json.load(f)
+        except FileNotFoundError:
+            return None
+        self.stats_add("replayed")
+        fixture["body"] = self.rewrite(fixture["body"])
+        return fixture
+
+    def rewrite(self, body: Any) -> Any:
+        """Point absolute upstream URLs (next, href, ...) at this server."""
+        if body is None or isinstance(body, str):
+            return body
+        text = json.dumps(body).replace(self.config.upstream.rstrip("/") + "/v1", self.base_url)
+        return json.loads(text)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local mock of the Spotify Web API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8999)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--latency-jitter", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 5xx")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--playlist-size", type=int, default=100, help="items in each playlist")
+    parser.add_argument("--record", metavar="DIR", help="proxy to --upstream and save fixtures")
+    parser.add_argument("--replay", metavar="DIR", help="serve fixtures recorded with --record")
+    parser.add_argument("--upstream", default="https://api.spotify.com")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    config = MockConfig(
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        seed=args.seed,
+        default_playlist_size=args.playlist_size,
+        record_dir=args.record,
+        replay_dir=args.replay,
+        upstream=args.upstream,
+    )
+    server = MockSpotifyServer(config, args.host, args.port, verbose=args.verbose)
+    print(f"Mock Spotify API on {server.base_url} (token endpoint {server.auth_url})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,16 +5,25 @@ Spotify Audio Features 获取工具
 用于获取Spotify歌曲的音频特征数据
 """
 
-import requests
 import json
 import os
+import sys
 from dotenv import load_dotenv
 
+# 共享 token 缓存和连接配置由仓库根目录的 spotify_web_api_skill.py 提供
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from spotify_web_api_skill import build_session, get_cached_access_token
+
 # 加载环境变量
 load_dotenv()
 
-# 从环境变量获取 Access Token
-ACCESS_TOKEN = os.getenv('SPOTIFY_ACCESS_TOKEN')
+# 复用连接（keep-alive + gzip + 超时），避免每次请求重新握手 TLS
+SESSION = build_session()
+
+# 从环境变量获取 Access Token；未设置时复用共享 token 缓存（过期自动续期）
+ACCESS_TOKEN = os.getenv('SPOTIFY_ACCESS_TOKEN') or get_cached_access_token(
+    os.getenv('SPOTIFY_CLIENT_ID'), os.getenv('SPOTIFY_CLIENT_SECRET')
+)
 
 
 def get_audio_features(track_ids, access_token):
@@ -45,7 +54,7 @@ def get_audio_features(track_ids, access_token):
     }
     
     # 发送GET请求
-    response = requests.get(url, headers=headers, params=params)
+    response = SESSION.get(url, headers=headers, params=params)
     
     # 检查响应状态
     if response.status_code == 200:
@@ -91,6 +100,7 @@ if __name__ == "__main__":
         print("❌ 错误: 请设置环境变量 SPOTIFY_ACCESS_TOKEN")
         print("\n在 .env 文件中添加:")
         print("  SPOTIFY_ACCESS_TOKEN=your_access_token_here")
+        print("\n或添加 SPOTIFY_CLIENT_ID 和 SPOTIFY_CLIENT_SECRET，自动获取并缓存 token")
         exit(1)
     
     # 示例歌曲ID列表
@@ -2,8 +2,13 @@ import spotipy
 from spotipy.oauth2 import SpotifyOAuth
 import requests
 import os
+import sys
 from dotenv import load_dotenv
 
+# 共享 token 缓存由仓库根目录的 spotify_web_api_skill.py 提供
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from spotify_web_api_skill import FileTokenStore, TokenStoreCacheHandler
+
 # ================= 配置区域 =================
 # 从 .env 文件加载环境变量
 load_dotenv()
@@ -39,12 +44,13 @@ def main():
     scope = "playlist-read-private playlist-read-collaborative"
 
     # 1. 初始化认证管理器
+    # Token 存入共享缓存（按 client_id + scope 区分），其他脚本和 SpotifyAPI 可直接复用
     auth_manager = SpotifyOAuth(
         client_id=CLIENT_ID,
         client_secret=CLIENT_SECRET,
         redirect_uri=REDIRECT_URI,
         scope=scope,
-        cache_path=".spotify_cache",
+        cache_handler=TokenStoreCacheHandler(FileTokenStore(), CLIENT_ID, scope),
         open_browser=True
     )
 
@@ -1,13 +1,28 @@
-import requests
 import json
 import os
+import sys
 from dotenv import load_dotenv
 
+# 共享 token 缓存和连接配置由仓库根目录的 spotify_web_api_skill.py 提供
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from spotify_web_api_skill import build_session, get_cached_access_token
+
 # 加载环境变量
 load_dotenv()
 
+# 复用连接（keep-alive + gzip + 超时），避免每次请求重新握手 TLS
+SESSION = build_session()
+
 # 从环境变量获取配置
-ACCESS_TOKEN = os.getenv('SPOTIFY_ACCESS_TOKEN')
+CLIENT_ID = os.getenv('SPOTIFY_CLIENT_ID')
+CLIENT_SECRET = os.getenv('SPOTIFY_CLIENT_SECRET')
+# 未设置 Access Token 时复用共享 token 缓存：
+# 优先用 get_spotify_auth_token.py 登录后缓存的用户 token（可读私有歌单），否则用 Client Credentials
+ACCESS_TOKEN = (
+    os.getenv('SPOTIFY_ACCESS_TOKEN')
+    or get_cached_access_token(CLIENT_ID, CLIENT_SECRET, scope="playlist-read-private playlist-read-collaborative")
+    or get_cached_access_token(CLIENT_ID, CLIENT_SECRET)
+)
 TARGET_URL = os.getenv('SPOTIFY_PLAYLIST_URL', 'https://api.spotify.com/v1/playlists/4WwBzSY7IxPfQQlw2K7dLC')
 
 
@@ -23,7 +38,7 @@ def get_playlist_data(playlist_id, token):
     print(f"🔄 正在连接 API (ID: {playlist_id})...")
     
     try:
-        response = requests.get(api_url, headers=headers)
+        response = SESSION.get(api_url, headers=headers)
         if response.status_code != 200:
             print(f"❌ 请求失败: {response.status_code}")
             return
@@ -46,7 +61,7 @@ def get_playlist_data(playlist_id, token):
         
         while next_url:
             print(f"   正在下载... (当前: {len(all_items)})", end="\r")
-            res = requests.get(next_url, headers=headers)
+            res = SESSION.get(next_url, headers=headers)
             if res.status_code != 200: break
             page_data = res.json()
             
@@ -109,6 +124,7 @@ if __name__ == "__main__":
         print("❌ 错误: 请设置环境变量 SPOTIFY_ACCESS_TOKEN")
         print("\n在 .env 文件中添加:")
         print("  SPOTIFY_ACCESS_TOKEN=your_access_token_here")
+        print("\n或添加 SPOTIFY_CLIENT_ID 和 SPOTIFY_CLIENT_SECRET，自动获取并缓存 token")
         exit(1)
     
     pid = parse_spotify_link(TARGET_URL)
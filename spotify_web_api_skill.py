@@ -60,15 +60,63 @@ Example Usage:
     # Authorization Code Flow (for user data)
     spotify = SpotifyAPI(access_token="user_access_token")
     playlists = spotify.get_current_user_playlists()
+
+    # Async client (requires httpx)
+    async with AsyncSpotifyAPI(client_id="...", client_secret="...") as spotify:
+        albums = await asyncio.gather(*(spotify.get_album(i) for i in album_ids))
 """
 
+import asyncio
 import base64
+import contextvars
 import json
+import os
+import random
+import re
+import socket
+import sqlite3
+import sys
+import threading
 import time
-from typing import Dict, List, Optional, Union, Any
-from dataclasses import dataclass
+import unicodedata
+import weakref
+import zlib
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from contextlib import contextmanager, nullcontext
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union, Any
+from urllib.parse import parse_qsl, urlencode, urlsplit
+from dataclasses import dataclass, field
 from enum import Enum
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+try:
+    import httpx
+except ImportError:  # httpx is only needed by AsyncSpotifyAPI
+    httpx = None
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Optional faster JSON decoders, preferred in this order when installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
 
 
 class SpotifyError(Exception):
@@ -93,42 +141,2597 @@ class SpotifyForbiddenError(SpotifyError):
 class SpotifyRateLimitError(SpotifyError):
     """Exception for rate limit errors (429)."""
     
-    def __init__(self, message: str, retry_after: int = None):
-        super().__init__(message, status_code=429)
-        self.retry_after = retry_after
-
-
-class SpotifyNotFoundError(SpotifyError):
-    """Exception for not found errors (404)."""
-    pass
+    def __init__(self, message: str, retry_after: int = None):
+        super().__init__(message, status_code=429)
+        self.retry_after = retry_after
+
+
+class SpotifyNotFoundError(SpotifyError):
+    """Exception for not found errors (404)."""
+    pass
+
+
+class SearchType(Enum):
+    """Search types for the search endpoint."""
+    ALBUM = "album"
+    ARTIST = "artist"
+    PLAYLIST = "playlist"
+    TRACK = "track"
+    SHOW = "show"
+    EPISODE = "episode"
+    AUDIOBOOK = "audiobook"
+
+
+class RepeatState(Enum):
+    """Repeat states for playback."""
+    OFF = "off"
+    TRACK = "track"
+    CONTEXT = "context"
+
+
+class PlaylistProjection(Enum):
+    """Field presets for get_playlist and get_playlist_items."""
+    IDS_ONLY = "ids_only"
+    IMPORT_MINIMAL = "import_minimal"
+    FULL = "full"
+
+
+# Fields kept for each track by a projection (FULL keeps everything)
+_PROJECTION_TRACK_FIELDS = {
+    PlaylistProjection.IDS_ONLY: ["id", "uri"],
+    PlaylistProjection.IMPORT_MINIMAL: [
+        "id", "uri", "name", "duration_ms", "type",
+        {"artists": ["id", "name"]},
+        {"album": ["id", "name", "release_date"]},
+    ],
+}
+
+# Fields kept for the playlist itself by get_playlist
+_PROJECTION_PLAYLIST_FIELDS = {
+    PlaylistProjection.IDS_ONLY: ["id", "snapshot_id"],
+    PlaylistProjection.IMPORT_MINIMAL: [
+        "id", "name", "description", "snapshot_id",
+        {"owner": ["id", "display_name"]},
+    ],
+}
+
+# Paging fields every projection keeps so iteration still works
+_PAGING_FIELDS = ["next", "total", "limit", "offset"]
+
+
+def build_fields(spec: Union[str, List, Dict]) -> str:
+    """
+    Build a ``fields`` filter expression from a nested spec.
+    
+    Strings are field names, lists join their members with commas, and
+    dicts select sub-fields of a key.
+    
+    Example:
+        build_fields(["next", {"items": [{"track": ["name", "id", {"artists": ["name"]}]}]}])
+        # -> "next,items(track(name,id,artists(name)))"
+    """
+    if isinstance(spec, str):
+        return spec
+    if isinstance(spec, dict):
+        return ",".join(f"{key}({build_fields(value)})" for key, value in spec.items())
+    return ",".join(build_fields(member) for member in spec)
+
+
+def projection_fields(
+    projection: Union[str, PlaylistProjection],
+    playlist: bool = False
+) -> Optional[str]:
+    """
+    ``fields`` expression for a playlist projection preset.
+    
+    Args:
+        projection: A PlaylistProjection or its value ("ids_only", ...)
+        playlist: Build the expression for get_playlist (playlist fields plus
+                  its first page of items) instead of get_playlist_items
+    
+    Returns:
+        The filter expression, or None for FULL
+    """
+    projection = PlaylistProjection(projection)
+    if projection is PlaylistProjection.FULL:
+        return None
+    
+    track = _PROJECTION_TRACK_FIELDS[projection]
+    # Newer responses wrap the object in "item" rather than "track"
+    item = [{"track": track}, {"item": track}]
+    if projection is PlaylistProjection.IMPORT_MINIMAL:
+        item.insert(0, "added_at")
+    page = _PAGING_FIELDS + [{"items": item}]
+    if not playlist:
+        return build_fields(page)
+    
+    # Likewise the first page is nested under "items" (formerly "tracks")
+    return build_fields(_PROJECTION_PLAYLIST_FIELDS[projection] + [{"items": page}, {"tracks": page}])
+
+
+@dataclass
+class SpotifyCredentials:
+    """Spotify API credentials."""
+    client_id: Optional[str] = None
+    client_secret: Optional[str] = None
+    access_token: Optional[str] = None
+    refresh_token: Optional[str] = None
+    token_expires_at: Optional[float] = None
+
+
+def _normalize_scope(scope: Optional[str]) -> str:
+    """Canonical form of an OAuth scope string, so key order doesn't matter."""
+    return " ".join(sorted(set((scope or "").split())))
+
+
+class TokenStore(ABC):
+    """
+    Interface for token caches shared between clients.
+    
+    Entries are keyed by client ID and scope; Client Credentials tokens use
+    the empty scope. An entry is a dict with ``access_token``,
+    ``expires_at`` (epoch seconds) and optionally ``refresh_token`` and
+    ``scope``.
+    """
+    
+    @abstractmethod
+    def get(self, client_id: str, scope: str = "") -> Optional[Dict[str, Any]]:
+        ...
+    
+    @abstractmethod
+    def put(self, client_id: str, scope: str, entry: Dict[str, Any]) -> None:
+        ...
+    
+    @abstractmethod
+    def delete(self, client_id: str, scope: str = "") -> None:
+        ...
+    
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """Exclusive section in which at most one caller mints a token."""
+        yield
+
+
+class FileTokenStore(TokenStore):
+    """
+    Token cache in a JSON file, shared by every process on the machine.
+    
+    Short-lived scripts and parallel jobs pick up a token another process
+    already minted instead of each calling the accounts service at startup.
+    Renewal happens under an exclusive lock on a sibling ``.lock`` file, so
+    when many processes start with an expired token only the first one
+    fetches a new token and the rest read it from the file. The file is
+    replaced atomically and is readable only by its owner.
+    
+    Args:
+        path: Cache file; defaults to ``$SPOTIFY_TOKEN_CACHE`` or
+              ``~/.cache/spotify_web_api/tokens.json``
+    
+    Example:
+        spotify = SpotifyAPI(client_id="...", client_secret="...",
+                             token_store=FileTokenStore())
+    """
+    
+    DEFAULT_PATH = "~/.cache/spotify_web_api/tokens.json"
+    
+    def __init__(self, path: Optional[str] = None):
+        self.path = os.path.expanduser(
+            path or os.getenv("SPOTIFY_TOKEN_CACHE") or self.DEFAULT_PATH
+        )
+        self.lock_path = self.path + ".lock"
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+    
+    @staticmethod
+    def _key(client_id: str, scope: str) -> str:
+        return f"{client_id} {_normalize_scope(scope)}".rstrip()
+    
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+    
+    def _write(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, self.path)
+    
+    def get(self, client_id: str, scope: str = "") -> Optional[Dict[str, Any]]:
+        # Writers replace the file atomically, so reads need no lock
+        return self._read().get(self._key(client_id, scope))
+    
+    def put(self, client_id: str, scope: str, entry: Dict[str, Any]) -> None:
+        with self.lock():
+            entries = self._read()
+            entries[self._key(client_id, scope)] = entry
+            self._write(entries)
+    
+    def delete(self, client_id: str, scope: str = "") -> None:
+        with self.lock():
+            entries = self._read()
+            if entries.pop(self._key(client_id, scope), None) is not None:
+                self._write(entries)
+    
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        # Re-entrant within the process; the file lock serializes processes
+        with self._thread_lock:
+            if self._depth:
+                self._depth += 1
+                try:
+                    yield
+                finally:
+                    self._depth -= 1
+                return
+            
+            fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                else:
+                    msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                self._depth = 1
+                try:
+                    yield
+                finally:
+                    self._depth = 0
+                    if fcntl is not None:
+                        fcntl.flock(fd, fcntl.LOCK_UN)
+                    else:
+                        os.lseek(fd, 0, os.SEEK_SET)
+                        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+            finally:
+                os.close(fd)
+
+
+class TokenStoreCacheHandler:
+    """
+    spotipy cache handler backed by a TokenStore.
+    
+    Lets ``SpotifyOAuth`` share tokens with SpotifyAPI and the helper scripts
+    instead of keeping its own ``.spotify_cache`` file.
+    
+    Example:
+        auth = SpotifyOAuth(..., scope=scope,
+                            cache_handler=TokenStoreCacheHandler(FileTokenStore(), client_id, scope))
+    """
+    
+    def __init__(self, store: TokenStore, client_id: str, scope: str = ""):
+        self.store = store
+        self.client_id = client_id
+        self.scope = scope
+    
+    def get_cached_token(self) -> Optional[Dict[str, Any]]:
+        entry = self.store.get(self.client_id, self.scope)
+        if not entry:
+            return None
+        
+        # spotipy checks expiry itself and refreshes with refresh_token
+        return {
+            "access_token": entry["access_token"],
+            "token_type": "Bearer",
+            "expires_in": max(0, int(entry["expires_at"] - time.time())),
+            "expires_at": int(entry["expires_at"]),
+            "refresh_token": entry.get("refresh_token"),
+            "scope": entry.get("scope", self.scope),
+        }
+    
+    def save_token_to_cache(self, token_info: Dict[str, Any]) -> None:
+        self.store.put(self.client_id, self.scope, {
+            "access_token": token_info["access_token"],
+            "expires_at": token_info["expires_at"],
+            "refresh_token": token_info.get("refresh_token"),
+            "scope": token_info.get("scope", self.scope),
+        })
+
+
+class TokenManager:
+    """
+    Thread-safe owner of a client's access token.
+    
+    Every worker thread asks ``get_token()`` for the current token. When it
+    is about to expire, exactly one thread fetches a new one while the others
+    wait for it (single-flight). With ``background=True`` a daemon thread
+    renews the token well before expiry, so requests normally never wait on
+    the accounts service at all. Token requests reuse the client's pooled
+    session.
+    
+    The token is renewed with the refresh token when there is one, and
+    otherwise minted again via Client Credentials. With a ``store``, a valid
+    token cached by another client or process is adopted instead, and new
+    tokens are written back to it.
+    
+    Args:
+        credentials: Credentials updated in place as tokens are renewed
+        session: HTTP session used for token requests
+        auth_url: Spotify accounts token endpoint
+        auto_refresh: Whether expired tokens are renewed at all
+        background: Whether to renew tokens ahead of expiry on a daemon thread
+        store: Optional TokenStore shared with other clients and processes
+        scope: OAuth scope the token was granted for ("" for Client Credentials)
+    """
+    
+    # Foreground renewal happens this many seconds before expiry
+    REFRESH_MARGIN = 60
+    # Background renewal happens this long before expiry (at most half the lifetime)
+    BACKGROUND_MARGIN = 300
+    # Seconds between background attempts after a failed renewal
+    RETRY_INTERVAL = 10
+    
+    def __init__(
+        self,
+        credentials: SpotifyCredentials,
+        session: requests.Session,
+        auth_url: str,
+        auto_refresh: bool = True,
+        background: bool = True,
+        store: Optional[TokenStore] = None,
+        scope: str = ""
+    ):
+        self.credentials = credentials
+        self.session = session
+        self.auth_url = auth_url
+        self.auto_refresh = auto_refresh
+        self.background = background
+        self.store = store
+        self.scope = _normalize_scope(scope)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        # Wakes the background thread when the manager is garbage-collected
+        weakref.finalize(self, self._stop.set)
+        self._thread: Optional[threading.Thread] = None
+        self._issued_at: Optional[float] = None
+    
+    def can_refresh(self) -> bool:
+        """Whether a new token can be obtained without user interaction."""
+        c = self.credentials
+        return bool(c.refresh_token or (c.client_id and c.client_secret))
+    
+    def needs_refresh(self) -> bool:
+        """Whether the token is missing or about to expire and can be renewed."""
+        c = self.credentials
+        if not c.access_token:
+            return self.can_refresh()
+        if not (self.auto_refresh and c.token_expires_at and self.can_refresh()):
+            return False
+        return time.time() >= c.token_expires_at - self.REFRESH_MARGIN
+    
+    def get_token(self) -> str:
+        """Return a valid access token, renewing it first if necessary."""
+        if self.needs_refresh():
+            with self._lock:
+                # Another thread may have renewed it while we waited
+                if self.needs_refresh():
+                    self._renew()
+        
+        if not self.credentials.access_token:
+            raise SpotifyAuthError("No access token available")
+        return self.credentials.access_token
+    
+    def refresh(self, rejected_token: Optional[str] = None) -> str:
+        """
+        Force a new token, e.g. after a 401.
+        
+        If ``rejected_token`` has already been replaced by another thread,
+        that replacement is returned instead of fetching yet another token.
+        """
+        with self._lock:
+            if rejected_token is None or self.credentials.access_token == rejected_token:
+                self._renew()
+        return self.credentials.access_token
+    
+    def adopt_stored_token(self) -> bool:
+        """
+        Take over a valid token from the store, if it holds one we aren't
+        already using. Returns whether a token was adopted.
+        """
+        if self.store is None or not self.credentials.client_id:
+            return False
+        
+        entry = self.store.get(self.credentials.client_id, self.scope)
+        if not entry or entry.get("access_token") == self.credentials.access_token:
+            return False
+        if entry.get("refresh_token"):
+            # Keep a rotated refresh token even if the access token is stale
+            self.credentials.refresh_token = entry["refresh_token"]
+        if entry["expires_at"] - time.time() <= self.REFRESH_MARGIN:
+            return False
+        
+        self._issued_at = time.time()
+        self.credentials.access_token = entry["access_token"]
+        self.credentials.token_expires_at = entry["expires_at"]
+        self._start_background()
+        return True
+    
+    def store_lock(self):
+        """The store's cross-process lock, or a no-op without a store."""
+        return self.store.lock() if self.store is not None else nullcontext()
+    
+    def _renew(self) -> None:
+        """Obtain a new token, from the store if possible. Caller holds the lock."""
+        # Other processes block here while one of them mints the token
+        with self.store_lock():
+            if not self.adopt_stored_token():
+                self._fetch()
+    
+    def _fetch(self) -> None:
+        """Fetch a new token with whichever grant is available."""
+        if self.credentials.refresh_token:
+            self.refresh_user_token()
+        elif self.credentials.client_id and self.credentials.client_secret:
+            self.fetch_client_credentials_token()
+        else:
+            raise SpotifyAuthError("No refresh token available")
+    
+    def fetch_client_credentials_token(self) -> None:
+        """
+        Obtain access token using Client Credentials Flow.
+        
+        This flow is suitable for accessing public data only.
+        For user data, use Authorization Code Flow.
+        """
+        self._request_token(
+            {"grant_type": "client_credentials"},
+            "Failed to obtain access token"
+        )
+    
+    def refresh_user_token(self) -> None:
+        """Refresh the access token using the refresh token."""
+        if not self.credentials.refresh_token:
+            raise SpotifyAuthError("No refresh token available")
+        
+        self._request_token(
+            {
+                "grant_type": "refresh_token",
+                "refresh_token": self.credentials.refresh_token
+            },
+            "Failed to refresh access token"
+        )
+    
+    def _request_token(self, data: Dict[str, str], error_message: str) -> None:
+        credentials = base64.b64encode(
+            f"{self.credentials.client_id}:{self.credentials.client_secret}".encode()
+        ).decode()
+        
+        headers = {
+            "Authorization": f"Basic {credentials}",
+            "Content-Type": "application/x-www-form-urlencoded"
+        }
+        
+        response = self.session.post(self.auth_url, headers=headers, data=data)
+        
+        if response.status_code != 200:
+            raise SpotifyAuthError(
+                f"{error_message}: {response.text}",
+                status_code=response.status_code
+            )
+        
+        token_data = response.json()
+        self._issued_at = time.time()
+        self.credentials.access_token = token_data["access_token"]
+        self.credentials.token_expires_at = self._issued_at + token_data["expires_in"]
+        
+        # Update refresh token if provided
+        if "refresh_token" in token_data:
+            self.credentials.refresh_token = token_data["refresh_token"]
+        
+        if self.store is not None and self.credentials.client_id:
+            self.store.put(self.credentials.client_id, self.scope, {
+                "access_token": self.credentials.access_token,
+                "expires_at": self.credentials.token_expires_at,
+                "refresh_token": self.credentials.refresh_token,
+                "scope": token_data.get("scope", self.scope),
+            })
+        
+        self._start_background()
+    
+    def obtain_client_credentials_token(self) -> None:
+        """Adopt a stored Client Credentials token or fetch a new one."""
+        with self._lock, self.store_lock():
+            if not self.adopt_stored_token():
+                self.fetch_client_credentials_token()
+    
+    def renew_user_token(self) -> None:
+        """refresh_user_token(), serialized with the other renewals."""
+        with self._lock:
+            self.refresh_user_token()
+    
+    def _start_background(self) -> None:
+        if not (self.background and self.auto_refresh) or self._stop.is_set():
+            return
+        if self._thread is None or not self._thread.is_alive():
+            # The thread holds only a weak reference, so a manager whose client
+            # is garbage-collected without close() stops renewing as well
+            self._thread = threading.Thread(
+                target=TokenManager._background_loop,
+                args=(weakref.ref(self), self._stop),
+                name="spotify-token-refresh",
+                daemon=True
+            )
+            self._thread.start()
+    
+    @staticmethod
+    def _background_loop(ref: "weakref.ref[TokenManager]", stop: threading.Event) -> None:
+        while not stop.is_set():
+            manager = ref()
+            if manager is None:
+                return
+            delay = manager._background_step()
+            del manager
+            if delay is None:
+                return
+            stop.wait(delay)
+    
+    def _background_step(self) -> Optional[float]:
+        """Renew the token if it is due; returns seconds until the next check (None = exit)."""
+        expires_at = self.credentials.token_expires_at
+        if expires_at is None or not self.can_refresh():
+            return None
+        
+        lifetime = expires_at - (self._issued_at or time.time())
+        due = expires_at - min(self.BACKGROUND_MARGIN, lifetime / 2)
+        if time.time() < due:
+            # Re-check afterwards: a foreground renewal may have moved the expiry
+            return due - time.time()
+        
+        try:
+            with self._lock:
+                if self.credentials.token_expires_at == expires_at:
+                    self._renew()
+        except (SpotifyError, requests.RequestException):
+            # The foreground path will raise if this keeps failing
+            return self.RETRY_INTERVAL
+        return 0.0
+    
+    def stop(self) -> None:
+        """Stop the background renewal thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+
+
+class RateLimiter:
+    """
+    Client-side token-bucket rate limiter with a shared pause.
+    
+    Every request takes one token; tokens refill at ``rate`` per second up to
+    ``burst``. When Spotify answers 429, ``pause()`` holds back every worker
+    sharing the limiter until Retry-After has passed, and each worker adds a
+    little jitter so they don't all resume at the same instant.
+    
+    Args:
+        rate: Sustained requests per second (None disables the token bucket,
+              leaving only the shared pause)
+        burst: Maximum number of requests that may be sent back-to-back
+               (defaults to one second's worth of tokens)
+        jitter: Upper bound in seconds of the random delay added when a
+                worker resumes after a pause
+    """
+    
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: Optional[int] = None,
+        jitter: float = 0.5
+    ):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate or 1))
+        self.jitter = jitter
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+    
+    def reserve(self) -> float:
+        """Take a token and return how many seconds to wait before sending."""
+        with self._lock:
+            now = time.monotonic()
+            delay = 0.0
+            if self.rate:
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                self._tokens -= 1
+                if self._tokens < 0:
+                    delay = -self._tokens / self.rate
+            return max(delay, self._pause_delay(now))
+    
+    def pause(self, seconds: float) -> None:
+        """Hold back all requests for ``seconds`` (e.g. after a 429)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+    
+    def _pause_delay(self, now: float) -> float:
+        if self._paused_until <= now:
+            return 0.0
+        return self._paused_until - now + random.uniform(0, self.jitter)
+    
+    def acquire(self) -> float:
+        """Block until a request may be sent. Returns the seconds spent waiting."""
+        waited = 0.0
+        delay = self.reserve()
+        while delay > 0:
+            time.sleep(delay)
+            waited += delay
+            # A 429 elsewhere may have paused everyone while we slept
+            delay = self._pause_delay(time.monotonic())
+        return waited
+    
+    async def acquire_async(self) -> float:
+        """Asynchronous variant of acquire() for use on an event loop."""
+        waited = 0.0
+        delay = self.reserve()
+        while delay > 0:
+            await asyncio.sleep(delay)
+            waited += delay
+            delay = self._pause_delay(time.monotonic())
+        return waited
+
+
+@dataclass
+class RetryPolicy:
+    """
+    When and how long to wait before retrying a failed request.
+    
+    429 responses are always retried after Retry-After. 5xx responses and
+    connection errors are retried with jittered exponential backoff, but
+    only for idempotent methods, so a POST is never sent twice.
+    """
+    max_retries: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
+    retry_statuses: tuple = (500, 502, 503, 504)
+    idempotent_methods: tuple = ("GET", "HEAD", "PUT", "DELETE")
+    
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given (zero-based) attempt."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+
+@dataclass
+class TransportConfig:
+    """
+    Connection settings for a client's HTTP session.
+    
+    The pool holds one keep-alive connection per worker by default, so a
+    fan-out never queues for a socket or keeps re-doing TLS handshakes.
+    Every request gets connect and read timeouts, so a dead socket raises
+    (and is retried) instead of hanging a worker forever. TCP keep-alive
+    probes detect connections that were dropped silently while idle.
+    
+    ``http2`` only applies to AsyncSpotifyAPI (httpx with the ``h2``
+    package); requests cannot speak HTTP/2, so the sync client stays on
+    HTTP/1.1 and relies on the pool instead.
+    
+    Args:
+        pool_maxsize: Connections kept per host (None = the client's concurrency)
+        connect_timeout: Seconds to establish a connection
+        read_timeout: Seconds to wait for the server between bytes
+        compression: Ask for gzip/deflate-compressed responses
+        keepalive: Enable TCP keep-alive probes on pooled sockets
+        keepalive_idle: Idle seconds before the first probe
+        keepalive_interval: Seconds between probes
+        keepalive_count: Failed probes before the connection is dropped
+        http2: Multiplex requests over one connection (async client only)
+    
+    Example:
+        spotify = SpotifyAPI(..., max_workers=32,
+                             transport=TransportConfig(read_timeout=10))
+    """
+    pool_maxsize: Optional[int] = None
+    connect_timeout: float = 5.0
+    read_timeout: float = 30.0
+    compression: bool = True
+    keepalive: bool = True
+    keepalive_idle: int = 60
+    keepalive_interval: int = 10
+    keepalive_count: int = 3
+    http2: bool = False
+    
+    @property
+    def timeout(self) -> Tuple[float, float]:
+        """(connect, read) timeout tuple in the form requests expects."""
+        return (self.connect_timeout, self.read_timeout)
+    
+    def socket_options(self) -> List[tuple]:
+        """Socket options for new connections (TCP_NODELAY plus keep-alive)."""
+        options = list(HTTPConnection.default_socket_options)
+        if not self.keepalive:
+            return options
+        
+        options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+        # Probe tuning is platform specific; skip what the OS doesn't have
+        for name, value in (
+            ("TCP_KEEPIDLE", self.keepalive_idle),
+            ("TCP_KEEPINTVL", self.keepalive_interval),
+            ("TCP_KEEPCNT", self.keepalive_count),
+        ):
+            if hasattr(socket, name):
+                options.append((socket.IPPROTO_TCP, getattr(socket, name), value))
+        return options
+    
+    def headers(self) -> Dict[str, str]:
+        """Default headers for every request."""
+        return {"Accept-Encoding": "gzip, deflate" if self.compression else "identity"}
+    
+    def build_session(self, concurrency: int = 10) -> requests.Session:
+        """Create a requests.Session using these settings."""
+        session = requests.Session()
+        session.headers.update(self.headers())
+        adapter = _TransportAdapter(
+            self,
+            # accounts.spotify.com and api.spotify.com
+            pool_connections=2,
+            pool_maxsize=self.pool_maxsize or concurrency
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+    
+    def httpx_options(self, concurrency: int = 100) -> Dict[str, Any]:
+        """Keyword arguments for ``httpx.AsyncClient`` using these settings."""
+        size = self.pool_maxsize or concurrency
+        limits = httpx.Limits(max_connections=size, max_keepalive_connections=size)
+        return {
+            "headers": self.headers(),
+            "timeout": httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+            "transport": httpx.AsyncHTTPTransport(
+                http2=self.http2,
+                limits=limits,
+                socket_options=self.socket_options()
+            ),
+        }
+
+
+class _TransportAdapter(HTTPAdapter):
+    """HTTPAdapter with default timeouts and socket options from a TransportConfig."""
+    
+    def __init__(self, config: TransportConfig, **kwargs):
+        self.transport = config
+        super().__init__(**kwargs)
+    
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = self.transport.socket_options()
+        super().init_poolmanager(*args, **kwargs)
+    
+    def send(self, request, timeout=None, **kwargs):
+        if timeout is None:
+            timeout = self.transport.timeout
+        return super().send(request, timeout=timeout, **kwargs)
+
+
+def build_session(
+    transport: Optional[TransportConfig] = None,
+    concurrency: int = 10
+) -> requests.Session:
+    """
+    Create a pooled requests.Session with timeouts, compression and
+    keep-alive, for scripts that call the API with plain requests.
+    """
+    return (transport or TransportConfig()).build_session(concurrency)
+
+
+def _parse_retry_after(value: Optional[str], default: float = 1.0) -> float:
+    """Parse a Retry-After header given either in seconds or as an HTTP date."""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+
+JSON_DECODERS = ("orjson", "msgspec", "json")
+
+
+def get_json_decoder(name: Optional[str] = None) -> Callable[[bytes], Any]:
+    """
+    Return a function decoding a JSON document from raw bytes.
+    
+    Args:
+        name: "orjson", "msgspec" or "json" (stdlib); None picks the fastest
+              one installed, falling back to the stdlib
+    
+    Raises:
+        ImportError: If the named library is not installed
+        ValueError: If the name is unknown
+    """
+    if name is None:
+        name = "orjson" if orjson is not None else "msgspec" if msgspec is not None else "json"
+    
+    if name == "orjson":
+        if orjson is None:
+            raise ImportError("The orjson decoder requires orjson (pip install orjson)")
+        return orjson.loads
+    if name == "msgspec":
+        if msgspec is None:
+            raise ImportError("The msgspec decoder requires msgspec (pip install msgspec)")
+        return msgspec.json.decode
+    if name == "json":
+        return json.loads
+    raise ValueError(f"Unknown JSON decoder {name!r}; expected one of {', '.join(JSON_DECODERS)}")
+
+
+_json_loads = get_json_decoder()
+
+
+@dataclass
+class CacheEntry:
+    """A cached response body, the time (epoch seconds) it expires and its ETag."""
+    value: Any
+    expires_at: float
+    etag: Optional[str] = None
+    
+    def is_fresh(self) -> bool:
+        return self.expires_at > time.time()
+
+
+@dataclass
+class CacheStats:
+    """Counters reported by ResponseCache.stats."""
+    hits: int = 0
+    misses: int = 0
+    revalidations: int = 0
+    evictions: int = 0
+    size: int = 0
+
+
+class CacheBackend(ABC):
+    """
+    Storage interface used by ResponseCache.
+    
+    Subclass this to keep responses somewhere other than process memory.
+    Implementations must be safe to call from several threads.
+    """
+    
+    evictions: int = 0
+    
+    @abstractmethod
+    def get(self, key: str) -> Optional[CacheEntry]:
+        ...
+    
+    @abstractmethod
+    def set(self, key: str, entry: CacheEntry) -> None:
+        ...
+    
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+    
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+    
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    Bounded in-memory LRU store.
+    
+    Args:
+        max_entries: Number of responses kept before the least recently used
+                     one is evicted
+    """
+    
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+    
+    def set(self, key: str, entry: CacheEntry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    Persistent cache store in a SQLite file, shared across processes.
+    
+    Cron jobs and CLI scripts that point at the same file reuse each other's
+    responses, so a warm restart barely touches the API. The database runs in
+    WAL mode, so several processes can read while one writes. Bodies are
+    stored as zlib-compressed compact JSON, next to their ETag. Once the file holds more than
+    ``max_entries`` rows, expired rows are dropped first and then the least
+    recently read ones. Read times are tracked to the minute and written in
+    batches, so cache hits don't contend for the write lock.
+    
+    Args:
+        path: Database file (created if missing)
+        max_entries: Number of responses kept before eviction
+        timeout: Seconds to wait for another process's write lock
+    
+    Example:
+        cache = ResponseCache(backend=SQLiteCacheBackend("~/.cache/spotify.sqlite"))
+    """
+    
+    # Check the size bound every N writes rather than on every insert
+    PRUNE_INTERVAL = 100
+    # A hit only refreshes accessed_at if it is older than this (seconds)
+    ACCESS_RESOLUTION = 60.0
+    # Refreshed read times are written together once this many are pending
+    ACCESS_BATCH = 256
+    
+    def __init__(self, path: str, max_entries: int = 100_000, timeout: float = 30.0):
+        self.path = os.path.expanduser(path)
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.evictions = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._accessed: Dict[str, float] = {}
+        
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " value BLOB NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL,"
+            " etag TEXT)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)"
+        )
+        # Files created before ETags were stored lack the column
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(responses)")}
+        if "etag" not in columns:
+            conn.execute("ALTER TABLE responses ADD COLUMN etag TEXT")
+    
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread; sqlite3 connections can't be shared."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+    
+    @staticmethod
+    def _encode(value: Any) -> bytes:
+        return zlib.compress(json.dumps(value, separators=(",", ":")).encode())
+    
+    @staticmethod
+    def _decode(blob: bytes) -> Any:
+        return _json_loads(zlib.decompress(blob))
+    
+    def get(self, key: str) -> Optional[CacheEntry]:
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT value, expires_at, etag, accessed_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        
+        now = time.time()
+        if now - row[3] >= self.ACCESS_RESOLUTION:
+            with self._lock:
+                self._accessed[key] = now
+                flush = len(self._accessed) >= self.ACCESS_BATCH
+            if flush:
+                self.flush_access_times()
+        return CacheEntry(self._decode(row[0]), row[1], row[2])
+    
+    def flush_access_times(self) -> None:
+        """Write pending read times in one transaction."""
+        with self._lock:
+            accessed, self._accessed = self._accessed, {}
+        if not accessed:
+            return
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN")
+            conn.executemany(
+                "UPDATE responses SET accessed_at = MAX(accessed_at, ?) WHERE key = ?",
+                [(at, key) for key, at in accessed.items()]
+            )
+    
+    def set(self, key: str, entry: CacheEntry) -> None:
+        self._conn().execute(
+            "INSERT OR REPLACE INTO responses (key, value, expires_at, accessed_at, etag)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (key, self._encode(entry.value), entry.expires_at, time.time(), entry.etag)
+        )
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % self.PRUNE_INTERVAL == 0
+        if prune:
+            self.prune()
+    
+    def delete(self, key: str) -> None:
+        self._conn().execute("DELETE FROM responses WHERE key = ?", (key,))
+    
+    def clear(self) -> None:
+        self._conn().execute("DELETE FROM responses")
+    
+    def prune(self) -> None:
+        """Drop expired rows, then the least recently read ones beyond max_entries."""
+        conn = self._conn()
+        if len(self) <= self.max_entries:
+            return
+        
+        self.flush_access_times()
+        # Stale rows with an ETag can still be revalidated, so keep them longest
+        expired = conn.execute(
+            "DELETE FROM responses WHERE expires_at <= ? AND etag IS NULL", (time.time(),)
+        ).rowcount
+        excess = len(self) - self.max_entries
+        evicted = 0
+        if excess > 0:
+            evicted = conn.execute(
+                "DELETE FROM responses WHERE key IN"
+                " (SELECT key FROM responses ORDER BY accessed_at LIMIT ?)",
+                (excess,)
+            ).rowcount
+        with self._lock:
+            self.evictions += expired + evicted
+    
+    def close(self) -> None:
+        """Write pending read times and close this thread's connection."""
+        self.flush_access_times()
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+    
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+class ResponseCache:
+    """
+    Response cache for idempotent GETs.
+    
+    Responses are keyed by endpoint plus sorted query params (so ``market``
+    is part of the key) and kept for a per-resource TTL. Only resources listed
+    in ``ttls`` are cached. Once an entry goes stale, the next request
+    revalidates it with If-None-Match and its ETag; a 304 renews the TTL and
+    serves the cached body without downloading it again.
+    
+    Playlists use a TTL of 0: every read is revalidated, which keeps polling
+    correct while skipping unchanged payloads. Other user data under /me is
+    never cached. Cached bodies are shared between callers and must not be
+    mutated.
+    
+    Args:
+        backend: Where entries are stored (default: in-memory LRU)
+        ttls: TTL overrides in seconds, keyed by resource ("albums", "artists",
+              "me/playlists", ...). None disables caching for that resource;
+              0 caches it but revalidates on every read.
+        max_entries: Size of the default in-memory backend
+    
+    Example:
+        cache = ResponseCache(ttls={"artists": 600})
+        spotify = SpotifyAPI(client_id="...", client_secret="...", cache=cache)
+        spotify.get_artist("0TnOYISbd1XYRBk9myaseg")  # network
+        spotify.get_artist("0TnOYISbd1XYRBk9myaseg")  # cache
+        print(cache.stats)
+    """
+    
+    DEFAULT_TTLS = {
+        "albums": 24 * 3600,
+        "artists": 3600,  # followers and popularity drift
+        "tracks": 24 * 3600,
+        "shows": 3600,
+        "episodes": 24 * 3600,
+        "audiobooks": 24 * 3600,
+        "chapters": 24 * 3600,
+        "playlists": 0,
+        "me/playlists": 0,
+    }
+    
+    def __init__(
+        self,
+        backend: Optional[CacheBackend] = None,
+        ttls: Optional[Dict[str, float]] = None,
+        max_entries: int = 2048
+    ):
+        self.backend = backend if backend is not None else MemoryCacheBackend(max_entries)
+        self.ttls = {**self.DEFAULT_TTLS, **(ttls or {})}
+        self._hits = 0
+        self._misses = 0
+        self._revalidations = 0
+        self._lock = threading.Lock()
+    
+    def ttl_for(self, endpoint: str) -> Optional[float]:
+        """TTL in seconds for an endpoint (None if it isn't cacheable)."""
+        segments = endpoint.lstrip("/").split("/")
+        # "me/playlists" is more specific than "me"
+        for resource in ("/".join(segments[:2]), segments[0]):
+            if resource in self.ttls:
+                return self.ttls[resource]
+        return None
+    
+    def key_for(self, endpoint: str, params: Optional[Dict] = None) -> Optional[str]:
+        """Cache key for a GET request, or None if the endpoint isn't cacheable."""
+        if self.ttl_for(endpoint) is None:
+            return None
+        query = sorted((k, str(v)) for k, v in (params or {}).items() if v is not None)
+        return f"{endpoint}?{urlencode(query)}" if query else endpoint
+    
+    def lookup(self, key: str) -> Optional[CacheEntry]:
+        """
+        Return the entry for ``key`` if it is fresh or can be revalidated.
+        
+        Fresh entries count as hits. Anything else counts as a miss, including
+        a stale entry that is returned so its ETag can be revalidated.
+        """
+        entry = self.backend.get(key)
+        if entry is not None and not entry.is_fresh() and not entry.etag:
+            self.backend.delete(key)
+            entry = None
+        
+        with self._lock:
+            if entry is not None and entry.is_fresh():
+                self._hits += 1
+            else:
+                self._misses += 1
+        return entry
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached body for ``key`` if present and fresh."""
+        entry = self.lookup(key)
+        return entry.value if entry is not None and entry.is_fresh() else None
+    
+    def set(self, key: str, endpoint: str, value: Any, etag: Optional[str] = None) -> None:
+        """Store a response body under ``key`` with the endpoint's TTL."""
+        self.backend.set(key, CacheEntry(value, time.time() + (self.ttl_for(endpoint) or 0), etag))
+    
+    def revalidated(self, key: str, endpoint: str, entry: CacheEntry) -> None:
+        """Renew the TTL of an entry the server confirmed with 304 Not Modified."""
+        with self._lock:
+            self._revalidations += 1
+        self.set(key, endpoint, entry.value, entry.etag)
+    
+    def clear(self) -> None:
+        self.backend.clear()
+    
+    @property
+    def stats(self) -> CacheStats:
+        """Hit, miss and eviction counters plus the current number of entries."""
+        return CacheStats(
+            hits=self._hits,
+            misses=self._misses,
+            revalidations=self._revalidations,
+            evictions=self.backend.evictions,
+            size=len(self.backend)
+        )
+
+
+# Path segments followed by a resource ID (/albums/{id}, /users/{id}, ...)
+_ID_COLLECTIONS = frozenset({
+    "albums", "artists", "audiobooks", "categories", "chapters",
+    "episodes", "playlists", "shows", "tracks", "users"
+})
+
+
+def endpoint_template(endpoint: str) -> str:
+    """
+    Replace resource IDs in an endpoint path with ``{id}``.
+    
+    ``/playlists/37i9dQZF1DXcBWIGoYBM5M/items`` becomes
+    ``/playlists/{id}/items``, so metrics group by endpoint rather than by
+    resource. ``/me/...`` paths have no IDs and are returned unchanged.
+    """
+    segments = endpoint.split("/")
+    for i in range(2, len(segments)):
+        if segments[i - 1] in _ID_COLLECTIONS and segments[i - 2] != "me":
+            segments[i] = "{id}"
+    return "/".join(segments)
+
+
+@dataclass
+class RequestEvent:
+    """
+    What happened during one API call, passed to every request hook.
+    
+    ``latency`` covers the whole call including retries, backoff and
+    rate-limit waits; ``rate_limit_wait`` is the part spent waiting on the
+    RateLimiter (including 429 pauses). ``cache`` is "hit", "miss" or
+    "revalidated" for cacheable requests and None otherwise. ``status`` is
+    None for cache hits and connection errors. ``coalesced`` calls shared
+    the response of an identical GET already in flight and sent nothing.
+    """
+    method: str
+    endpoint: str
+    status: Optional[int] = None
+    bytes: int = 0
+    latency: float = 0.0
+    retries: int = 0
+    cache: Optional[str] = None
+    rate_limit_wait: float = 0.0
+    error: Optional[str] = None
+    coalesced: bool = False
+    started: float = field(default_factory=time.perf_counter, repr=False)
+
+
+class RequestMetrics:
+    """
+    In-memory request hook with per-endpoint counters and latency histograms.
+    
+    Add an instance to a client's ``hooks`` and export the numbers as
+    Prometheus text (``to_prometheus()``) or JSON (``to_json()``). Series are
+    keyed by method and endpoint template.
+    
+    Example:
+        metrics = RequestMetrics()
+        spotify = SpotifyAPI(..., hooks=[metrics])
+        ...
+        print(metrics.to_prometheus())
+    """
+    
+    # Histogram bucket upper bounds in seconds
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, prefix: str = "spotify_api"):
+        self.buckets = tuple(sorted(buckets))
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    
+    def _new_series(self) -> Dict[str, Any]:
+        return {
+            "requests": 0,
+            "errors": 0,
+            "statuses": {},
+            "bytes": 0,
+            "retries": 0,
+            "cache_hits": 0,
+            "cache_misses": 0,
+            "cache_revalidations": 0,
+            "coalesced": 0,
+            "rate_limit_wait_seconds": 0.0,
+            "latency_sum": 0.0,
+            # One count per bucket plus the +Inf overflow bucket
+            "latency_buckets": [0] * (len(self.buckets) + 1),
+        }
+    
+    def __call__(self, event: RequestEvent) -> None:
+        bucket = bisect_left(self.buckets, event.latency)
+        with self._lock:
+            series = self._series.get((event.method, event.endpoint))
+            if series is None:
+                series = self._series[(event.method, event.endpoint)] = self._new_series()
+            
+            series["requests"] += 1
+            if event.error is not None or (event.status or 0) >= 400:
+                series["errors"] += 1
+            if event.status is not None:
+                status = str(event.status)
+                series["statuses"][status] = series["statuses"].get(status, 0) + 1
+            series["bytes"] += event.bytes
+            series["retries"] += event.retries
+            if event.cache == "hit":
+                series["cache_hits"] += 1
+            elif event.cache == "miss":
+                series["cache_misses"] += 1
+            elif event.cache == "revalidated":
+                series["cache_revalidations"] += 1
+            if event.coalesced:
+                series["coalesced"] += 1
+            series["rate_limit_wait_seconds"] += event.rate_limit_wait
+            series["latency_sum"] += event.latency
+            series["latency_buckets"][bucket] += 1
+    
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Snapshot of all series, with cumulative histogram buckets."""
+        with self._lock:
+            series = [(key, dict(value, statuses=dict(value["statuses"]),
+                                 latency_buckets=list(value["latency_buckets"])))
+                      for key, value in sorted(self._series.items())]
+        
+        endpoints = []
+        for (method, endpoint), values in series:
+            counts = values.pop("latency_buckets")
+            cumulative, running = {}, 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                running += count
+                cumulative["+Inf" if bound == float("inf") else str(bound)] = running
+            values["latency_buckets"] = cumulative
+            endpoints.append({"method": method, "endpoint": endpoint, **values})
+        return {"endpoints": endpoints}
+    
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.to_dict(), **kwargs)
+    
+    def to_prometheus(self) -> str:
+        """Render all series in the Prometheus text exposition format."""
+        p = self.prefix
+        counters = (
+            ("requests", "requests_total", "Requests sent or served from cache"),
+            ("errors", "errors_total", "Requests that failed"),
+            ("bytes", "response_bytes_total", "Response body bytes received"),
+            ("retries", "retries_total", "Retried attempts"),
+            ("cache_hits", "cache_hits_total", "Requests served from the response cache"),
+            ("cache_misses", "cache_misses_total", "Cacheable requests sent to the API"),
+            ("cache_revalidations", "cache_revalidations_total", "Stale entries confirmed by a 304"),
+            ("coalesced", "coalesced_total", "GETs that shared an identical in-flight request"),
+            ("rate_limit_wait_seconds", "rate_limit_wait_seconds_total", "Time spent waiting on the rate limiter"),
+        )
+        endpoints = self.to_dict()["endpoints"]
+        
+        def labels(series: Dict[str, Any], **extra: str) -> str:
+            pairs = {"method": series["method"], "endpoint": series["endpoint"], **extra}
+            return ",".join(f'{k}="{v}"' for k, v in pairs.items())
+        
+        lines = []
+        for key, name, help_text in counters:
+            lines.append(f"# HELP {p}_{name} {help_text}")
+            lines.append(f"# TYPE {p}_{name} counter")
+            lines.extend(f"{p}_{name}{{{labels(e)}}} {e[key]}" for e in endpoints)
+        
+        lines.append(f"# HELP {p}_responses_total Responses by HTTP status")
+        lines.append(f"# TYPE {p}_responses_total counter")
+        for e in endpoints:
+            for status, count in sorted(e["statuses"].items()):
+                lines.append(f"{p}_responses_total{{{labels(e, status=status)}}} {count}")
+        
+        lines.append(f"# HELP {p}_request_duration_seconds Request latency including retries")
+        lines.append(f"# TYPE {p}_request_duration_seconds histogram")
+        for e in endpoints:
+            for bound, count in e["latency_buckets"].items():
+                lines.append(f"{p}_request_duration_seconds_bucket{{{labels(e, le=bound)}}} {count}")
+            lines.append(f"{p}_request_duration_seconds_sum{{{labels(e)}}} {e['latency_sum']}")
+            lines.append(f"{p}_request_duration_seconds_count{{{labels(e)}}} {e['requests']}")
+        return "\n".join(lines) + "\n"
+
+
+class PlaylistStore(ABC):
+    """
+    Local copies of playlists used by SpotifyAPI.sync_playlist.
+    
+    A stored copy is a dict with the playlist's ``snapshot_id`` and its
+    ``items`` (playlist track objects, in order).
+    """
+    
+    @abstractmethod
+    def load(self, playlist_id: str) -> Optional[Dict[str, Any]]:
+        ...
+    
+    @abstractmethod
+    def save(self, playlist_id: str, playlist: Dict[str, Any]) -> None:
+        ...
+
+
+class MemoryPlaylistStore(PlaylistStore):
+    """Keeps playlist copies in a dict for the lifetime of the process."""
+    
+    def __init__(self):
+        self._playlists: Dict[str, Dict[str, Any]] = {}
+    
+    def load(self, playlist_id: str) -> Optional[Dict[str, Any]]:
+        return self._playlists.get(playlist_id)
+    
+    def save(self, playlist_id: str, playlist: Dict[str, Any]) -> None:
+        self._playlists[playlist_id] = playlist
+
+
+class JSONPlaylistStore(PlaylistStore):
+    """
+    Keeps each playlist copy in ``<directory>/<playlist_id>.json``.
+    
+    Files are replaced atomically, so an interrupted sync never leaves a
+    half-written copy behind.
+    """
+    
+    def __init__(self, directory: str):
+        self.directory = os.path.expanduser(directory)
+        os.makedirs(self.directory, exist_ok=True)
+    
+    def _path(self, playlist_id: str) -> str:
+        return os.path.join(self.directory, f"{playlist_id}.json")
+    
+    def load(self, playlist_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(playlist_id), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+    
+    def save(self, playlist_id: str, playlist: Dict[str, Any]) -> None:
+        path = self._path(playlist_id)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(playlist, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+
+@dataclass
+class PlaylistDiff:
+    """
+    Changes between the stored copy of a playlist and its current contents.
+    
+    Positions are zero-based. ``removed`` uses positions in the old copy,
+    ``added`` uses positions in the new one, and ``moved`` holds
+    (old position, new position, item) for items that changed their
+    relative order.
+    """
+    playlist_id: str
+    snapshot_id: Optional[str]
+    previous_snapshot_id: Optional[str] = None
+    added: List[Tuple[int, Dict[str, Any]]] = field(default_factory=list)
+    removed: List[Tuple[int, Dict[str, Any]]] = field(default_factory=list)
+    moved: List[Tuple[int, int, Dict[str, Any]]] = field(default_factory=list)
+    
+    @property
+    def changed(self) -> bool:
+        return self.snapshot_id != self.previous_snapshot_id
+
+
+def _item_uri(item: Dict[str, Any]) -> Optional[str]:
+    """URI of the track or episode wrapped by a playlist item."""
+    entry = item.get("track") or item.get("item") or {}
+    return entry.get("uri")
+
+
+def _contains_run(items: List[Optional[str]], run: List[str]) -> bool:
+    """Whether ``run`` appears in ``items`` as consecutive entries."""
+    n = len(run)
+    return any(items[i:i + n] == run for i in range(len(items) - n + 1))
+
+
+def _with_unavailable(current: List[Optional[str]], target: List[Optional[str]]) -> List[Optional[str]]:
+    """``target`` with the unavailable items of ``current`` (None) appended, unless it places them."""
+    target = list(target)
+    if None in target:
+        return target
+    return target + [None] * current.count(None)
+
+
+def _sort_targets(
+    items: List[Dict[str, Any]],
+    key: Callable[[Dict[str, Any]], Any],
+    reverse: bool
+) -> Tuple[List[Optional[str]], List[Optional[str]]]:
+    """Current and sorted URIs of playlist items; unavailable items (None) go last."""
+    current = [_item_uri(item) for item in items]
+    playable = [item for item, uri in zip(items, current) if uri is not None]
+    target = [_item_uri(item) for item in sorted(playable, key=key, reverse=reverse)]
+    return current, target + [None] * (len(items) - len(playable))
+
+
+def _longest_increasing_subsequence(values: List[int]) -> List[int]:
+    """Indices into ``values`` of one longest strictly increasing subsequence."""
+    tails: List[int] = []  # tails[k]: index of the smallest tail of a run of length k + 1
+    tail_values: List[int] = []
+    previous = [-1] * len(values)
+    for i, value in enumerate(values):
+        k = bisect_left(tail_values, value)
+        if k > 0:
+            previous[i] = tails[k - 1]
+        if k == len(tails):
+            tails.append(i)
+            tail_values.append(value)
+        else:
+            tails[k] = i
+            tail_values[k] = value
+    
+    result = []
+    i = tails[-1] if tails else -1
+    while i != -1:
+        result.append(i)
+        i = previous[i]
+    return result[::-1]
+
+
+class _FenwickTree:
+    """Binary indexed tree over positions 0..size-1: point updates and prefix sums in O(log n)."""
+    
+    def __init__(self, size: int):
+        self._sums = [0] * (size + 1)
+    
+    def add(self, position: int, delta: int) -> None:
+        i = position + 1
+        while i < len(self._sums):
+            self._sums[i] += delta
+            i += i & -i
+    
+    def prefix_sum(self, end: int) -> int:
+        """Sum of positions 0..end-1."""
+        total = 0
+        i = end
+        while i > 0:
+            total += self._sums[i]
+            i -= i & -i
+        return total
+
+
+def diff_playlist_items(
+    old_items: List[Dict[str, Any]],
+    new_items: List[Dict[str, Any]]
+) -> Tuple[list, list, list]:
+    """
+    Compute added, removed and moved items between two versions of a playlist.
+    
+    Items are matched by URI; a URI that appears several times is matched
+    occurrence by occurrence. Among the matched items, the longest run that
+    kept its relative order stays put and everything else counts as moved.
+    
+    Returns:
+        (added, removed, moved) as described on PlaylistDiff
+    """
+    def keyed(items):
+        seen: Dict[Optional[str], int] = {}
+        keys = []
+        for item in items:
+            uri = _item_uri(item)
+            keys.append((uri, seen.get(uri, 0)))
+            seen[uri] = seen.get(uri, 0) + 1
+        return keys
+    
+    old_keys = keyed(old_items)
+    new_positions = {key: i for i, key in enumerate(keyed(new_items))}
+    old_positions = {key: i for i, key in enumerate(old_keys)}
+    
+    removed = [(i, old_items[i]) for i, key in enumerate(old_keys) if key not in new_positions]
+    added = [(i, new_items[i]) for key, i in new_positions.items() if key not in old_positions]
+    
+    # Matched items in new order, labelled with their old position
+    kept = sorted(
+        (new_positions[key], old_positions[key]) for key in old_keys if key in new_positions
+    )
+    stable = set(_longest_increasing_subsequence([old for _, old in kept]))
+    moved = [
+        (old, new, new_items[new])
+        for k, (new, old) in enumerate(kept)
+        if k not in stable
+    ]
+    return added, removed, moved
+
+
+# Most URIs accepted by one playlist add, remove or replace
+PLAYLIST_WRITE_LIMIT = 100
+
+
+@dataclass
+class PlaylistWritePlan:
+    """
+    Write calls that turn a playlist's current items into a target list.
+    
+    ``steps`` holds (method, JSON body) pairs for the playlist items
+    endpoint, to be sent in order with each response's ``snapshot_id``
+    chained into the next call. ``snapshot_id`` is set once the plan has
+    been executed.
+    """
+    steps: List[Tuple[str, Dict[str, Any]]] = field(default_factory=list)
+    added: int = 0
+    removed: int = 0
+    replaced: bool = False
+    snapshot_id: Optional[str] = None
+    
+    @property
+    def calls(self) -> int:
+        return len(self.steps)
+
+
+def _chunked(items: List[Any], size: int) -> List[List[Any]]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def plan_playlist_add(uris: List[str], position: Optional[int] = None) -> PlaylistWritePlan:
+    """Add steps for ``uris`` in 100-URI chunks, inserted at ``position`` (None = append)."""
+    plan = PlaylistWritePlan(added=len(uris))
+    for offset, chunk in zip(range(0, len(uris), PLAYLIST_WRITE_LIMIT), _chunked(uris, PLAYLIST_WRITE_LIMIT)):
+        body: Dict[str, Any] = {"uris": chunk}
+        if position is not None:
+            body["position"] = position + offset
+        plan.steps.append(("POST", body))
+    return plan
+
+
+def plan_playlist_remove(uris: List[str]) -> PlaylistWritePlan:
+    """Remove steps for every occurrence of ``uris`` in 100-URI chunks."""
+    unique_uris = list(dict.fromkeys(uris))
+    plan = PlaylistWritePlan(removed=len(unique_uris))
+    for chunk in _chunked(unique_uris, PLAYLIST_WRITE_LIMIT):
+        plan.steps.append(("DELETE", {"tracks": [{"uri": uri} for uri in chunk]}))
+    return plan
+
+
+def _plan_moves(
+    current: List[str],
+    target: List[str],
+    limit: Optional[int] = None
+) -> Optional[List[Tuple[str, Dict[str, Any]]]]:
+    """
+    Range moves that reorder ``current`` into ``target``, or None if more than ``limit``.
+    
+    Runs of items that are already adjacent and in order are merged into
+    blocks, the longest increasing subsequence of blocks stays put, and
+    every other block is moved as one range right behind the block that
+    precedes it in the target. Blocks are placed in target order, so a
+    block whose predecessor has just been moved in front of it needs no
+    move of its own.
+    """
+    slots: Dict[str, deque] = {}
+    for i, uri in enumerate(target):
+        slots.setdefault(uri, deque()).append(i)
+    try:
+        # The k-th duplicate of a URI goes to the k-th occurrence in the target
+        order = [slots[uri].popleft() for uri in current]
+    except (KeyError, IndexError):
+        order = None
+    if order is None or len(current) != len(target):
+        raise ValueError("The target order must contain exactly the current items")
+    
+    blocks: List[List[int]] = []  # [target position of the first item, length]
+    for position in order:
+        if blocks and blocks[-1][0] + blocks[-1][1] == position:
+            blocks[-1][1] += 1
+        else:
+            blocks.append([position, 1])
+    stable = set(_longest_increasing_subsequence([start for start, _ in blocks]))
+    if limit is not None and len(blocks) - len(stable) > limit:
+        return None
+    moving = sorted((blocks[k][0], k) for k in range(len(blocks)) if k not in stable)
+    
+    # A moved block always lands right behind its target predecessor, which
+    # has already settled, so every block's final slot is known up front:
+    # slot k is block k's current place, slot n + k the one it is moved to.
+    n = len(blocks)
+    block_ending_at = {start + length - 1: k for k, (start, length) in enumerate(blocks)}
+    front = 2 * n
+    following = [k + 1 for k in range(n - 1)] + [None] * (n + 1) + [0]
+    slot = list(range(n))
+    anchors = []
+    for start, k in moving:
+        anchor = front if start == 0 else slot[block_ending_at[start - 1]]
+        following[n + k] = following[anchor]
+        following[anchor] = n + k
+        slot[k] = n + k
+        anchors.append(anchor)
+    rank = [0] * (2 * n + 1)
+    node, position = following[front], 1
+    while node is not None:
+        rank[node] = position
+        node, position = following[node], position + 1
+    
+    # Item counts per slot rank, so offsets are prefix sums over the live slots
+    offsets = _FenwickTree(2 * n + 1)
+    for k, (_, length) in enumerate(blocks):
+        offsets.add(rank[k], length)
+    moves: List[Tuple[str, Dict[str, Any]]] = []
+    for (_, k), anchor in zip(moving, anchors):
+        length = blocks[k][1]
+        range_start = offsets.prefix_sum(rank[k])
+        insert_before = offsets.prefix_sum(rank[anchor] + 1)
+        if insert_before != range_start:
+            moves.append(("PUT", {
+                "range_start": range_start,
+                "insert_before": insert_before,
+                "range_length": length,
+            }))
+        offsets.add(rank[k], -length)
+        offsets.add(rank[n + k], length)
+    return moves
+
+
+def plan_playlist_reorder(
+    current: List[str],
+    target: List[str],
+    preserve_added_at: bool = False
+) -> PlaylistWritePlan:
+    """
+    Range moves (update_playlist_items calls) that turn ``current`` into ``target``.
+    
+    ``target`` must hold the same URIs (with the same duplicates) in a new
+    order. Moving a few runs costs one call per run rather than one per
+    item. A thorough shuffle needs nearly one move per item, though, so the
+    playlist is rewritten instead whenever that takes fewer calls (one per
+    100 items), which resets ``added_at``; pass ``preserve_added_at`` to
+    only ever move items. Unavailable items (None) can't be written back,
+    so a playlist holding them is only ever reordered by moves.
+    
+    Raises:
+        ValueError: If ``target`` is not a reordering of ``current``
+    
+    Example:
+        plan = plan_playlist_reorder(uris, sorted(uris, key=release_date.get))
+        print(plan.calls)
+    """
+    if not preserve_added_at and current != target and None not in current:
+        replace_calls = max(1, -(-len(target) // PLAYLIST_WRITE_LIMIT))
+        moves = _plan_moves(current, target, limit=replace_calls)
+        if moves is None:
+            return plan_playlist_replace(current, target)
+        return PlaylistWritePlan(steps=moves)
+    return PlaylistWritePlan(steps=_plan_moves(current, target))
+
+
+def _plan_playlist_diff(
+    current: List[str],
+    target: List[str],
+    budget: Optional[int] = None
+) -> Optional[PlaylistWritePlan]:
+    """
+    Removals, range moves and positioned inserts, or None if over ``budget`` calls.
+    
+    Removals go by URI and drop every occurrence, so a URI that must lose
+    only some of its duplicates is removed and its target occurrences are
+    inserted again.
+    """
+    current_counts: Dict[str, int] = {}
+    for uri in current:
+        current_counts[uri] = current_counts.get(uri, 0) + 1
+    target_counts: Dict[str, int] = {}
+    for uri in target:
+        target_counts[uri] = target_counts.get(uri, 0) + 1
+    
+    dropped = {uri for uri, count in current_counts.items() if target_counts.get(uri, 0) < count}
+    remaining = [uri for uri in current if uri not in dropped]
+    
+    # The kept items in the order the target wants them
+    left = {}
+    for uri in remaining:
+        left[uri] = left.get(uri, 0) + 1
+    kept = []
+    for uri in target:
+        if left.get(uri):
+            left[uri] -= 1
+            kept.append(uri)
+    
+    # The target items around the kept ones form runs inserted at their final position
+    runs: List[Tuple[int, List[str]]] = []
+    j = 0
+    for i, uri in enumerate(target):
+        if j < len(kept) and kept[j] == uri:
+            j += 1
+        elif runs and runs[-1][0] + len(runs[-1][1]) == i:
+            runs[-1][1].append(uri)
+        else:
+            runs.append((i, [uri]))
+    
+    plan = plan_playlist_remove([uri for uri in dict.fromkeys(current) if uri in dropped])
+    inserts = [plan_playlist_add(run, position) for position, run in runs]
+    insert_calls = sum(insert.calls for insert in inserts)
+    limit = None if budget is None else budget - plan.calls - insert_calls
+    if limit is not None and limit < 0:
+        return None
+    moves = _plan_moves(remaining, kept, limit)
+    if moves is None:
+        return None
+    
+    plan.steps.extend(moves)
+    for insert in inserts:
+        plan.steps.extend(insert.steps)
+        plan.added += insert.added
+    return plan
+
+
+def plan_playlist_replace(current: List[str], target: List[str]) -> PlaylistWritePlan:
+    """
+    Fewest write calls that turn ``current`` into ``target`` (both lists of URIs).
+    
+    A minimal diff (removals, range moves for kept items that changed
+    order, then positioned inserts) keeps the untouched items and their
+    ``added_at`` dates. A full replace (one PUT of the first 100 URIs, then
+    appends) is used instead when it needs fewer calls, and always when
+    ``current`` holds unavailable items (None): they have no URI to remove
+    them by, and the rewrite drops them.
+    
+    Example:
+        plan = plan_playlist_replace(current_uris, target_uris)
+        print(plan.calls, plan.replaced)
+    """
+    if current == target:
+        return PlaylistWritePlan()
+    
+    replace = PlaylistWritePlan(
+        steps=[("PUT", {"uris": target[:PLAYLIST_WRITE_LIMIT]})],
+        added=len(target),
+        removed=len(current),
+        replaced=True
+    )
+    replace.steps.extend(plan_playlist_add(target[PLAYLIST_WRITE_LIMIT:]).steps)
+    if None in current:
+        return replace
+    
+    diff = _plan_playlist_diff(current, target, budget=replace.calls)
+    return diff if diff is not None else replace
+
+
+@dataclass
+class Artist:
+    """
+    Compact artist model returned in ``typed=True`` mode.
+    
+    ``genres``, ``popularity`` and ``followers`` are None for the simplified
+    artists embedded in tracks and albums.
+    """
+    __slots__ = ("id", "name", "uri", "genres", "popularity", "followers", "_raw", "__weakref__")
+    id: Optional[str]
+    name: str
+    uri: Optional[str]
+    genres: Optional[Tuple[str, ...]]
+    popularity: Optional[int]
+    followers: Optional[int]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """A Web API-shaped dict of the model's fields (a subset of the response)."""
+        data = {"id": self.id, "name": self.name, "type": "artist", "uri": self.uri}
+        if self.genres is not None:
+            data["genres"] = list(self.genres)
+            data["popularity"] = self.popularity
+            data["followers"] = {"total": self.followers}
+        return data
+    
+    @property
+    def raw(self) -> Dict[str, Any]:
+        """The original response dict of the artist (needs ``keep_raw=True``)."""
+        return _unpack_raw(self)
+
+
+@dataclass
+class SimplifiedAlbum:
+    """Compact album model returned in ``typed=True`` mode."""
+    __slots__ = (
+        "id", "name", "uri", "album_type", "release_date", "total_tracks",
+        "artists", "image_url", "_raw", "__weakref__"
+    )
+    id: Optional[str]
+    name: str
+    uri: Optional[str]
+    album_type: Optional[str]
+    release_date: Optional[str]
+    total_tracks: Optional[int]
+    artists: Tuple[Artist, ...]
+    image_url: Optional[str]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """A Web API-shaped dict of the model's fields (a subset of the response)."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "type": "album",
+            "uri": self.uri,
+            "album_type": self.album_type,
+            "release_date": self.release_date,
+            "total_tracks": self.total_tracks,
+            "artists": [artist.to_dict() for artist in self.artists],
+            "images": [{"url": self.image_url}] if self.image_url else [],
+        }
+    
+    @property
+    def raw(self) -> Dict[str, Any]:
+        """The original response dict of the album (needs ``keep_raw=True``)."""
+        return _unpack_raw(self)
+
+
+@dataclass
+class Track:
+    """
+    Compact track model returned in ``typed=True`` mode.
+    
+    ``album`` is None for the simplified tracks listed on an album.
+    Bulky fields such as ``available_markets`` are dropped.
+    """
+    __slots__ = (
+        "id", "name", "uri", "duration_ms", "explicit", "popularity",
+        "track_number", "disc_number", "is_local", "isrc", "artists", "album", "_raw"
+    )
+    id: Optional[str]
+    name: str
+    uri: Optional[str]
+    duration_ms: Optional[int]
+    explicit: Optional[bool]
+    popularity: Optional[int]
+    track_number: Optional[int]
+    disc_number: Optional[int]
+    is_local: bool
+    isrc: Optional[str]
+    artists: Tuple[Artist, ...]
+    album: Optional[SimplifiedAlbum]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """A Web API-shaped dict of the model's fields (a subset of the response)."""
+        data = {
+            "id": self.id,
+            "name": self.name,
+            "type": "track",
+            "uri": self.uri,
+            "duration_ms": self.duration_ms,
+            "explicit": self.explicit,
+            "popularity": self.popularity,
+            "track_number": self.track_number,
+            "disc_number": self.disc_number,
+            "is_local": self.is_local,
+            "artists": [artist.to_dict() for artist in self.artists],
+        }
+        if self.isrc:
+            data["external_ids"] = {"isrc": self.isrc}
+        if self.album is not None:
+            data["album"] = self.album.to_dict()
+        return data
+    
+    @property
+    def raw(self) -> Dict[str, Any]:
+        """The original response dict of the track (needs ``keep_raw=True``)."""
+        return _unpack_raw(self)
+
+
+@dataclass
+class PlaylistItem:
+    """
+    Compact playlist (or saved-track) entry returned in ``typed=True`` mode.
+    
+    ``track`` is None for podcast episodes and unavailable items.
+    """
+    __slots__ = ("added_at", "added_by", "is_local", "track", "_raw")
+    added_at: Optional[str]
+    added_by: Optional[str]
+    is_local: bool
+    track: Optional[Track]
+    
+    @property
+    def uri(self) -> Optional[str]:
+        return self.track.uri if self.track is not None else None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """A Web API-shaped dict of the model's fields (a subset of the response)."""
+        return {
+            "added_at": self.added_at,
+            "added_by": {"id": self.added_by} if self.added_by else None,
+            "is_local": self.is_local,
+            "track": self.track.to_dict() if self.track is not None else None,
+        }
+    
+    @property
+    def raw(self) -> Dict[str, Any]:
+        """The original response dict of the item (needs ``keep_raw=True``)."""
+        return _unpack_raw(self)
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value else value
+
+
+def _unpack_raw(model: Any) -> Dict[str, Any]:
+    blob = getattr(model, "_raw", None)
+    if blob is None:
+        raise ValueError(
+            f"{type(model).__name__}.raw needs a client created with keep_raw=True "
+            "(to_dict() rebuilds only the model's fields)"
+        )
+    return _json_loads(zlib.decompress(blob))
+
+
+class ModelFactory:
+    """
+    Builds typed models from Web API dicts, sharing repeated objects.
+    
+    Artist and album objects are pooled by ID, so 100k tracks from a few
+    thousand albums hold a few thousand album objects rather than 100k
+    copies; their names and IDs are interned. The pools hold weak
+    references, so unused models are freed as usual.
+    
+    With ``keep_raw``, every model also keeps its original dict as
+    compressed JSON, decoded when ``.raw`` is read.
+    """
+    
+    def __init__(self, keep_raw: bool = False):
+        self.keep_raw = keep_raw
+        self._lock = threading.Lock()
+        self._artists: "weakref.WeakValueDictionary[Tuple[str, bool], Artist]" = weakref.WeakValueDictionary()
+        self._albums: "weakref.WeakValueDictionary[str, SimplifiedAlbum]" = weakref.WeakValueDictionary()
+    
+    def artist(self, data: Dict[str, Any]) -> Artist:
+        full = "genres" in data
+        key = (data.get("id"), full)
+        if key[0] is not None:
+            cached = self._artists.get(key)
+            if cached is not None:
+                return cached
+        
+        followers = data.get("followers")
+        artist = Artist(
+            id=_intern(data.get("id")),
+            name=_intern(data.get("name", "")),
+            uri=_intern(data.get("uri")),
+            genres=tuple(_intern(g) for g in data["genres"]) if full else None,
+            popularity=data.get("popularity"),
+            followers=followers.get("total") if isinstance(followers, dict) else None,
+        )
+        self._keep(artist, data)
+        if key[0] is not None:
+            with self._lock:
+                artist = self._artists.setdefault(key, artist)
+        return artist
+    
+    def album(self, data: Dict[str, Any]) -> SimplifiedAlbum:
+        album_id = data.get("id")
+        if album_id is not None:
+            cached = self._albums.get(album_id)
+            if cached is not None:
+                return cached
+        
+        images = data.get("images") or []
+        album = SimplifiedAlbum(
+            id=_intern(album_id),
+            name=_intern(data.get("name", "")),
+            uri=_intern(data.get("uri")),
+            album_type=_intern(data.get("album_type")),
+            release_date=_intern(data.get("release_date")),
+            total_tracks=data.get("total_tracks"),
+            artists=tuple(self.artist(a) for a in data.get("artists") or ()),
+            image_url=images[0].get("url") if images else None,
+        )
+        self._keep(album, data)
+        if album_id is not None:
+            with self._lock:
+                album = self._albums.setdefault(album_id, album)
+        return album
+    
+    def track(self, data: Dict[str, Any]) -> Track:
+        album = data.get("album")
+        track = Track(
+            id=data.get("id"),
+            name=data.get("name", ""),
+            uri=data.get("uri"),
+            duration_ms=data.get("duration_ms"),
+            explicit=data.get("explicit"),
+            popularity=data.get("popularity"),
+            track_number=data.get("track_number"),
+            disc_number=data.get("disc_number"),
+            is_local=data.get("is_local", False),
+            isrc=(data.get("external_ids") or {}).get("isrc"),
+            artists=tuple(self.artist(a) for a in data.get("artists") or ()),
+            album=self.album(album) if album else None,
+        )
+        self._keep(track, data)
+        return track
+    
+    def playlist_item(self, data: Dict[str, Any]) -> PlaylistItem:
+        track = data.get("track") or data.get("item")
+        added_by = data.get("added_by")
+        item = PlaylistItem(
+            added_at=data.get("added_at"),
+            added_by=_intern(added_by.get("id")) if isinstance(added_by, dict) else None,
+            is_local=data.get("is_local", False),
+            track=self.track(track) if track and track.get("type", "track") == "track" else None,
+        )
+        self._keep(item, data)
+        return item
+    
+    def _keep(self, model: Any, data: Dict[str, Any]) -> None:
+        if self.keep_raw:
+            model._raw = zlib.compress(json.dumps(data, separators=(",", ":")).encode())
+    
+    @staticmethod
+    def page(data: Dict[str, Any], convert: Callable[[Dict[str, Any]], Any]) -> Dict[str, Any]:
+        """Copy of a paging object with its items converted."""
+        if not isinstance(data, dict) or "items" not in data:
+            return data
+        return dict(data, items=[convert(item) if item else item for item in data["items"]])
+    
+    def search(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        converters = {"tracks": self.track, "artists": self.artist, "albums": self.album}
+        return {
+            key: self.page(value, converters[key]) if key in converters else value
+            for key, value in data.items()
+        }
+    
+    def convert(self, template: str, data: Any) -> Any:
+        """Convert the result of an endpoint (given as a template) if it has a model."""
+        if not isinstance(data, dict) or not data:
+            return data
+        if template == "/tracks/{id}":
+            return self.track(data)
+        if template == "/artists/{id}":
+            return self.artist(data)
+        if template == "/albums/{id}":
+            return self.album(data)
+        if template in ("/albums/{id}/tracks", "/me/top/tracks"):
+            return self.page(data, self.track)
+        if template == "/me/top/artists":
+            return self.page(data, self.artist)
+        if template == "/artists/{id}/albums":
+            return self.page(data, self.album)
+        if template in ("/playlists/{id}/items", "/me/tracks"):
+            return self.page(data, self.playlist_item)
+        if template == "/me/following" and "artists" in data:
+            return dict(data, artists=self.page(data["artists"], self.artist))
+        if template == "/search":
+            return self.search(data)
+        return data
+
+
+class LibraryMembership:
+    """
+    Locally known saved state of library items, by type and ID.
+    
+    Filled by ``bulk_check_saved_items`` and the bulk writes, so IDs whose
+    state is already known aren't checked or written again. Entries expire
+    after ``ttl`` seconds (None = never) since the library can also change
+    in other apps; ``forget()`` drops them explicitly.
+    """
+    
+    def __init__(self, ttl: Optional[float] = 600.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._states: Dict[str, Dict[str, Tuple[bool, float]]] = {}
+    
+    def known(self, item_type: str, ids: List[str]) -> Dict[str, bool]:
+        """Saved state of each ID whose state is known and not expired."""
+        now = time.monotonic()
+        with self._lock:
+            states = self._states.get(item_type, {})
+            found = {}
+            for item_id in ids:
+                state = states.get(item_id)
+                if state is not None and (self.ttl is None or now - state[1] < self.ttl):
+                    found[item_id] = state[0]
+            return found
+    
+    def update(self, item_type: str, ids: List[str], saved: Union[bool, List[bool]]) -> None:
+        """Record the saved state of IDs (one bool for all or one per ID)."""
+        if isinstance(saved, bool):
+            saved = [saved] * len(ids)
+        now = time.monotonic()
+        with self._lock:
+            states = self._states.setdefault(item_type, {})
+            for item_id, state in zip(ids, saved):
+                states[item_id] = (bool(state), now)
+    
+    def forget(self, item_type: Optional[str] = None, ids: Optional[List[str]] = None) -> None:
+        """Drop the given IDs, a whole type, or everything."""
+        with self._lock:
+            if item_type is None:
+                self._states.clear()
+            elif ids is None:
+                self._states.pop(item_type, None)
+            else:
+                states = self._states.get(item_type, {})
+                for item_id in ids:
+                    states.pop(item_id, None)
+
+
+# CJK characters are indexed one by one, since those scripts don't separate words
+_CJK = "぀-ヿ㐀-䶿一-鿿가-힯豈-﫿"
+_TOKEN_PATTERN = re.compile(f"[{_CJK}]|[^\\W_{_CJK}]+")
+_QUERY_PATTERN = re.compile(r'(?:(\w+):)?(?:"([^"]*)"|(\S+))')
+
+
+def _tokenize(text: Optional[str]) -> List[str]:
+    """Lowercased, accent-free word tokens of a name."""
+    if not text:
+        return []
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return _TOKEN_PATTERN.findall(text)
+
+
+def _deletes(token: str) -> List[str]:
+    """``token`` with each single character removed."""
+    return [token[:i] + token[i + 1:] for i in range(len(token))]
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """Whether one insertion, deletion, substitution or transposition turns a into b."""
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) < len(b):
+        return a[i:] == b[i + 1:]
+    return (
+        a[i + 1:] == b[i + 1:]
+        or (i + 1 < len(a) and a[i] == b[i + 1] and a[i + 1] == b[i] and a[i + 2:] == b[i + 2:])
+    )
+
+
+def _slim_artist(artist: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: artist[k] for k in ("id", "name", "uri", "type", "genres", "popularity") if k in artist}
+
+
+def _slim_album(album: Dict[str, Any]) -> Dict[str, Any]:
+    slim = {
+        k: album[k]
+        for k in ("id", "name", "uri", "type", "album_type", "release_date", "total_tracks", "popularity")
+        if k in album
+    }
+    slim["artists"] = [_slim_artist(a) for a in album.get("artists") or []]
+    if album.get("images"):
+        slim["images"] = album["images"][:1]
+    return slim
+
+
+def _slim_track(track: Dict[str, Any]) -> Dict[str, Any]:
+    slim = {
+        k: track[k]
+        for k in ("id", "name", "uri", "type", "duration_ms", "explicit", "popularity", "external_ids")
+        if k in track
+    }
+    slim["artists"] = [_slim_artist(a) for a in track.get("artists") or []]
+    if track.get("album"):
+        slim["album"] = _slim_album(track["album"])
+    return slim
+
+
+class LocalSearchIndex:
+    """
+    In-memory full-text index over tracks, albums and artists already fetched.
+    
+    Attach one to a client (``SpotifyAPI(search_index=LocalSearchIndex())``)
+    and every response that carries catalog objects is indexed as it
+    arrives. Covered are single lookups, album tracks, artist albums,
+    playlists and their items, saved tracks and albums, top items,
+    followed artists and remote search results. Objects can also be added
+    directly with ``add()``.
+    
+    Queries mirror the Web API search syntax:
+    - free words match track, album and artist names
+    - ``track:``, ``album:``, ``artist:`` and ``genre:`` restrict a word
+      (or a quoted phrase) to one field
+    - ``year:1997`` or ``year:1990-1999`` filters by release year,
+      ``isrc:`` matches a track's ISRC
+    
+    Every word must match. The last word also matches as a prefix (for
+    autocompletion), and a word of four or more characters with no exact
+    or prefix match is looked up with one typo (an insertion, deletion,
+    substitution or transposition) allowed. Names are compared lowercased
+    and without accents; CJK names are matched character by character.
+    
+    Example:
+        index = LocalSearchIndex()
+        spotify = SpotifyAPI(access_token="...", search_index=index)
+        list(spotify.iter_user_saved_tracks())
+        index.search("artist:radiohead cree", ["track"])
+        spotify.search_local("radiohaed")   # remote search only on a miss
+    """
+    
+    FIELDS = ("track", "album", "artist", "genre")
+    TYPES = ("track", "album", "artist")
+    # Fields a free word is matched against
+    NAME_FIELDS = ("track", "album", "artist")
+    MIN_FUZZY_LENGTH = 4
+    
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._docs: Dict[str, Dict[str, Any]] = {}
+        self._doc_tokens: Dict[str, Dict[str, set]] = {}
+        self._years: Dict[str, int] = {}
+        self._isrcs: Dict[str, str] = {}
+        self._postings: Dict[str, Dict[str, set]] = {f: {} for f in self.FIELDS}
+        self._token_counts: Dict[str, int] = {}
+        self._deletes: Dict[str, set] = {}
+        self._vocab: List[str] = []
+        self._vocab_dirty = False
+    
+    def __len__(self) -> int:
+        return len(self._docs)
+    
+    def __contains__(self, uri: str) -> bool:
+        return uri in self._docs
+    
+    # ---------- indexing ----------
+    
+    def add(self, obj: Optional[Dict[str, Any]]) -> bool:
+        """
+        Index one track, album or artist object (others are ignored).
+        
+        An object already indexed is only replaced by a version with more
+        fields, so a simplified album never overwrites a full one. Nested
+        artists, albums and album tracks are indexed as well.
+        
+        Returns:
+            Whether the object itself was (re)indexed
+        """
+        if not isinstance(obj, dict):
+            return False
+        obj_type = obj.get("type")
+        uri = obj.get("uri")
+        if obj_type not in self.TYPES or not uri or obj.get("is_local"):
+            return False
+        
+        slim = {"track": _slim_track, "album": _slim_album, "artist": _slim_artist}[obj_type](obj)
+        fields: Dict[str, List[str]] = {field: [] for field in self.FIELDS}
+        fields[obj_type].extend(_tokenize(slim.get("name")))
+        for artist in slim.get("artists") or []:
+            fields["artist"].extend(_tokenize(artist.get("name")))
+        album = slim if obj_type == "album" else slim.get("album") or {}
+        if obj_type == "track":
+            fields["album"].extend(_tokenize(album.get("name")))
+        for genre in slim.get("genres") or []:
+            fields["genre"].extend(_tokenize(genre))
+        
+        with self._lock:
+            existing = self._docs.get(uri)
+            indexed = existing is None or len(slim) > len(existing)
+            if indexed:
+                if existing is not None:
+                    self._unindex(uri)
+                self._docs[uri] = slim
+                self._doc_tokens[uri] = {field: set(tokens) for field, tokens in fields.items() if tokens}
+                for field, tokens in self._doc_tokens[uri].items():
+                    for token in tokens:
+                        self._postings[field].setdefault(token, set()).add(uri)
+                        self._add_token(token)
+                release_date = album.get("release_date") or ""
+                if release_date[:4].isdigit():
+                    self._years[uri] = int(release_date[:4])
+                isrc = (slim.get("external_ids") or {}).get("isrc")
+                if isrc:
+                    self._isrcs[uri] = isrc.upper()
+        
+        # Nested objects are worth indexing on their own
+        if obj_type == "track":
+            for artist in obj.get("artists") or []:
+                self.add(artist)
+            if obj.get("album"):
+                self.add(obj["album"])
+        elif obj_type == "album":
+            for artist in obj.get("artists") or []:
+                self.add(artist)
+            for track in (obj.get("tracks") or {}).get("items") or []:
+                if "album" not in track:
+                    track = dict(track, album={k: v for k, v in obj.items() if k != "tracks"})
+                self.add(track)
+        return indexed
+    
+    def add_many(self, objs: Iterable[Optional[Dict[str, Any]]]) -> int:
+        """Index several objects; returns how many were indexed."""
+        return sum(self.add(obj) for obj in objs)
+    
+    def _add_token(self, token: str) -> None:
+        count = self._token_counts.get(token, 0)
+        self._token_counts[token] = count + 1
+        if count == 0:
+            self._vocab_dirty = True
+            if len(token) >= self.MIN_FUZZY_LENGTH - 1:
+                for variant in [token, *_deletes(token)]:
+                    self._deletes.setdefault(variant, set()).add(token)
+    
+    def _remove_token(self, token: str) -> None:
+        count = self._token_counts[token] - 1
+        if count:
+            self._token_counts[token] = count
+            return
+        del self._token_counts[token]
+        self._vocab_dirty = True
+        if len(token) >= self.MIN_FUZZY_LENGTH - 1:
+            for variant in [token, *_deletes(token)]:
+                candidates = self._deletes.get(variant)
+                if candidates is not None:
+                    candidates.discard(token)
+                    if not candidates:
+                        del self._deletes[variant]
+    
+    def _unindex(self, uri: str) -> None:
+        for field, tokens in self._doc_tokens.pop(uri, {}).items():
+            postings = self._postings[field]
+            for token in tokens:
+                postings[token].discard(uri)
+                if not postings[token]:
+                    del postings[token]
+                self._remove_token(token)
+        self._years.pop(uri, None)
+        self._isrcs.pop(uri, None)
+    
+    def index_response(self, endpoint: str, data: Any) -> None:
+        """Index the catalog objects in the decoded response of an endpoint."""
+        if not isinstance(data, dict):
+            return
+        template = endpoint_template(endpoint)
+        
+        def items(page: Any) -> List[Dict[str, Any]]:
+            return (page or {}).get("items") or [] if isinstance(page, dict) else []
+        
+        if template in ("/tracks/{id}", "/albums/{id}", "/artists/{id}"):
+            self.add(data)
+        elif template in ("/albums/{id}/tracks", "/artists/{id}/albums", "/me/top/tracks", "/me/top/artists"):
+            self.add_many(items(data))
+        elif template in ("/playlists/{id}/items", "/me/tracks", "/me/albums", "/playlists/{id}"):
+            page = data.get("items") or data.get("tracks") if template == "/playlists/{id}" else data
+            for item in items(page):
+                self.add(item.get("track") or item.get("item") or item.get("album"))
+        elif template == "/me/following":
+            self.add_many(items(data.get("artists")))
+        elif template == "/search":
+            for key in ("tracks", "albums", "artists"):
+                self.add_many(items(data.get(key)))
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._docs.clear()
+            self._doc_tokens.clear()
+            self._years.clear()
+            self._isrcs.clear()
+            for postings in self._postings.values():
+                postings.clear()
+            self._token_counts.clear()
+            self._deletes.clear()
+            self._vocab = []
+            self._vocab_dirty = False
+    
+    # ---------- searching ----------
+    
+    def _vocabulary(self) -> List[str]:
+        if self._vocab_dirty:
+            self._vocab = sorted(self._token_counts)
+            self._vocab_dirty = False
+        return self._vocab
+    
+    def _matches(self, token: str, fields: Tuple[str, ...], prefix: bool) -> Dict[str, int]:
+        """URIs whose fields contain ``token``, scored 3 (exact), 2 (prefix) or 1 (typo)."""
+        scores: Dict[str, int] = {}
+        
+        def collect(candidate: str, score: int) -> None:
+            for field in fields:
+                for uri in self._postings[field].get(candidate, ()):
+                    if scores.get(uri, 0) < score:
+                        scores[uri] = score
+        
+        collect(token, 3)
+        if prefix:
+            vocab = self._vocabulary()
+            i = bisect_left(vocab, token)
+            while i < len(vocab) and vocab[i].startswith(token):
+                if vocab[i] != token:
+                    collect(vocab[i], 2)
+                i += 1
+        if not scores and len(token) >= self.MIN_FUZZY_LENGTH:
+            candidates = set()
+            for variant in [token, *_deletes(token)]:
+                candidates.update(self._deletes.get(variant, ()))
+            for candidate in candidates:
+                if _within_one_edit(token, candidate):
+                    collect(candidate, 1)
+        return scores
+    
+    def _parse(self, query: str) -> Tuple[List[Tuple[Tuple[str, ...], str]], Dict[str, str]]:
+        """Split a query into (fields, token) terms and year/isrc filters."""
+        terms: List[Tuple[Tuple[str, ...], str]] = []
+        filters: Dict[str, str] = {}
+        for field, quoted, word in _QUERY_PATTERN.findall(query):
+            field = field.lower()
+            value = quoted if quoted else word
+            if field in ("year", "isrc"):
+                filters[field] = value
+                continue
+            fields = (field,) if field in self.FIELDS else self.NAME_FIELDS
+            if field and field not in self.FIELDS:
+                # Unsupported filters (tag:, upc:, ...) are searched as words
+                value = f"{field} {value}"
+            terms.extend((fields, token) for token in _tokenize(value))
+        return terms, filters
+    
+    def _passes(self, uri: str, filters: Dict[str, str]) -> bool:
+        if "isrc" in filters and self._isrcs.get(uri) != filters["isrc"].upper():
+            return False
+        if "year" in filters:
+            year = self._years.get(uri)
+            low, _, high = filters["year"].partition("-")
+            try:
+                if year is None or not int(low) <= year <= int(high or low):
+                    return False
+            except ValueError:
+                return False
+        return True
+    
+    def search(
+        self,
+        query: str,
+        search_types: Iterable[str] = TYPES,
+        limit: int = 20
+    ) -> Dict[str, Any]:
+        """
+        Search the index.
+        
+        Args:
+            query: Words and field filters, e.g. 'artist:"daft punk" harder'
+            search_types: Any of "track", "album" and "artist"
+            limit: Maximum results per type
+        
+        Returns:
+            Dict shaped like a Web API search response, e.g.
+            {"tracks": {"items": [...], "total": 3, ...}}, best matches first
+        """
+        search_types = [t for t in search_types if t in self.TYPES]
+        terms, filters = self._parse(query)
+        with self._lock:
+            scores: Optional[Dict[str, int]] = None
+            for i, (fields, token) in enumerate(terms):
+                matches = self._matches(token, fields, prefix=i == len(terms) - 1)
+                if scores is None:
+                    scores = matches
+                else:
+                    scores = {uri: score + matches[uri] for uri, score in scores.items() if uri in matches}
+                if not scores:
+                    break
+            if scores is None:
+                # Only filters: every document is a candidate
+                scores = {uri: 0 for uri in self._isrcs} if "isrc" in filters else \
+                    {uri: 0 for uri in self._years} if "year" in filters else {}
+            
+            results: Dict[str, List[Tuple[int, int, str, Dict[str, Any]]]] = {t: [] for t in search_types}
+            for uri, score in scores.items():
+                doc = self._docs[uri]
+                if doc.get("type") in results and self._passes(uri, filters):
+                    results[doc["type"]].append((-score, -(doc.get("popularity") or 0), doc.get("name") or "", doc))
+        
+        response = {}
+        for search_type, hits in results.items():
+            hits.sort(key=lambda hit: hit[:3])
+            response[f"{search_type}s"] = {
+                "items": [doc for _, _, _, doc in hits[:limit]],
+                "total": len(hits),
+                "limit": limit,
+                "offset": 0,
+                "next": None,
+            }
+        return response
 
 
-class SearchType(Enum):
-    """Search types for the search endpoint."""
-    ALBUM = "album"
-    ARTIST = "artist"
-    PLAYLIST = "playlist"
-    TRACK = "track"
-    SHOW = "show"
-    EPISODE = "episode"
-    AUDIOBOOK = "audiobook"
+class _Flight:
+    """An in-flight GET whose result is shared with identical concurrent calls."""
+    __slots__ = ("done", "result", "error", "completed")
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[Exception] = None
+        # False if the leader was interrupted (e.g. KeyboardInterrupt); waiters then retry
+        self.completed = False
 
 
-class RepeatState(Enum):
-    """Repeat states for playback."""
-    OFF = "off"
-    TRACK = "track"
-    CONTEXT = "context"
+def _in_current_context(func: Callable) -> Callable:
+    """Wrap ``func`` to run in a copy of the caller's context vars, e.g. on a pool thread."""
+    context = contextvars.copy_context()
+    return lambda *args: context.copy().run(func, *args)
 
 
-@dataclass
-class SpotifyCredentials:
-    """Spotify API credentials."""
-    client_id: Optional[str] = None
-    client_secret: Optional[str] = None
-    access_token: Optional[str] = None
-    refresh_token: Optional[str] = None
-    token_expires_at: Optional[float] = None
+def _flight_key(endpoint: str, params: Optional[Dict]) -> str:
+    query = sorted((k, str(v)) for k, v in (params or {}).items() if v is not None)
+    return f"{endpoint}?{urlencode(query)}" if query else endpoint
 
 
 class SpotifyAPI:
@@ -144,6 +2747,31 @@ class SpotifyAPI:
         access_token: User access token (for user data endpoints)
         refresh_token: Refresh token for obtaining new access tokens
         auto_refresh: Whether to automatically refresh expired tokens
+        max_workers: Maximum number of concurrent requests used by the
+                     batch methods (get_albums, get_tracks, ...)
+        rate_limit: Client-side limit in requests per second (None = unlimited).
+                    Replace ``rate_limiter`` with a shared RateLimiter to apply
+                    one quota across several clients.
+        max_retries: How many times a request is retried after a 429, a 5xx
+                     or a connection error (0 raises immediately)
+        cache: ResponseCache for catalog lookups (None disables caching)
+        background_refresh: Renew tokens on a background thread before they
+                            expire, so requests never wait for a refresh
+        token_store: TokenStore shared with other processes, e.g. FileTokenStore()
+        scope: OAuth scope of ``refresh_token``, used as the token store key
+        transport: TransportConfig for pool size, timeouts, compression and
+                   keep-alive (default: TransportConfig())
+        hooks: Callables receiving a RequestEvent after every request, e.g.
+               RequestMetrics(); more can be appended to ``hooks`` later
+        json_decoder: "orjson", "msgspec", "json" or a callable decoding
+                      bytes (default: the fastest installed library)
+        typed: Return Track, SimplifiedAlbum, Artist and PlaylistItem models
+               instead of dicts for the endpoints that have them
+        keep_raw: Keep each model's original dict (compressed) for ``.raw``
+        coalesce: Let concurrent identical GETs share one request and its
+                  decoded result
+        search_index: LocalSearchIndex fed with the tracks, albums and
+                      artists of every response, queried by search_local()
     
     Example:
         # Client Credentials Flow
@@ -156,13 +2784,33 @@ class SpotifyAPI:
     BASE_URL = "https://api.spotify.com/v1"
     AUTH_URL = "https://accounts.spotify.com/api/token"
     
+    # Largest page sizes accepted by the paging endpoints
+    MAX_PAGE_SIZE = 50
+    MAX_PLAYLIST_PAGE_SIZE = 100
+    # Most IDs accepted by one library save, remove or check
+    MAX_LIBRARY_IDS = 50
+    
     def __init__(
         self,
         client_id: Optional[str] = None,
         client_secret: Optional[str] = None,
         access_token: Optional[str] = None,
         refresh_token: Optional[str] = None,
-        auto_refresh: bool = True
+        auto_refresh: bool = True,
+        max_workers: int = 10,
+        rate_limit: Optional[float] = None,
+        max_retries: int = 3,
+        cache: Optional[ResponseCache] = None,
+        background_refresh: bool = True,
+        token_store: Optional[TokenStore] = None,
+        scope: str = "",
+        transport: Optional[TransportConfig] = None,
+        hooks: Optional[List[Callable[[RequestEvent], None]]] = None,
+        json_decoder: Union[str, Callable[[bytes], Any], None] = None,
+        typed: bool = False,
+        keep_raw: bool = False,
+        coalesce: bool = True,
+        search_index: Optional[LocalSearchIndex] = None
     ):
         self.credentials = SpotifyCredentials(
             client_id=client_id,
@@ -171,12 +2819,53 @@ class SpotifyAPI:
             refresh_token=refresh_token
         )
         self.auto_refresh = auto_refresh
-        self.session = requests.Session()
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(rate_limit)
+        self.retry_policy = RetryPolicy(max_retries=max_retries)
+        self.cache = cache
+        self.hooks = list(hooks or [])
+        self.json_decoder = json_decoder if callable(json_decoder) else get_json_decoder(json_decoder)
+        self.transport = transport or TransportConfig()
+        # Tracks, albums, artists and playlist items come back as compact models
+        self.typed = typed
+        self.models = ModelFactory(keep_raw=keep_raw)
+        # Set by untyped() for the calls made inside it, in this thread or task
+        self._typed_override: "contextvars.ContextVar[Optional[bool]]" = contextvars.ContextVar(
+            "spotify_typed_override", default=None
+        )
+        # Identical GETs in flight at the same time share one request
+        self.coalesce = coalesce
+        self._flights: Dict[str, _Flight] = {}
+        self._flights_lock = threading.Lock()
+        self.library_membership = LibraryMembership()
+        self.search_index = search_index
+        # One pooled connection per worker so batch requests don't queue for sockets
+        self.session = self.transport.build_session(max_workers)
+        self.token_manager = TokenManager(
+            self.credentials,
+            self.session,
+            self.AUTH_URL,
+            auto_refresh=auto_refresh,
+            background=background_refresh,
+            store=token_store,
+            scope=scope
+        )
         
         # Get access token via Client Credentials if credentials provided
         if client_id and client_secret and not access_token:
             self._get_client_credentials_token()
     
+    def __enter__(self) -> "SpotifyAPI":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    def close(self) -> None:
+        """Stop background token renewal and close the connection pool."""
+        self.token_manager.stop()
+        self.session.close()
+    
     def _get_client_credentials_token(self) -> None:
         """
         Obtain access token using Client Credentials Flow.
@@ -184,86 +2873,56 @@ class SpotifyAPI:
         This flow is suitable for accessing public data only.
         For user data, use Authorization Code Flow.
         """
-        credentials = base64.b64encode(
-            f"{self.credentials.client_id}:{self.credentials.client_secret}".encode()
-        ).decode()
-        
-        headers = {
-            "Authorization": f"Basic {credentials}",
-            "Content-Type": "application/x-www-form-urlencoded"
-        }
-        
-        data = {"grant_type": "client_credentials"}
-        
-        response = requests.post(self.AUTH_URL, headers=headers, data=data)
-        
-        if response.status_code != 200:
-            raise SpotifyAuthError(
-                f"Failed to obtain access token: {response.text}",
-                status_code=response.status_code
-            )
-        
-        token_data = response.json()
-        self.credentials.access_token = token_data["access_token"]
-        self.credentials.token_expires_at = time.time() + token_data["expires_in"]
+        self.token_manager.obtain_client_credentials_token()
     
     def _refresh_access_token(self) -> None:
         """Refresh the access token using the refresh token."""
-        if not self.credentials.refresh_token:
-            raise SpotifyAuthError("No refresh token available")
-        
-        credentials = base64.b64encode(
-            f"{self.credentials.client_id}:{self.credentials.client_secret}".encode()
-        ).decode()
-        
-        headers = {
-            "Authorization": f"Basic {credentials}",
-            "Content-Type": "application/x-www-form-urlencoded"
-        }
-        
-        data = {
-            "grant_type": "refresh_token",
-            "refresh_token": self.credentials.refresh_token
-        }
-        
-        response = requests.post(self.AUTH_URL, headers=headers, data=data)
-        
-        if response.status_code != 200:
-            raise SpotifyAuthError(
-                f"Failed to refresh access token: {response.text}",
-                status_code=response.status_code
-            )
-        
-        token_data = response.json()
-        self.credentials.access_token = token_data["access_token"]
-        self.credentials.token_expires_at = time.time() + token_data["expires_in"]
-        
-        # Update refresh token if provided
-        if "refresh_token" in token_data:
-            self.credentials.refresh_token = token_data["refresh_token"]
+        self.token_manager.renew_user_token()
     
     def _get_headers(self) -> Dict[str, str]:
         """Get request headers with authorization."""
-        if not self.credentials.access_token:
-            raise SpotifyAuthError("No access token available")
-        
-        # Check if token needs refresh
-        if self.auto_refresh and self.credentials.token_expires_at:
-            if time.time() >= self.credentials.token_expires_at - 60:  # Refresh 60s early
-                if self.credentials.refresh_token:
-                    self._refresh_access_token()
-        
         return {
-            "Authorization": f"Bearer {self.credentials.access_token}",
+            "Authorization": f"Bearer {self.token_manager.get_token()}",
             "Content-Type": "application/json"
         }
     
+    def _reauthorize(self, headers: Optional[Dict[str, str]]) -> bool:
+        """
+        After a 401, put a freshly minted token into ``headers``.
+        
+        Returns False when no new token can be obtained, in which case the
+        401 is surfaced as SpotifyAuthError.
+        """
+        if not (headers and self.auto_refresh and self.token_manager.can_refresh()):
+            return False
+        
+        rejected = headers.get("Authorization", "").replace("Bearer ", "", 1)
+        try:
+            token = self.token_manager.refresh(rejected)
+        except SpotifyAuthError:
+            return False
+        headers["Authorization"] = f"Bearer {token}"
+        return True
+    
+    def _decode_error_body(self, body: bytes) -> Optional[Any]:
+        """Decode an error response body, which may not be JSON at all."""
+        if not body:
+            return None
+        try:
+            return self.json_decoder(body)
+        except Exception:
+            # Each decoder library raises its own error type
+            return None
+    
     def _handle_response(self, response: requests.Response) -> Dict[str, Any]:
         """Handle API response and errors."""
+        # Decode straight from the raw bytes, once, skipping the str round trip
+        body = response.content
+        
         if response.status_code == 200 or response.status_code == 201:
             # Some endpoints return empty body
-            if response.text:
-                return response.json()
+            if body:
+                return self.json_decoder(body)
             return {}
         
         elif response.status_code == 204:
@@ -273,25 +2932,25 @@ class SpotifyAPI:
             raise SpotifyAuthError(
                 "Unauthorized: Invalid or expired access token",
                 status_code=401,
-                response=response.json() if response.text else None
+                response=self._decode_error_body(body)
             )
         
         elif response.status_code == 403:
             raise SpotifyForbiddenError(
                 "Forbidden: Insufficient permissions",
                 status_code=403,
-                response=response.json() if response.text else None
+                response=self._decode_error_body(body)
             )
         
         elif response.status_code == 404:
             raise SpotifyNotFoundError(
                 "Resource not found",
                 status_code=404,
-                response=response.json() if response.text else None
+                response=self._decode_error_body(body)
             )
         
         elif response.status_code == 429:
-            retry_after = int(response.headers.get("Retry-After", 0))
+            retry_after = int(_parse_retry_after(response.headers.get("Retry-After"), 0))
             raise SpotifyRateLimitError(
                 f"Rate limit exceeded. Retry after {retry_after} seconds",
                 retry_after=retry_after
@@ -299,9 +2958,9 @@ class SpotifyAPI:
         
         else:
             raise SpotifyError(
-                f"API Error: {response.text}",
+                f"API Error: {body.decode('utf-8', 'replace')}",
                 status_code=response.status_code,
-                response=response.json() if response.text else None
+                response=self._decode_error_body(body)
             )
     
     def _make_request(
@@ -312,24 +2971,416 @@ class SpotifyAPI:
         data: Optional[Dict] = None,
         json_data: Optional[Dict] = None
     ) -> Dict[str, Any]:
-        """Make an API request."""
-        url = f"{self.BASE_URL}{endpoint}"
-        headers = self._get_headers()
+        """
+        Make an API request.
         
-        # Remove Content-Type for GET requests
-        if method == "GET":
-            headers.pop("Content-Type", None)
-        
-        response = self.session.request(
-            method=method,
-            url=url,
-            headers=headers,
-            params=params,
-            data=data,
-            json=json_data
-        )
+        With ``coalesce`` enabled, a GET identical to one already in flight
+        (on any thread) waits for it and returns the same decoded result, or
+        raises the same error, instead of sending a request of its own.
+        """
+        if method != "GET" or not self.coalesce:
+            return self._to_models(endpoint, self._perform_request(method, endpoint, params, data, json_data))
+        
+        key = _flight_key(endpoint, params)
+        while True:
+            with self._flights_lock:
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[key] = _Flight()
+            
+            if leader:
+                try:
+                    flight.result = self._perform_request(method, endpoint, params)
+                    flight.completed = True
+                except Exception as e:
+                    flight.error = e
+                    flight.completed = True
+                    raise
+                finally:
+                    with self._flights_lock:
+                        del self._flights[key]
+                    flight.done.set()
+                return self._to_models(endpoint, flight.result)
+            
+            event = RequestEvent(method, endpoint_template(endpoint), coalesced=True) if self.hooks else None
+            flight.done.wait()
+            if not flight.completed:
+                continue
+            self._emit(event, None, error=flight.error)
+            if flight.error is not None:
+                raise flight.error
+            return self._to_models(endpoint, flight.result)
+    
+    def _perform_request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        data: Optional[Dict] = None,
+        json_data: Optional[Dict] = None
+    ) -> Dict[str, Any]:
+        """Send one request (or serve it from the cache) and return the decoded body."""
+        event = RequestEvent(method, endpoint_template(endpoint)) if self.hooks else None
+        cache_key, entry = self._cache_lookup(method, endpoint, params)
+        if entry is not None and entry.is_fresh():
+            self._emit(event, cache_key)
+            return entry.value
+        
+        response = None
+        try:
+            url = f"{self.BASE_URL}{endpoint}"
+            headers = self._get_headers()
+            
+            # Remove Content-Type for GET requests
+            if method == "GET":
+                headers.pop("Content-Type", None)
+            if entry is not None:
+                headers["If-None-Match"] = entry.etag
+            
+            response = self._send(
+                method,
+                url,
+                event=event,
+                headers=headers,
+                params=params,
+                data=data,
+                json=json_data
+            )
+            result = self._cache_response(response, endpoint, cache_key, entry)
+        except Exception as e:
+            self._emit(event, cache_key, response, e)
+            raise
+        
+        self._emit(event, cache_key, response)
+        if self.search_index is not None and method == "GET":
+            self.search_index.index_response(endpoint, result)
+        return result
+    
+    def _to_models(self, endpoint: str, result: Any) -> Any:
+        """Convert a response to typed models when ``typed`` is enabled."""
+        typed = self._typed_override.get()
+        if not (self.typed if typed is None else typed):
+            return result
+        return self.models.convert(endpoint_template(endpoint), result)
+    
+    @contextmanager
+    def untyped(self) -> Iterator[None]:
+        """
+        Return dicts from calls made inside the block, even in typed mode.
         
-        return self._handle_response(response)
+        The override follows the calling thread or task, including the
+        pool threads the batch and parallel methods fan out to; other
+        callers of the same client are unaffected.
+        
+        Example:
+            spotify = SpotifyAPI(access_token="...", typed=True)
+            with spotify.untyped():
+                rows = list(spotify.iter_user_saved_tracks())   # dicts
+        """
+        token = self._typed_override.set(False)
+        try:
+            yield
+        finally:
+            self._typed_override.reset(token)
+    
+    def _emit(
+        self,
+        event: Optional[RequestEvent],
+        cache_key: Optional[str],
+        response: Optional[Any] = None,
+        error: Optional[Exception] = None
+    ) -> None:
+        """Complete ``event`` and pass it to every hook (None = no hooks)."""
+        if event is None:
+            return
+        
+        event.latency = time.perf_counter() - event.started
+        if cache_key is not None:
+            if response is None and error is None:
+                event.cache = "hit"
+            elif response is not None and response.status_code == 304:
+                event.cache = "revalidated"
+            else:
+                event.cache = "miss"
+        if response is not None:
+            event.status = response.status_code
+            event.bytes = len(response.content)
+        if error is not None:
+            event.error = type(error).__name__
+        
+        for hook in self.hooks:
+            try:
+                hook(event)
+            except Exception:
+                # Instrumentation must never fail the request it observes
+                pass
+    
+    def _cache_lookup(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict]
+    ) -> Tuple[Optional[str], Optional[CacheEntry]]:
+        """
+        Find the cache key and entry for a request.
+        
+        Returns (None, None) for requests that bypass the cache. A returned
+        entry is either fresh or stale with an ETag to revalidate.
+        """
+        if method != "GET" or self.cache is None:
+            return None, None
+        cache_key = self.cache.key_for(endpoint, params)
+        if cache_key is None:
+            return None, None
+        return cache_key, self.cache.lookup(cache_key)
+    
+    def _cache_response(
+        self,
+        response: Any,
+        endpoint: str,
+        cache_key: Optional[str],
+        entry: Optional[CacheEntry]
+    ) -> Dict[str, Any]:
+        """Handle a response, serving 304s from and storing 200s in the cache."""
+        if entry is not None and response.status_code == 304:
+            self.cache.revalidated(cache_key, endpoint, entry)
+            return entry.value
+        
+        result = self._handle_response(response)
+        if cache_key:
+            self.cache.set(cache_key, endpoint, result, response.headers.get("ETag"))
+        return result
+    
+    def _retry_delay(
+        self,
+        method: str,
+        attempt: int,
+        response: Optional[Any] = None
+    ) -> Optional[float]:
+        """
+        Decide whether to retry a request.
+        
+        Args:
+            method: HTTP method of the request
+            attempt: Zero-based number of the attempt that just failed
+            response: The response received, or None after a connection error
+        
+        Returns:
+            Seconds to wait before the next attempt, or None to give up
+        """
+        policy = self.retry_policy
+        if attempt >= policy.max_retries:
+            return None
+        
+        if response is not None and response.status_code == 429:
+            # Pause every worker sharing the limiter, not just this one
+            self.rate_limiter.pause(_parse_retry_after(response.headers.get("Retry-After")))
+            return 0.0
+        
+        if method not in policy.idempotent_methods:
+            return None
+        if response is None or response.status_code in policy.retry_statuses:
+            return policy.backoff(attempt)
+        return None
+    
+    def _send(
+        self,
+        method: str,
+        url: str,
+        event: Optional[RequestEvent] = None,
+        **kwargs
+    ) -> requests.Response:
+        """
+        Send a request through the rate limiter, retrying on 429, 5xx and
+        connection errors according to ``retry_policy``, and once on 401
+        with a fresh token. Retries and limiter waits are recorded on
+        ``event`` if given.
+        """
+        attempt = 0
+        reauthorized = False
+        while True:
+            waited = self.rate_limiter.acquire()
+            if event is not None:
+                event.rate_limit_wait += waited
+            try:
+                response = self.session.request(method=method, url=url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                delay = self._retry_delay(method, attempt)
+                if delay is None:
+                    raise
+            else:
+                # Retry once with a new token if the current one was rejected
+                if response.status_code == 401 and not reauthorized:
+                    reauthorized = self._reauthorize(kwargs.get("headers"))
+                    if reauthorized:
+                        if event is not None:
+                            event.retries += 1
+                        continue
+                delay = self._retry_delay(method, attempt, response)
+                if delay is None:
+                    return response
+            
+            time.sleep(delay)
+            attempt += 1
+            if event is not None:
+                event.retries += 1
+    
+    def _get_several(
+        self,
+        fetch: Callable[..., Dict[str, Any]],
+        ids: List[str],
+        **kwargs
+    ) -> List[Union[Dict[str, Any], Exception]]:
+        """
+        Fetch several resources with one request per unique ID.
+        
+        Replaces the removed "Get Several" batch endpoints. Requests run on up
+        to ``max_workers`` threads, duplicate IDs are fetched once, and the
+        results come back in input order. A failed lookup does not abort the
+        batch; its exception is returned in place of the object.
+        """
+        unique_ids = list(dict.fromkeys(ids))
+        if not unique_ids:
+            return []
+        
+        def fetch_one(item_id: str) -> Union[Dict[str, Any], Exception]:
+            try:
+                return fetch(item_id, **kwargs)
+            except Exception as e:
+                return e
+        
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(unique_ids))) as executor:
+            results = dict(zip(unique_ids, executor.map(_in_current_context(fetch_one), unique_ids)))
+        
+        return [results[item_id] for item_id in ids]
+    
+    def _split_next_url(self, url: str) -> Tuple[str, Dict[str, str]]:
+        """Split a paging object's ``next`` URL into an endpoint and params."""
+        parts = urlsplit(url)
+        base_path = urlsplit(self.BASE_URL).path
+        endpoint = parts.path[len(base_path):] if parts.path.startswith(base_path) else parts.path
+        return endpoint, dict(parse_qsl(parts.query))
+    
+    def _paginate(
+        self,
+        fetch_page: Callable[[int], Dict[str, Any]],
+        container: Optional[str] = None,
+        parallel: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily yield every item of a paging object, following ``next``.
+        
+        Works for offset-based and cursor-based paging alike, since ``next``
+        carries the offset or cursor of the following page. Only one page is
+        held in memory at a time, and nothing is requested until iteration
+        starts.
+        
+        Args:
+            fetch_page: Callable returning the page at the given offset
+                        (cursor-based endpoints ignore the offset)
+            container: Key of the paging object when the response wraps it
+                       (e.g. "artists" for followed artists)
+            parallel: Prefetch the remaining pages concurrently once the first
+                      page has revealed ``total`` (offset-based paging only)
+        """
+        for _, page in self.iter_pages(fetch_page, container=container, parallel=parallel):
+            yield from page.get("items") or []
+    
+    def iter_pages(
+        self,
+        fetch_page: Callable[[Union[int, str, None]], Dict[str, Any]],
+        start: Union[int, str, None] = 0,
+        container: Optional[str] = None,
+        parallel: bool = False,
+        max_workers: Optional[int] = None
+    ) -> Iterator[Tuple[Union[int, str, None], Dict[str, Any]]]:
+        """
+        Lazily yield ``(position, page)`` for every page, starting at ``start``.
+        
+        ``position`` is where the following page starts: an offset, or the
+        ``after`` cursor for cursor-based paging. Saving it after handling a
+        page and passing it back as ``start`` resumes the iteration there.
+        
+        Args:
+            fetch_page: Callable returning the page at an offset (or after a
+                        cursor); later pages follow ``next`` unless prefetched
+            start: Offset or cursor of the first page
+            container: Key of the paging object when the response wraps it
+                       (e.g. "artists" for followed artists)
+            parallel: Prefetch the remaining pages concurrently once the first
+                      page has revealed ``total`` (offset-based paging only)
+            max_workers: Pages in flight at once when prefetching
+                         (default: the client's ``max_workers``)
+        
+        Example:
+            fetch = lambda offset: spotify.get_user_saved_tracks(limit=50, offset=offset)
+            for position, page in spotify.iter_pages(fetch, start=checkpoint, parallel=True):
+                write(page["items"])
+                checkpoint = position
+        """
+        def fetch(position: Union[int, str, None]) -> Dict[str, Any]:
+            page = fetch_page(position)
+            return (page.get(container) or {}) if container and page else page
+        
+        page = fetch(start)
+        offset = start if isinstance(start, int) else 0
+        # Without a total (e.g. filtered out by ``fields``) only next can be followed
+        if parallel and page and "total" in page:
+            yield from self._paginate_parallel(fetch, page, offset, max_workers or self.max_workers)
+            return
+        
+        while page:
+            offset += len(page.get("items") or [])
+            yield (page.get("cursors") or {}).get("after") if "cursors" in page else offset, page
+            
+            next_url = page.get("next")
+            if not next_url:
+                return
+            page = self._make_request("GET", *self._split_next_url(next_url))
+            if container:
+                page = page.get(container) or {}
+    
+    def _paginate_parallel(
+        self,
+        fetch_page: Callable[[int], Dict[str, Any]],
+        first_page: Dict[str, Any],
+        offset: int,
+        max_workers: int
+    ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Yield (position, page) for every page, fetching pages after the first concurrently.
+        
+        The remaining offsets are computed from the first page's ``total`` and
+        ``limit``. At most ``max_workers`` pages are in flight or buffered at
+        once, and pages are yielded strictly in offset order.
+        """
+        offset = first_page.get("offset", offset)
+        page_size = first_page.get("limit") or len(first_page.get("items") or [])
+        yield offset + len(first_page.get("items") or []), first_page
+        
+        total = first_page.get("total") or 0
+        if not page_size:
+            return
+        offsets = iter(range(offset + page_size, total, page_size))
+        
+        fetch_page = _in_current_context(fetch_page)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = deque(
+                (page_offset, executor.submit(fetch_page, page_offset))
+                for page_offset in islice(offsets, max_workers)
+            )
+            try:
+                while pending:
+                    page_offset, future = pending.popleft()
+                    page = future.result()
+                    for next_offset in islice(offsets, 1):
+                        pending.append((next_offset, executor.submit(fetch_page, next_offset)))
+                    yield page_offset + len(page.get("items") or []), page
+            finally:
+                # Stop fetching pages nobody will read if iteration ends early
+                for _, future in pending:
+                    future.cancel()
 
     # ==================== ALBUMS ====================
     
@@ -353,6 +3404,30 @@ class SpotifyAPI:
         
         return self._make_request("GET", f"/albums/{album_id}", params=params)
     
+    def get_albums(
+        self,
+        album_ids: List[str],
+        market: Optional[str] = None
+    ) -> List[Union[Dict[str, Any], Exception]]:
+        """
+        Get Spotify catalog information for several albums.
+        
+        Replaces the removed GET /albums?ids= endpoint by requesting
+        GET /albums/{id} for each unique ID concurrently.
+        
+        Args:
+            album_ids: List of Spotify IDs for the albums
+            market: An ISO 3166-1 alpha-2 country code
+        
+        Returns:
+            List of Album objects in the same order as album_ids. A lookup that
+            failed holds the raised exception (e.g. SpotifyNotFoundError) instead.
+        
+        Example:
+            albums = spotify.get_albums(["4aawyAB9vmqN3uQ7FjRGTy", "6JWc4iAiJ9FjyK0B59ABb4"])
+        """
+        return self._get_several(self.get_album, album_ids, market=market)
+    
     def get_album_tracks(
         self,
         album_id: str,
@@ -380,6 +3455,32 @@ class SpotifyAPI:
             params["market"] = market
         
         return self._make_request("GET", f"/albums/{album_id}/tracks", params=params)
+    
+    def iter_album_tracks(
+        self,
+        album_id: str,
+        market: Optional[str] = None,
+        parallel: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over all of an album's tracks.
+        
+        Args:
+            album_id: The Spotify ID for the album
+            market: An ISO 3166-1 alpha-2 country code
+            parallel: Fetch the remaining pages concurrently once the total is known
+        
+        Yields:
+            Simplified track objects
+        
+        Example:
+            for track in spotify.iter_album_tracks("4aawyAB9vmqN3uQ7FjRGTy"):
+                print(track["name"])
+        """
+        return self._paginate(
+            lambda offset: self.get_album_tracks(album_id, market=market, limit=self.MAX_PAGE_SIZE, offset=offset),
+            parallel=parallel
+        )
 
     # ==================== ARTISTS ====================
     
@@ -398,6 +3499,28 @@ class SpotifyAPI:
         """
         return self._make_request("GET", f"/artists/{artist_id}")
     
+    def get_artists(
+        self,
+        artist_ids: List[str]
+    ) -> List[Union[Dict[str, Any], Exception]]:
+        """
+        Get Spotify catalog information for several artists.
+        
+        Replaces the removed GET /artists?ids= endpoint by requesting
+        GET /artists/{id} for each unique ID concurrently.
+        
+        Args:
+            artist_ids: List of Spotify IDs for the artists
+        
+        Returns:
+            List of Artist objects in the same order as artist_ids. A lookup that
+            failed holds the raised exception (e.g. SpotifyNotFoundError) instead.
+        
+        Example:
+            artists = spotify.get_artists(["0TnOYISbd1XYRBk9myaseg", "4Z8W4fKeB5YxbusRsdQVPb"])
+        """
+        return self._get_several(self.get_artist, artist_ids)
+    
     def get_artist_albums(
         self,
         artist_id: str,
@@ -430,6 +3553,40 @@ class SpotifyAPI:
             params["market"] = market
         
         return self._make_request("GET", f"/artists/{artist_id}/albums", params=params)
+    
+    def iter_artist_albums(
+        self,
+        artist_id: str,
+        include_groups: Optional[str] = None,
+        market: Optional[str] = None,
+        parallel: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over all of an artist's albums.
+        
+        Args:
+            artist_id: The Spotify ID for the artist
+            include_groups: A comma-separated list of keywords to filter results
+            market: An ISO 3166-1 alpha-2 country code
+            parallel: Fetch the remaining pages concurrently once the total is known
+        
+        Yields:
+            Simplified album objects
+        
+        Example:
+            for album in spotify.iter_artist_albums("0TnOYISbd1XYRBk9myaseg", include_groups="album"):
+                print(album["name"])
+        """
+        return self._paginate(
+            lambda offset: self.get_artist_albums(
+                artist_id,
+                include_groups=include_groups,
+                market=market,
+                limit=self.MAX_PAGE_SIZE,
+                offset=offset
+            ),
+            parallel=parallel
+        )
 
     # ==================== TRACKS ====================
     
@@ -452,6 +3609,30 @@ class SpotifyAPI:
             params["market"] = market
         
         return self._make_request("GET", f"/tracks/{track_id}", params=params)
+    
+    def get_tracks(
+        self,
+        track_ids: List[str],
+        market: Optional[str] = None
+    ) -> List[Union[Dict[str, Any], Exception]]:
+        """
+        Get Spotify catalog information for several tracks.
+        
+        Replaces the removed GET /tracks?ids= endpoint by requesting
+        GET /tracks/{id} for each unique ID concurrently.
+        
+        Args:
+            track_ids: List of Spotify IDs for the tracks
+            market: An ISO 3166-1 alpha-2 country code
+        
+        Returns:
+            List of Track objects in the same order as track_ids. A lookup that
+            failed holds the raised exception (e.g. SpotifyNotFoundError) instead.
+        
+        Example:
+            tracks = spotify.get_tracks(["11dFghVXANMlKmJXsNCbNl", "4iV5W9uYEdYUVa79Axb7Rh"])
+        """
+        return self._get_several(self.get_track, track_ids, market=market)
 
     # ==================== PLAYLISTS ====================
     
@@ -459,7 +3640,8 @@ class SpotifyAPI:
         self,
         playlist_id: str,
         market: Optional[str] = None,
-        fields: Optional[str] = None
+        fields: Optional[str] = None,
+        projection: Optional[Union[str, PlaylistProjection]] = None
     ) -> Dict[str, Any]:
         """
         Get a playlist owned by a Spotify user.
@@ -467,14 +3649,23 @@ class SpotifyAPI:
         Args:
             playlist_id: The Spotify ID for the playlist
             market: An ISO 3166-1 alpha-2 country code
-            fields: Filters for the query (comma-separated list of fields to return)
+            fields: Filters for the query (comma-separated list of fields to return,
+                    see build_fields)
+            projection: Field preset used instead of ``fields``
+                        ("ids_only", "import_minimal" or "full")
         
         Returns:
             Playlist object
         
         Example:
             playlist = spotify.get_playlist("3cEYpjA9oz9GiPac4AsH4n")
+            slim = spotify.get_playlist("3cEYpjA9oz9GiPac4AsH4n", projection="ids_only")
         """
+        if projection is not None:
+            if fields:
+                raise ValueError("Pass either fields or projection, not both")
+            fields = projection_fields(projection, playlist=True)
+        
         params = {}
         if market:
             params["market"] = market
@@ -489,7 +3680,8 @@ class SpotifyAPI:
         market: Optional[str] = None,
         fields: Optional[str] = None,
         limit: int = 20,
-        offset: int = 0
+        offset: int = 0,
+        projection: Optional[Union[str, PlaylistProjection]] = None
     ) -> Dict[str, Any]:
         """
         Get full details of the items of a playlist owned by a Spotify user.
@@ -499,16 +3691,24 @@ class SpotifyAPI:
         Args:
             playlist_id: The Spotify ID for the playlist
             market: An ISO 3166-1 alpha-2 country code
-            fields: Filters for the query
+            fields: Filters for the query (see build_fields)
             limit: The maximum number of items to return (1-100, default 20)
             offset: The index of the first item to return
+            projection: Field preset used instead of ``fields``
+                        ("ids_only", "import_minimal" or "full")
         
         Returns:
             Paging object containing playlist track objects
         
         Example:
             items = spotify.get_playlist_items("3cEYpjA9oz9GiPac4AsH4n", limit=50)
+            ids = spotify.get_playlist_items("3cEYpjA9oz9GiPac4AsH4n", projection="ids_only")
         """
+        if projection is not None:
+            if fields:
+                raise ValueError("Pass either fields or projection, not both")
+            fields = projection_fields(projection)
+        
         params = {"limit": limit, "offset": offset}
         if market:
             params["market"] = market
@@ -517,6 +3717,44 @@ class SpotifyAPI:
         
         return self._make_request("GET", f"/playlists/{playlist_id}/items", params=params)
     
+    def iter_playlist_items(
+        self,
+        playlist_id: str,
+        market: Optional[str] = None,
+        fields: Optional[str] = None,
+        parallel: bool = False,
+        projection: Optional[Union[str, PlaylistProjection]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over all items of a playlist.
+        
+        Args:
+            playlist_id: The Spotify ID for the playlist
+            market: An ISO 3166-1 alpha-2 country code
+            fields: Filters for the query (must keep "next" to paginate)
+            parallel: Fetch the remaining pages concurrently once the total is known
+            projection: Field preset used instead of ``fields``
+                        ("ids_only", "import_minimal" or "full")
+        
+        Yields:
+            Playlist track objects
+        
+        Example:
+            for item in spotify.iter_playlist_items("3cEYpjA9oz9GiPac4AsH4n"):
+                print(item)
+        """
+        return self._paginate(
+            lambda offset: self.get_playlist_items(
+                playlist_id,
+                market=market,
+                fields=fields,
+                limit=self.MAX_PLAYLIST_PAGE_SIZE,
+                offset=offset,
+                projection=projection
+            ),
+            parallel=parallel
+        )
+    
     def add_items_to_playlist(
         self,
         playlist_id: str,
@@ -636,6 +3874,230 @@ class SpotifyAPI:
             json_data=data
         )
     
+    def _write_may_retry(self, method: str, error: Exception, attempt: int) -> bool:
+        """
+        Whether a failed playlist write should be checked and resent.
+        
+        PUT and DELETE were already retried by ``_send``; a POST add is not,
+        since it may have been applied before the response was lost.
+        """
+        if method != "POST" or attempt >= self.retry_policy.max_retries:
+            return False
+        if isinstance(error, SpotifyError):
+            return error.status_code in self.retry_policy.retry_statuses
+        return True
+    
+    def _write_playlist(
+        self,
+        playlist_id: str,
+        method: str,
+        body: Dict[str, Any],
+        snapshot_id: Optional[str]
+    ) -> Optional[str]:
+        """
+        Send one playlist items write chained on ``snapshot_id``.
+        
+        If an add fails with a 5xx or a connection error, it may have been
+        applied anyway. An unchanged snapshot_id means it was not. A new one
+        may also come from someone else's edit, so the items around the
+        insert position (or the end, for appends) are read back, and the
+        add is only sent again if its URIs are not there.
+        
+        Returns:
+            The playlist's snapshot_id after the write
+        """
+        if snapshot_id:
+            body = dict(body, snapshot_id=snapshot_id)
+        attempt = 0
+        while True:
+            try:
+                result = self._make_request(method, f"/playlists/{playlist_id}/items", json_data=body)
+                return (result or {}).get("snapshot_id")
+            except (SpotifyError, requests.ConnectionError, requests.Timeout) as e:
+                if not snapshot_id or not self._write_may_retry(method, e, attempt):
+                    raise
+            current = self.get_playlist(playlist_id, fields="snapshot_id").get("snapshot_id")
+            if current != snapshot_id:
+                if self._add_applied(playlist_id, body["uris"], body.get("position")):
+                    return current
+                # Another edit changed the snapshot; chain the resend on it
+                snapshot_id = current
+                body = dict(body, snapshot_id=current)
+            time.sleep(self.retry_policy.backoff(attempt))
+            attempt += 1
+    
+    def _add_window(self, position: Optional[int], count: int, total: int) -> Tuple[int, int]:
+        """Offsets to read back around an add of ``count`` items at ``position`` (None = append)."""
+        start = total - count if position is None else position
+        # Concurrent edits may have shifted the added run by up to a write's worth
+        return max(0, start - PLAYLIST_WRITE_LIMIT), start + count + PLAYLIST_WRITE_LIMIT
+    
+    def _add_applied(self, playlist_id: str, uris: List[str], position: Optional[int]) -> bool:
+        """Whether ``uris`` show up as a run near where an add would have put them."""
+        with self.untyped():
+            first = self.get_playlist_items(playlist_id, limit=1, projection="ids_only")
+            start, end = self._add_window(position, len(uris), first.get("total") or 0)
+            window: List[Optional[str]] = []
+            for offset in range(start, end, self.MAX_PLAYLIST_PAGE_SIZE):
+                page = self.get_playlist_items(
+                    playlist_id,
+                    limit=self.MAX_PLAYLIST_PAGE_SIZE,
+                    offset=offset,
+                    projection="ids_only"
+                )
+                window.extend(_item_uri(item) for item in page.get("items") or [])
+                if not page.get("next"):
+                    break
+        return _contains_run(window, list(uris))
+    
+    def execute_playlist_plan(
+        self,
+        playlist_id: str,
+        plan: PlaylistWritePlan,
+        snapshot_id: Optional[str] = None
+    ) -> PlaylistWritePlan:
+        """
+        Send a plan's writes in order, chaining each snapshot_id into the next.
+        
+        Args:
+            playlist_id: The Spotify ID for the playlist
+            plan: Plan from plan_playlist_replace, plan_playlist_add, ...
+            snapshot_id: Snapshot the plan was computed against
+        
+        Returns:
+            The plan, with ``snapshot_id`` set to the final snapshot
+        """
+        for method, body in plan.steps:
+            snapshot_id = self._write_playlist(playlist_id, method, body, snapshot_id)
+        plan.snapshot_id = snapshot_id
+        return plan
+    
+    def _current_playlist_uris(self, playlist_id: str) -> Tuple[Optional[str], List[str]]:
+        """The playlist's snapshot_id and the URIs of its items, in order."""
+        with self.untyped():
+            snapshot_id = self.get_playlist(playlist_id, fields="snapshot_id").get("snapshot_id")
+            items = self.iter_playlist_items(playlist_id, parallel=True, projection="ids_only")
+            return snapshot_id, [_item_uri(item) for item in items]
+    
+    def replace_playlist_contents(self, playlist_id: str, uris: List[str]) -> PlaylistWritePlan:
+        """
+        Make a playlist contain exactly ``uris``, in order, with the fewest writes.
+        
+        Reads the current items, then either removes and inserts only what
+        differs (keeping the other items and their ``added_at`` dates) or
+        replaces everything (one PUT plus one add per further 100 URIs),
+        whichever needs fewer calls. Writes are chained by snapshot_id.
+        
+        Args:
+            playlist_id: The Spotify ID for the playlist
+            uris: Target list of Spotify URIs (any length)
+        
+        Returns:
+            The executed PlaylistWritePlan (``calls``, ``added``, ``removed``,
+            ``replaced`` and the final ``snapshot_id``)
+        
+        Example:
+            plan = spotify.replace_playlist_contents("3cEYpjA9oz9GiPac4AsH4n", uris)
+            print(f"{plan.calls} writes")
+        """
+        snapshot_id, current = self._current_playlist_uris(playlist_id)
+        plan = plan_playlist_replace(current, list(uris))
+        if not plan.steps:
+            plan.snapshot_id = snapshot_id
+            return plan
+        return self.execute_playlist_plan(playlist_id, plan, snapshot_id)
+    
+    def bulk_add(
+        self,
+        playlist_id: str,
+        uris: List[str],
+        position: Optional[int] = None
+    ) -> PlaylistWritePlan:
+        """
+        Add any number of items in 100-URI chunks, chained by snapshot_id.
+        
+        Args:
+            playlist_id: The Spotify ID for the playlist
+            uris: Spotify URIs to add, in order
+            position: Where to insert them (None = append)
+        
+        Example:
+            spotify.bulk_add("3cEYpjA9oz9GiPac4AsH4n", uris)
+        """
+        snapshot_id = self.get_playlist(playlist_id, fields="snapshot_id").get("snapshot_id")
+        return self.execute_playlist_plan(playlist_id, plan_playlist_add(list(uris), position), snapshot_id)
+    
+    def bulk_remove(self, playlist_id: str, uris: List[str]) -> PlaylistWritePlan:
+        """
+        Remove every occurrence of any number of URIs in 100-URI chunks.
+        
+        Example:
+            spotify.bulk_remove("3cEYpjA9oz9GiPac4AsH4n", uris)
+        """
+        snapshot_id = self.get_playlist(playlist_id, fields="snapshot_id").get("snapshot_id")
+        return self.execute_playlist_plan(playlist_id, plan_playlist_remove(list(uris)), snapshot_id)
+    
+    def reorder_playlist(
+        self,
+        playlist_id: str,
+        uris: List[str],
+        preserve_added_at: bool = False
+    ) -> PlaylistWritePlan:
+        """
+        Put a playlist's items into the order of ``uris`` with few writes.
+        
+        See plan_playlist_reorder. Writes are chained by snapshot_id.
+        
+        Args:
+            playlist_id: The Spotify ID for the playlist
+            uris: The playlist's current URIs in the new order. Unavailable
+                  items (which have no URI) go last unless placed as None.
+            preserve_added_at: Only move items, even when rewriting the
+                               playlist would take fewer calls
+        
+        Raises:
+            ValueError: If ``uris`` is not a reordering of the current items
+        
+        Example:
+            plan = spotify.reorder_playlist("3cEYpjA9oz9GiPac4AsH4n", list(reversed(uris)))
+        """
+        snapshot_id, current = self._current_playlist_uris(playlist_id)
+        plan = plan_playlist_reorder(current, _with_unavailable(current, uris), preserve_added_at)
+        return self.execute_playlist_plan(playlist_id, plan, snapshot_id)
+    
+    def sort_playlist(
+        self,
+        playlist_id: str,
+        key: Callable[[Dict[str, Any]], Any],
+        reverse: bool = False,
+        preserve_added_at: bool = False
+    ) -> PlaylistWritePlan:
+        """
+        Sort a playlist in place by a key computed from each item.
+        
+        The sort is stable, and only the runs that are out of place are moved.
+        Unavailable items are not passed to ``key`` and end up last.
+        
+        Args:
+            playlist_id: The Spotify ID for the playlist
+            key: Function of a playlist item dict (e.g. its album's release date
+                 or a BPM looked up elsewhere)
+            reverse: Sort in descending order
+            preserve_added_at: Only move items (see reorder_playlist)
+        
+        Example:
+            spotify.sort_playlist(
+                "3cEYpjA9oz9GiPac4AsH4n",
+                key=lambda item: item["track"]["album"]["release_date"]
+            )
+        """
+        with self.untyped():
+            snapshot_id = self.get_playlist(playlist_id, fields="snapshot_id").get("snapshot_id")
+            items = list(self.iter_playlist_items(playlist_id, parallel=True))
+        current, target = _sort_targets(items, key, reverse)
+        plan = plan_playlist_reorder(current, target, preserve_added_at)
+        return self.execute_playlist_plan(playlist_id, plan, snapshot_id)
+    
     def change_playlist_details(
         self,
         playlist_id: str,
@@ -714,7 +4176,7 @@ class SpotifyAPI:
         headers["Content-Type"] = "image/jpeg"
         
         url = f"{self.BASE_URL}/playlists/{playlist_id}/images"
-        response = self.session.put(url, headers=headers, data=image_data)
+        response = self._send("PUT", url, headers=headers, data=image_data)
         
         return self._handle_response(response)
     
@@ -779,6 +4241,82 @@ class SpotifyAPI:
         """
         params = {"limit": limit, "offset": offset}
         return self._make_request("GET", "/me/playlists", params=params)
+    
+    def iter_current_user_playlists(self, parallel: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over all playlists owned or followed by the current user.
+        
+        Args:
+            parallel: Fetch the remaining pages concurrently once the total is known
+        
+        Yields:
+            Simplified playlist objects
+        
+        Example:
+            for playlist in spotify.iter_current_user_playlists():
+                print(playlist["name"])
+        """
+        return self._paginate(
+            lambda offset: self.get_current_user_playlists(limit=self.MAX_PAGE_SIZE, offset=offset),
+            parallel=parallel
+        )
+    
+    def sync_playlist(self, playlist_id: str, store: PlaylistStore) -> PlaylistDiff:
+        """
+        Bring the local copy of a playlist up to date, downloading it only if it changed.
+        
+        Fetches just the playlist's ``snapshot_id``. If it matches the stored
+        copy, nothing else is requested. Otherwise every item is downloaded,
+        compared with the stored copy and saved to ``store``.
+        
+        Args:
+            playlist_id: The Spotify ID for the playlist
+            store: Where the local copy is kept (e.g. JSONPlaylistStore)
+        
+        Returns:
+            PlaylistDiff (``changed`` is False when the snapshot was unchanged)
+        
+        Example:
+            store = JSONPlaylistStore("~/.cache/spotify/playlists")
+            diff = spotify.sync_playlist("3cEYpjA9oz9GiPac4AsH4n", store)
+            if diff.changed:
+                print(f"+{len(diff.added)} -{len(diff.removed)} ~{len(diff.moved)}")
+        """
+        stored = store.load(playlist_id)
+        snapshot_id = self.get_playlist(playlist_id, fields="snapshot_id").get("snapshot_id")
+        
+        def fetch_items() -> List[Dict[str, Any]]:
+            with self.untyped():
+                return list(self.iter_playlist_items(playlist_id, parallel=True))
+        
+        return self._sync_playlist_items(
+            playlist_id,
+            store,
+            stored,
+            snapshot_id,
+            fetch_items
+        )
+    
+    @staticmethod
+    def _sync_playlist_items(
+        playlist_id: str,
+        store: PlaylistStore,
+        stored: Optional[Dict[str, Any]],
+        snapshot_id: Optional[str],
+        fetch_items: Callable[[], List[Dict[str, Any]]]
+    ) -> PlaylistDiff:
+        """Diff and store freshly fetched items unless the snapshot is unchanged."""
+        previous_snapshot_id = stored.get("snapshot_id") if stored else None
+        diff = PlaylistDiff(playlist_id, snapshot_id, previous_snapshot_id)
+        if stored and snapshot_id and snapshot_id == previous_snapshot_id:
+            return diff
+        
+        items = fetch_items()
+        diff.added, diff.removed, diff.moved = diff_playlist_items(
+            stored.get("items", []) if stored else [], items
+        )
+        store.save(playlist_id, {"snapshot_id": snapshot_id, "items": items})
+        return diff
 
     # ==================== USERS ====================
     
@@ -826,6 +4364,32 @@ class SpotifyAPI:
             "offset": offset
         }
         return self._make_request("GET", f"/me/top/{item_type}", params=params)
+    
+    def iter_user_top_items(
+        self,
+        item_type: str,
+        time_range: str = "medium_term",
+        parallel: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over all of the current user's top artists or tracks.
+        
+        Args:
+            item_type: The type of entity to return ("artists" or "tracks")
+            time_range: Over what time frame ("long_term", "medium_term", "short_term")
+            parallel: Fetch the remaining pages concurrently once the total is known
+        
+        Yields:
+            Artist or track objects
+        
+        Example:
+            for track in spotify.iter_user_top_items("tracks"):
+                print(track["name"])
+        """
+        return self._paginate(
+            lambda offset: self.get_user_top_items(item_type, time_range=time_range, limit=self.MAX_PAGE_SIZE, offset=offset),
+            parallel=parallel
+        )
 
     # ==================== LIBRARY ====================
     
@@ -854,6 +4418,30 @@ class SpotifyAPI:
             params["market"] = market
         return self._make_request("GET", "/me/albums", params=params)
     
+    def iter_user_saved_albums(
+        self,
+        market: Optional[str] = None,
+        parallel: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over all albums saved in the current user's library.
+        
+        Args:
+            market: An ISO 3166-1 alpha-2 country code
+            parallel: Fetch the remaining pages concurrently once the total is known
+        
+        Yields:
+            Saved album objects
+        
+        Example:
+            for item in spotify.iter_user_saved_albums():
+                print(item)
+        """
+        return self._paginate(
+            lambda offset: self.get_user_saved_albums(limit=self.MAX_PAGE_SIZE, offset=offset, market=market),
+            parallel=parallel
+        )
+    
     def get_user_saved_audiobooks(
         self,
         limit: int = 20,
@@ -875,6 +4463,25 @@ class SpotifyAPI:
         params = {"limit": limit, "offset": offset}
         return self._make_request("GET", "/me/audiobooks", params=params)
     
+    def iter_user_saved_audiobooks(self, parallel: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over all audiobooks saved in the current user's library.
+        
+        Args:
+            parallel: Fetch the remaining pages concurrently once the total is known
+        
+        Yields:
+            Saved audiobook objects
+        
+        Example:
+            for item in spotify.iter_user_saved_audiobooks():
+                print(item)
+        """
+        return self._paginate(
+            lambda offset: self.get_user_saved_audiobooks(limit=self.MAX_PAGE_SIZE, offset=offset),
+            parallel=parallel
+        )
+    
     def get_user_saved_episodes(
         self,
         limit: int = 20,
@@ -900,6 +4507,30 @@ class SpotifyAPI:
             params["market"] = market
         return self._make_request("GET", "/me/episodes", params=params)
     
+    def iter_user_saved_episodes(
+        self,
+        market: Optional[str] = None,
+        parallel: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over all episodes saved in the current user's library.
+        
+        Args:
+            market: An ISO 3166-1 alpha-2 country code
+            parallel: Fetch the remaining pages concurrently once the total is known
+        
+        Yields:
+            Saved episode objects
+        
+        Example:
+            for item in spotify.iter_user_saved_episodes():
+                print(item)
+        """
+        return self._paginate(
+            lambda offset: self.get_user_saved_episodes(limit=self.MAX_PAGE_SIZE, offset=offset, market=market),
+            parallel=parallel
+        )
+    
     def get_user_saved_shows(
         self,
         limit: int = 20,
@@ -921,6 +4552,25 @@ class SpotifyAPI:
         params = {"limit": limit, "offset": offset}
         return self._make_request("GET", "/me/shows", params=params)
     
+    def iter_user_saved_shows(self, parallel: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over all shows saved in the current user's library.
+        
+        Args:
+            parallel: Fetch the remaining pages concurrently once the total is known
+        
+        Yields:
+            Saved show objects
+        
+        Example:
+            for item in spotify.iter_user_saved_shows():
+                print(item)
+        """
+        return self._paginate(
+            lambda offset: self.get_user_saved_shows(limit=self.MAX_PAGE_SIZE, offset=offset),
+            parallel=parallel
+        )
+    
     def get_user_saved_tracks(
         self,
         limit: int = 20,
@@ -946,6 +4596,30 @@ class SpotifyAPI:
             params["market"] = market
         return self._make_request("GET", "/me/tracks", params=params)
     
+    def iter_user_saved_tracks(
+        self,
+        market: Optional[str] = None,
+        parallel: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over all songs saved in the current user's library.
+        
+        Args:
+            market: An ISO 3166-1 alpha-2 country code
+            parallel: Fetch the remaining pages concurrently once the total is known
+        
+        Yields:
+            Saved track objects
+        
+        Example:
+            for item in spotify.iter_user_saved_tracks():
+                print(item)
+        """
+        return self._paginate(
+            lambda offset: self.get_user_saved_tracks(limit=self.MAX_PAGE_SIZE, offset=offset, market=market),
+            parallel=parallel
+        )
+    
     def save_to_library(
         self,
         ids: List[str],
@@ -967,6 +4641,7 @@ class SpotifyAPI:
         """
         data = {"ids": ids}
         params = {"type": item_type}
+        self.library_membership.forget(item_type, ids)
         return self._make_request("PUT", "/me/library", params=params, json_data=data)
     
     def remove_from_library(
@@ -989,6 +4664,7 @@ class SpotifyAPI:
         """
         data = {"ids": ids}
         params = {"type": item_type}
+        self.library_membership.forget(item_type, ids)
         return self._make_request("DELETE", "/me/library", params=params, json_data=data)
     
     def check_saved_items(
@@ -1018,6 +4694,114 @@ class SpotifyAPI:
         }
         return self._make_request("GET", "/me/library/contains", params=params)
     
+    def _map_chunks(self, func: Callable[[List[str]], Any], chunks: List[List[str]]) -> List[Any]:
+        """Run ``func`` on every chunk on up to ``max_workers`` threads, keeping order."""
+        if len(chunks) <= 1:
+            return [func(chunk) for chunk in chunks]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(chunks))) as executor:
+            return list(executor.map(_in_current_context(func), chunks))
+    
+    def _library_writes(self, ids: List[str], item_type: str, saved: bool, skip_known: bool) -> List[str]:
+        """Unique IDs whose saved state isn't already known to be ``saved``."""
+        unique_ids = list(dict.fromkeys(ids))
+        if not skip_known:
+            return unique_ids
+        known = self.library_membership.known(item_type, unique_ids)
+        return [item_id for item_id in unique_ids if known.get(item_id) is not saved]
+    
+    def bulk_save_to_library(
+        self,
+        ids: List[str],
+        item_type: str,
+        skip_known: bool = True
+    ) -> List[str]:
+        """
+        Save any number of items to the library in parallel 50-ID requests.
+        
+        Duplicate IDs are sent once, and IDs already known to be saved (see
+        ``library_membership``) are skipped unless ``skip_known`` is False.
+        Requests run on up to ``max_workers`` threads under the rate limiter.
+        
+        Args:
+            ids: Spotify IDs to save
+            item_type: Type of items ("albums", "tracks", "shows", "episodes", "audiobooks")
+            skip_known: Don't resend IDs known to be saved already
+        
+        Returns:
+            The IDs that were sent
+        
+        Example:
+            spotify.bulk_save_to_library(track_ids, "tracks")
+        """
+        pending = self._library_writes(ids, item_type, True, skip_known)
+        
+        def save(chunk: List[str]) -> None:
+            self.save_to_library(chunk, item_type)
+            self.library_membership.update(item_type, chunk, True)
+        
+        self._map_chunks(save, _chunked(pending, self.MAX_LIBRARY_IDS))
+        return pending
+    
+    def bulk_remove_from_library(
+        self,
+        ids: List[str],
+        item_type: str,
+        skip_known: bool = True
+    ) -> List[str]:
+        """
+        Remove any number of items from the library in parallel 50-ID requests.
+        
+        The counterpart of bulk_save_to_library; IDs known not to be saved
+        are skipped unless ``skip_known`` is False.
+        
+        Returns:
+            The IDs that were sent
+        
+        Example:
+            spotify.bulk_remove_from_library(album_ids, "albums")
+        """
+        pending = self._library_writes(ids, item_type, False, skip_known)
+        
+        def remove(chunk: List[str]) -> None:
+            self.remove_from_library(chunk, item_type)
+            self.library_membership.update(item_type, chunk, False)
+        
+        self._map_chunks(remove, _chunked(pending, self.MAX_LIBRARY_IDS))
+        return pending
+    
+    def bulk_check_saved_items(
+        self,
+        ids: List[str],
+        item_type: str,
+        use_known: bool = True
+    ) -> List[bool]:
+        """
+        Check any number of items, in parallel 50-ID requests.
+        
+        Only IDs whose state isn't already known are sent (all of them if
+        ``use_known`` is False); the answers are remembered in
+        ``library_membership``.
+        
+        Returns:
+            One boolean per input ID, in input order
+        
+        Example:
+            saved = spotify.bulk_check_saved_items(track_ids, "tracks")
+            missing = [i for i, s in zip(track_ids, saved) if not s]
+        """
+        unique_ids = list(dict.fromkeys(ids))
+        known = self.library_membership.known(item_type, unique_ids) if use_known else {}
+        chunks = _chunked([i for i in unique_ids if i not in known], self.MAX_LIBRARY_IDS)
+        
+        def check(chunk: List[str]) -> List[bool]:
+            saved = self.check_saved_items(chunk, item_type)
+            self.library_membership.update(item_type, chunk, saved)
+            return saved
+        
+        for chunk, saved in zip(chunks, self._map_chunks(check, chunks)):
+            known.update(zip(chunk, saved))
+        return [known[item_id] for item_id in ids]
+    
     def get_followed_artists(
         self,
         after: Optional[str] = None,
@@ -1043,6 +4827,22 @@ class SpotifyAPI:
         if after:
             params["after"] = after
         return self._make_request("GET", "/me/following", params=params)
+    
+    def iter_followed_artists(self) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over all artists followed by the current user (cursor-based).
+        
+        Yields:
+            Artist objects
+        
+        Example:
+            for artist in spotify.iter_followed_artists():
+                print(artist["name"])
+        """
+        return self._paginate(
+            lambda _: self.get_followed_artists(limit=self.MAX_PAGE_SIZE),
+            container="artists"
+        )
 
     # ==================== PLAYER ====================
     
@@ -1106,7 +4906,8 @@ class SpotifyAPI:
         Args:
             limit: The maximum number of items to return (1-50, default 20)
             after: Unix timestamp in milliseconds (items after this time)
-            before: Unix timestamp in milliseconds (items before this time)
+            before: Unix timestamp in milliseconds (items before this time);
+                    only one of ``after`` and ``before`` may be given
         
         Returns:
             Cursor-based paging object containing play history objects
@@ -1114,13 +4915,41 @@ class SpotifyAPI:
         Example:
             recent = spotify.get_recently_played(limit=50)
         """
+        if after is not None and before is not None:
+            raise ValueError("Pass either after or before, not both")
         params = {"limit": limit}
-        if after:
+        if after is not None:
             params["after"] = after
-        if before:
+        if before is not None:
             params["before"] = before
         return self._make_request("GET", "/me/player/recently-played", params=params)
     
+    def iter_recently_played(
+        self,
+        after: Optional[int] = None,
+        before: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the current user's recently played tracks (cursor-based).
+        
+        Args:
+            after: Unix timestamp in milliseconds (items after this time)
+            before: Unix timestamp in milliseconds (items before this time);
+                    only one of ``after`` and ``before`` may be given
+        
+        Yields:
+            Play history objects
+        
+        Example:
+            for play in spotify.iter_recently_played():
+                print(play["played_at"])
+        """
+        if after is not None and before is not None:
+            raise ValueError("Pass either after or before, not both")
+        return self._paginate(
+            lambda _: self.get_recently_played(limit=self.MAX_PAGE_SIZE, after=after, before=before)
+        )
+    
     def get_queue(self) -> Dict[str, Any]:
         """
         Get the list of objects that make up the user's queue.
@@ -1386,6 +5215,48 @@ class SpotifyAPI:
             params["market"] = market
         
         return self._make_request("GET", "/search", params=params)
+    
+    def search_local(
+        self,
+        query: str,
+        search_types: List[str] = ("track", "album", "artist"),
+        limit: int = 20,
+        fallback: bool = True,
+        market: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Search the tracks, albums and artists fetched so far, falling back
+        to the remote search when nothing local matches.
+        
+        Requires a ``search_index``. Remote results are indexed as well, so
+        a repeated query is answered locally.
+        
+        Args:
+            query: Words and field filters (track:, album:, artist:, genre:,
+                   year:, isrc:), e.g. 'artist:radiohead cre'
+            search_types: Any of "track", "album" and "artist"
+            limit: Maximum number of results per type
+            fallback: Call search() when no requested type has a local match
+                      (never for an empty query, which the API rejects)
+            market: An ISO 3166-1 alpha-2 country code for the remote search
+        
+        Returns:
+            Search response object containing results for each requested type
+        
+        Example:
+            spotify = SpotifyAPI(access_token="...", search_index=LocalSearchIndex())
+            list(spotify.iter_user_saved_tracks())
+            results = spotify.search_local("track:karma pol", ["track"])
+        """
+        local = self._search_index_or_raise().search(query, search_types, limit)
+        if fallback and query.strip() and not any(page["items"] for page in local.values()):
+            return self.search(query, list(search_types), market=market, limit=limit)
+        return self._to_models("/search", local)
+    
+    def _search_index_or_raise(self) -> LocalSearchIndex:
+        if self.search_index is None:
+            raise ValueError("search_local() needs a client created with search_index=LocalSearchIndex()")
+        return self.search_index
 
     # ==================== SHOWS (PODCASTS) ====================
     
@@ -1408,6 +5279,30 @@ class SpotifyAPI:
             params["market"] = market
         return self._make_request("GET", f"/shows/{show_id}", params=params)
     
+    def get_shows(
+        self,
+        show_ids: List[str],
+        market: Optional[str] = None
+    ) -> List[Union[Dict[str, Any], Exception]]:
+        """
+        Get Spotify catalog information for several shows.
+        
+        Replaces the removed GET /shows?ids= endpoint by requesting
+        GET /shows/{id} for each unique ID concurrently.
+        
+        Args:
+            show_ids: List of Spotify IDs for the shows
+            market: An ISO 3166-1 alpha-2 country code
+        
+        Returns:
+            List of Show objects in the same order as show_ids. A lookup that
+            failed holds the raised exception (e.g. SpotifyNotFoundError) instead.
+        
+        Example:
+            shows = spotify.get_shows(["5CfCWKI5pZ28U0uOzXkDHe", "5as3aKmN2k11yfDDDSrvaZ"])
+        """
+        return self._get_several(self.get_show, show_ids, market=market)
+    
     def get_show_episodes(
         self,
         show_id: str,
@@ -1434,6 +5329,32 @@ class SpotifyAPI:
         if market:
             params["market"] = market
         return self._make_request("GET", f"/shows/{show_id}/episodes", params=params)
+    
+    def iter_show_episodes(
+        self,
+        show_id: str,
+        market: Optional[str] = None,
+        parallel: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over all of a show's episodes.
+        
+        Args:
+            show_id: The Spotify ID for the show
+            market: An ISO 3166-1 alpha-2 country code
+            parallel: Fetch the remaining pages concurrently once the total is known
+        
+        Yields:
+            Simplified episode objects
+        
+        Example:
+            for episode in spotify.iter_show_episodes("5CfCWKI5pZ28U0uOzXkDHe"):
+                print(episode["name"])
+        """
+        return self._paginate(
+            lambda offset: self.get_show_episodes(show_id, market=market, limit=self.MAX_PAGE_SIZE, offset=offset),
+            parallel=parallel
+        )
 
     # ==================== EPISODES ====================
     
@@ -1455,6 +5376,30 @@ class SpotifyAPI:
         if market:
             params["market"] = market
         return self._make_request("GET", f"/episodes/{episode_id}", params=params)
+    
+    def get_episodes(
+        self,
+        episode_ids: List[str],
+        market: Optional[str] = None
+    ) -> List[Union[Dict[str, Any], Exception]]:
+        """
+        Get Spotify catalog information for several episodes.
+        
+        Replaces the removed GET /episodes?ids= endpoint by requesting
+        GET /episodes/{id} for each unique ID concurrently.
+        
+        Args:
+            episode_ids: List of Spotify IDs for the episodes
+            market: An ISO 3166-1 alpha-2 country code
+        
+        Returns:
+            List of Episode objects in the same order as episode_ids. A lookup that
+            failed holds the raised exception (e.g. SpotifyNotFoundError) instead.
+        
+        Example:
+            episodes = spotify.get_episodes(["512ojhOuo1ktJprKbVcKyQ", "77o6BIVlYM3msb4MMIL1jH"])
+        """
+        return self._get_several(self.get_episode, episode_ids, market=market)
 
     # ==================== AUDIOBOOKS ====================
     
@@ -1477,6 +5422,30 @@ class SpotifyAPI:
             params["market"] = market
         return self._make_request("GET", f"/audiobooks/{audiobook_id}", params=params)
     
+    def get_audiobooks(
+        self,
+        audiobook_ids: List[str],
+        market: Optional[str] = None
+    ) -> List[Union[Dict[str, Any], Exception]]:
+        """
+        Get Spotify catalog information for several audiobooks.
+        
+        Replaces the removed GET /audiobooks?ids= endpoint by requesting
+        GET /audiobooks/{id} for each unique ID concurrently.
+        
+        Args:
+            audiobook_ids: List of Spotify IDs for the audiobooks
+            market: An ISO 3166-1 alpha-2 country code
+        
+        Returns:
+            List of Audiobook objects in the same order as audiobook_ids. A lookup that
+            failed holds the raised exception (e.g. SpotifyNotFoundError) instead.
+        
+        Example:
+            audiobooks = spotify.get_audiobooks(["7iHfbu1YPACw6oZPAFJtqe", "18yVqkdbdRvS24c0Ilj2ci"])
+        """
+        return self._get_several(self.get_audiobook, audiobook_ids, market=market)
+    
     def get_audiobook_chapters(
         self,
         audiobook_id: str,
@@ -1503,6 +5472,32 @@ class SpotifyAPI:
         if market:
             params["market"] = market
         return self._make_request("GET", f"/audiobooks/{audiobook_id}/chapters", params=params)
+    
+    def iter_audiobook_chapters(
+        self,
+        audiobook_id: str,
+        market: Optional[str] = None,
+        parallel: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over all of an audiobook's chapters.
+        
+        Args:
+            audiobook_id: The Spotify ID for the audiobook
+            market: An ISO 3166-1 alpha-2 country code
+            parallel: Fetch the remaining pages concurrently once the total is known
+        
+        Yields:
+            Simplified chapter objects
+        
+        Example:
+            for chapter in spotify.iter_audiobook_chapters("7iHfbu1YPACw6oZPAFJtqe"):
+                print(chapter["name"])
+        """
+        return self._paginate(
+            lambda offset: self.get_audiobook_chapters(audiobook_id, market=market, limit=self.MAX_PAGE_SIZE, offset=offset),
+            parallel=parallel
+        )
 
     # ==================== CHAPTERS ====================
     
@@ -1524,6 +5519,593 @@ class SpotifyAPI:
         if market:
             params["market"] = market
         return self._make_request("GET", f"/chapters/{chapter_id}", params=params)
+    
+    def get_chapters(
+        self,
+        chapter_ids: List[str],
+        market: Optional[str] = None
+    ) -> List[Union[Dict[str, Any], Exception]]:
+        """
+        Get Spotify catalog information for several chapters.
+        
+        Replaces the removed GET /chapters?ids= endpoint by requesting
+        GET /chapters/{id} for each unique ID concurrently.
+        
+        Args:
+            chapter_ids: List of Spotify IDs for the chapters
+            market: An ISO 3166-1 alpha-2 country code
+        
+        Returns:
+            List of Chapter objects in the same order as chapter_ids. A lookup that
+            failed holds the raised exception (e.g. SpotifyNotFoundError) instead.
+        
+        Example:
+            chapters = spotify.get_chapters(["0D5wENdkdwbqlrHoaJ9g29", "0IsXVP0JmcB2adSE338GkK"])
+        """
+        return self._get_several(self.get_chapter, chapter_ids, market=market)
+
+
+def get_cached_access_token(
+    client_id: Optional[str],
+    client_secret: Optional[str] = None,
+    scope: str = "",
+    store: Optional[TokenStore] = None
+) -> Optional[str]:
+    """
+    Return a valid access token from the shared token store.
+    
+    If the cached token has expired it is renewed (with its refresh token, or
+    via Client Credentials for the empty scope) and written back, so every
+    script on the machine keeps using the same token. Returns None when no
+    token can be obtained without user interaction.
+    
+    Args:
+        client_id: Spotify app client ID
+        client_secret: Spotify app client secret (needed to renew tokens)
+        scope: OAuth scope of the wanted token ("" for Client Credentials)
+        store: Token store (default: FileTokenStore())
+    """
+    if not client_id:
+        return None
+    
+    store = store or FileTokenStore()
+    with build_session() as session:
+        manager = TokenManager(
+            SpotifyCredentials(client_id=client_id, client_secret=client_secret),
+            session,
+            SpotifyAPI.AUTH_URL,
+            background=False,
+            store=store,
+            scope=scope
+        )
+        if manager.adopt_stored_token():
+            return manager.credentials.access_token
+        if not client_secret or (scope and not manager.credentials.refresh_token):
+            return None
+        
+        try:
+            return manager.get_token()
+        except SpotifyAuthError:
+            return None
+
+
+# ==================== ASYNC CLIENT ====================
+
+class AsyncSpotifyAPI(SpotifyAPI):
+    """
+    Asynchronous Spotify Web API Client
+
+    Exposes the same methods as SpotifyAPI, but every endpoint method returns
+    an awaitable. All requests share one pooled httpx.AsyncClient, and at most
+    ``max_concurrency`` requests are in flight at any time.
+
+    Requires the optional ``httpx`` package (pip install httpx).
+
+    Args:
+        client_id: Spotify application client ID
+        client_secret: Spotify application client secret
+        access_token: User access token (for user data endpoints)
+        refresh_token: Refresh token for obtaining new access tokens
+        auto_refresh: Whether to automatically refresh expired tokens
+        max_concurrency: Maximum number of requests in flight (also the
+                         size of the connection pool)
+        **kwargs: Any other SpotifyAPI option (rate_limit, max_retries, ...);
+                  ``transport=TransportConfig(http2=True)`` multiplexes
+                  requests over HTTP/2 (needs ``pip install httpx[http2]``)
+
+    Example:
+        async with AsyncSpotifyAPI(client_id="your_id", client_secret="your_secret") as spotify:
+            album = await spotify.get_album("4aawyAB9vmqN3uQ7FjRGTy")
+            tracks = await asyncio.gather(*(spotify.get_track(i) for i in track_ids))
+    """
+
+    def __init__(
+        self,
+        client_id: Optional[str] = None,
+        client_secret: Optional[str] = None,
+        access_token: Optional[str] = None,
+        refresh_token: Optional[str] = None,
+        auto_refresh: bool = True,
+        max_concurrency: int = 100,
+        **kwargs
+    ):
+        if httpx is None:
+            raise ImportError("AsyncSpotifyAPI requires httpx (pip install httpx)")
+
+        # Client credentials are minted lazily on the first request so that
+        # constructing the client never blocks the event loop.
+        super().__init__(
+            access_token=access_token,
+            refresh_token=refresh_token,
+            auto_refresh=auto_refresh,
+            **kwargs
+        )
+        self.credentials.client_id = client_id
+        self.credentials.client_secret = client_secret
+
+        self.max_concurrency = max_concurrency
+        self.client = httpx.AsyncClient(**self.transport.httpx_options(max_concurrency))
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._token_lock = asyncio.Lock()
+        self._async_flights: Dict[str, "asyncio.Future"] = {}
+
+    async def __aenter__(self) -> "AsyncSpotifyAPI":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the underlying connection pools."""
+        await self.client.aclose()
+        self.close()
+
+    async def _get_async_headers(self) -> Dict[str, str]:
+        """Get request headers, renewing the token off the event loop if needed."""
+        if self.token_manager.needs_refresh():
+            async with self._token_lock:
+                # Another task may have renewed the token while we waited
+                if self.token_manager.needs_refresh():
+                    await asyncio.to_thread(self.token_manager.get_token)
+
+        return self._get_headers()
+
+    async def _make_request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        data: Optional[Dict] = None,
+        json_data: Optional[Dict] = None
+    ) -> Dict[str, Any]:
+        """Make an API request, sharing identical in-flight GETs between tasks."""
+        if method != "GET" or not self.coalesce:
+            return self._to_models(endpoint, await self._perform_request(method, endpoint, params, data, json_data))
+
+        key = _flight_key(endpoint, params)
+        while True:
+            future = self._async_flights.get(key)
+            if future is None:
+                future = self._async_flights[key] = asyncio.get_running_loop().create_future()
+                try:
+                    result = await self._perform_request(method, endpoint, params)
+                except Exception as e:
+                    future.set_exception(e)
+                    # Mark it retrieved; there may be no waiters
+                    future.exception()
+                    raise
+                except BaseException:
+                    # Cancelled leader: waiters start over instead of being cancelled too
+                    future.cancel()
+                    raise
+                else:
+                    future.set_result(result)
+                finally:
+                    del self._async_flights[key]
+                return self._to_models(endpoint, result)
+
+            event = RequestEvent(method, endpoint_template(endpoint), coalesced=True) if self.hooks else None
+            try:
+                result = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if future.cancelled():
+                    continue
+                raise
+            except Exception as e:
+                self._emit(event, None, error=e)
+                raise
+            self._emit(event, None)
+            return self._to_models(endpoint, result)
+
+    async def _perform_request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        data: Optional[Dict] = None,
+        json_data: Optional[Dict] = None
+    ) -> Dict[str, Any]:
+        """Send one request (or serve it from the cache) and return the decoded body."""
+        event = RequestEvent(method, endpoint_template(endpoint)) if self.hooks else None
+        cache_key, entry = self._cache_lookup(method, endpoint, params)
+        if entry is not None and entry.is_fresh():
+            self._emit(event, cache_key)
+            return entry.value
+
+        response = None
+        try:
+            url = f"{self.BASE_URL}{endpoint}"
+            headers = await self._get_async_headers()
+
+            # Remove Content-Type for GET requests
+            if method == "GET":
+                headers.pop("Content-Type", None)
+            if entry is not None:
+                headers["If-None-Match"] = entry.etag
+
+            response = await self._send(
+                method,
+                url,
+                event=event,
+                headers=headers,
+                params=params,
+                data=data,
+                json=json_data
+            )
+            result = self._cache_response(response, endpoint, cache_key, entry)
+        except Exception as e:
+            self._emit(event, cache_key, response, e)
+            raise
+
+        self._emit(event, cache_key, response)
+        if self.search_index is not None and method == "GET":
+            self.search_index.index_response(endpoint, result)
+        return result
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        event: Optional[RequestEvent] = None,
+        **kwargs
+    ) -> Any:
+        """Asynchronous variant of SpotifyAPI._send on the pooled httpx client."""
+        attempt = 0
+        reauthorized = False
+        while True:
+            waited = await self.rate_limiter.acquire_async()
+            if event is not None:
+                event.rate_limit_wait += waited
+            try:
+                async with self._semaphore:
+                    response = await self.client.request(method, url, **kwargs)
+            except httpx.TransportError:
+                delay = self._retry_delay(method, attempt)
+                if delay is None:
+                    raise
+            else:
+                if response.status_code == 401 and not reauthorized:
+                    reauthorized = await asyncio.to_thread(self._reauthorize, kwargs.get("headers"))
+                    if reauthorized:
+                        if event is not None:
+                            event.retries += 1
+                        continue
+                delay = self._retry_delay(method, attempt, response)
+                if delay is None:
+                    return response
+
+            await asyncio.sleep(delay)
+            attempt += 1
+            if event is not None:
+                event.retries += 1
+
+    async def _get_several(
+        self,
+        fetch: Callable[..., Any],
+        ids: List[str],
+        **kwargs
+    ) -> List[Union[Dict[str, Any], Exception]]:
+        """Fetch several resources concurrently on the event loop (see SpotifyAPI._get_several)."""
+        unique_ids = list(dict.fromkeys(ids))
+        results = await asyncio.gather(
+            *(fetch(item_id, **kwargs) for item_id in unique_ids),
+            return_exceptions=True
+        )
+        results = dict(zip(unique_ids, results))
+
+        return [results[item_id] for item_id in ids]
+
+    async def _paginate(
+        self,
+        fetch_page: Callable[[int], Any],
+        container: Optional[str] = None,
+        parallel: bool = False
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Asynchronous variant of SpotifyAPI._paginate; use with ``async for``."""
+        async for _, page in self.iter_pages(fetch_page, container=container, parallel=parallel):
+            for item in page.get("items") or []:
+                yield item
+
+    async def iter_pages(
+        self,
+        fetch_page: Callable[[Union[int, str, None]], Any],
+        start: Union[int, str, None] = 0,
+        container: Optional[str] = None,
+        parallel: bool = False,
+        max_workers: Optional[int] = None
+    ) -> AsyncIterator[Tuple[Union[int, str, None], Dict[str, Any]]]:
+        """Asynchronous variant of SpotifyAPI.iter_pages (window of max_concurrency pages)."""
+        async def fetch(position: Union[int, str, None]) -> Dict[str, Any]:
+            page = await fetch_page(position)
+            return (page.get(container) or {}) if container and page else page
+
+        page = await fetch(start)
+        offset = start if isinstance(start, int) else 0
+        if parallel and page and "total" in page:
+            async for position, page in self._paginate_parallel(
+                fetch, page, offset, max_workers or self.max_concurrency
+            ):
+                yield position, page
+            return
+
+        while page:
+            offset += len(page.get("items") or [])
+            yield (page.get("cursors") or {}).get("after") if "cursors" in page else offset, page
+
+            next_url = page.get("next")
+            if not next_url:
+                return
+            page = await self._make_request("GET", *self._split_next_url(next_url))
+            if container:
+                page = page.get(container) or {}
+
+    async def _paginate_parallel(
+        self,
+        fetch_page: Callable[[int], Any],
+        first_page: Dict[str, Any],
+        offset: int,
+        max_workers: int
+    ) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        """Asynchronous variant of SpotifyAPI._paginate_parallel."""
+        offset = first_page.get("offset", offset)
+        page_size = first_page.get("limit") or len(first_page.get("items") or [])
+        yield offset + len(first_page.get("items") or []), first_page
+
+        total = first_page.get("total") or 0
+        if not page_size:
+            return
+        offsets = iter(range(offset + page_size, total, page_size))
+
+        pending = deque(
+            (page_offset, asyncio.ensure_future(fetch_page(page_offset)))
+            for page_offset in islice(offsets, max_workers)
+        )
+        try:
+            while pending:
+                page_offset, task = pending.popleft()
+                page = await task
+                for next_offset in islice(offsets, 1):
+                    pending.append((next_offset, asyncio.ensure_future(fetch_page(next_offset))))
+                yield page_offset + len(page.get("items") or []), page
+        finally:
+            for _, task in pending:
+                task.cancel()
+
+    async def sync_playlist(self, playlist_id: str, store: PlaylistStore) -> PlaylistDiff:
+        """Asynchronous variant of SpotifyAPI.sync_playlist."""
+        stored = store.load(playlist_id)
+        playlist = await self.get_playlist(playlist_id, fields="snapshot_id")
+        snapshot_id = playlist.get("snapshot_id")
+        if stored and snapshot_id and snapshot_id == stored.get("snapshot_id"):
+            return PlaylistDiff(playlist_id, snapshot_id, snapshot_id)
+
+        with self.untyped():
+            items = [item async for item in self.iter_playlist_items(playlist_id, parallel=True)]
+        return self._sync_playlist_items(playlist_id, store, stored, snapshot_id, lambda: items)
+
+    async def _map_chunks(self, func: Callable[[List[str]], Any], chunks: List[List[str]]) -> List[Any]:
+        """Run ``func`` on every chunk concurrently on the event loop, keeping order."""
+        return list(await asyncio.gather(*(func(chunk) for chunk in chunks)))
+
+    async def bulk_save_to_library(
+        self,
+        ids: List[str],
+        item_type: str,
+        skip_known: bool = True
+    ) -> List[str]:
+        """Asynchronous variant of SpotifyAPI.bulk_save_to_library."""
+        pending = self._library_writes(ids, item_type, True, skip_known)
+
+        async def save(chunk: List[str]) -> None:
+            await self.save_to_library(chunk, item_type)
+            self.library_membership.update(item_type, chunk, True)
+
+        await self._map_chunks(save, _chunked(pending, self.MAX_LIBRARY_IDS))
+        return pending
+
+    async def bulk_remove_from_library(
+        self,
+        ids: List[str],
+        item_type: str,
+        skip_known: bool = True
+    ) -> List[str]:
+        """Asynchronous variant of SpotifyAPI.bulk_remove_from_library."""
+        pending = self._library_writes(ids, item_type, False, skip_known)
+
+        async def remove(chunk: List[str]) -> None:
+            await self.remove_from_library(chunk, item_type)
+            self.library_membership.update(item_type, chunk, False)
+
+        await self._map_chunks(remove, _chunked(pending, self.MAX_LIBRARY_IDS))
+        return pending
+
+    async def bulk_check_saved_items(
+        self,
+        ids: List[str],
+        item_type: str,
+        use_known: bool = True
+    ) -> List[bool]:
+        """Asynchronous variant of SpotifyAPI.bulk_check_saved_items."""
+        unique_ids = list(dict.fromkeys(ids))
+        known = self.library_membership.known(item_type, unique_ids) if use_known else {}
+        chunks = _chunked([i for i in unique_ids if i not in known], self.MAX_LIBRARY_IDS)
+
+        async def check(chunk: List[str]) -> List[bool]:
+            saved = await self.check_saved_items(chunk, item_type)
+            self.library_membership.update(item_type, chunk, saved)
+            return saved
+
+        for chunk, saved in zip(chunks, await self._map_chunks(check, chunks)):
+            known.update(zip(chunk, saved))
+        return [known[item_id] for item_id in ids]
+
+    async def _write_playlist(
+        self,
+        playlist_id: str,
+        method: str,
+        body: Dict[str, Any],
+        snapshot_id: Optional[str]
+    ) -> Optional[str]:
+        """Asynchronous variant of SpotifyAPI._write_playlist."""
+        if snapshot_id:
+            body = dict(body, snapshot_id=snapshot_id)
+        attempt = 0
+        while True:
+            try:
+                result = await self._make_request(method, f"/playlists/{playlist_id}/items", json_data=body)
+                return (result or {}).get("snapshot_id")
+            except (SpotifyError, httpx.TransportError) as e:
+                if not snapshot_id or not self._write_may_retry(method, e, attempt):
+                    raise
+            current = (await self.get_playlist(playlist_id, fields="snapshot_id")).get("snapshot_id")
+            if current != snapshot_id:
+                if await self._add_applied(playlist_id, body["uris"], body.get("position")):
+                    return current
+                # Another edit changed the snapshot; chain the resend on it
+                snapshot_id = current
+                body = dict(body, snapshot_id=current)
+            await asyncio.sleep(self.retry_policy.backoff(attempt))
+            attempt += 1
+
+    async def _add_applied(self, playlist_id: str, uris: List[str], position: Optional[int]) -> bool:
+        """Asynchronous variant of SpotifyAPI._add_applied."""
+        with self.untyped():
+            first = await self.get_playlist_items(playlist_id, limit=1, projection="ids_only")
+            start, end = self._add_window(position, len(uris), first.get("total") or 0)
+            window: List[Optional[str]] = []
+            for offset in range(start, end, self.MAX_PLAYLIST_PAGE_SIZE):
+                page = await self.get_playlist_items(
+                    playlist_id,
+                    limit=self.MAX_PLAYLIST_PAGE_SIZE,
+                    offset=offset,
+                    projection="ids_only"
+                )
+                window.extend(_item_uri(item) for item in page.get("items") or [])
+                if not page.get("next"):
+                    break
+        return _contains_run(window, list(uris))
+
+    async def execute_playlist_plan(
+        self,
+        playlist_id: str,
+        plan: PlaylistWritePlan,
+        snapshot_id: Optional[str] = None
+    ) -> PlaylistWritePlan:
+        """Asynchronous variant of SpotifyAPI.execute_playlist_plan."""
+        for method, body in plan.steps:
+            snapshot_id = await self._write_playlist(playlist_id, method, body, snapshot_id)
+        plan.snapshot_id = snapshot_id
+        return plan
+
+    async def _current_playlist_uris(self, playlist_id: str) -> Tuple[Optional[str], List[str]]:
+        with self.untyped():
+            snapshot_id = (await self.get_playlist(playlist_id, fields="snapshot_id")).get("snapshot_id")
+            items = self.iter_playlist_items(playlist_id, parallel=True, projection="ids_only")
+            return snapshot_id, [_item_uri(item) async for item in items]
+
+    async def replace_playlist_contents(self, playlist_id: str, uris: List[str]) -> PlaylistWritePlan:
+        """Asynchronous variant of SpotifyAPI.replace_playlist_contents."""
+        snapshot_id, current = await self._current_playlist_uris(playlist_id)
+        plan = plan_playlist_replace(current, list(uris))
+        if not plan.steps:
+            plan.snapshot_id = snapshot_id
+            return plan
+        return await self.execute_playlist_plan(playlist_id, plan, snapshot_id)
+
+    async def bulk_add(
+        self,
+        playlist_id: str,
+        uris: List[str],
+        position: Optional[int] = None
+    ) -> PlaylistWritePlan:
+        """Asynchronous variant of SpotifyAPI.bulk_add."""
+        snapshot_id = (await self.get_playlist(playlist_id, fields="snapshot_id")).get("snapshot_id")
+        return await self.execute_playlist_plan(playlist_id, plan_playlist_add(list(uris), position), snapshot_id)
+
+    async def bulk_remove(self, playlist_id: str, uris: List[str]) -> PlaylistWritePlan:
+        """Asynchronous variant of SpotifyAPI.bulk_remove."""
+        snapshot_id = (await self.get_playlist(playlist_id, fields="snapshot_id")).get("snapshot_id")
+        return await self.execute_playlist_plan(playlist_id, plan_playlist_remove(list(uris)), snapshot_id)
+
+    async def reorder_playlist(
+        self,
+        playlist_id: str,
+        uris: List[str],
+        preserve_added_at: bool = False
+    ) -> PlaylistWritePlan:
+        """Asynchronous variant of SpotifyAPI.reorder_playlist."""
+        snapshot_id, current = await self._current_playlist_uris(playlist_id)
+        plan = plan_playlist_reorder(current, _with_unavailable(current, uris), preserve_added_at)
+        return await self.execute_playlist_plan(playlist_id, plan, snapshot_id)
+
+    async def sort_playlist(
+        self,
+        playlist_id: str,
+        key: Callable[[Dict[str, Any]], Any],
+        reverse: bool = False,
+        preserve_added_at: bool = False
+    ) -> PlaylistWritePlan:
+        """Asynchronous variant of SpotifyAPI.sort_playlist."""
+        with self.untyped():
+            snapshot_id = (await self.get_playlist(playlist_id, fields="snapshot_id")).get("snapshot_id")
+            items = [item async for item in self.iter_playlist_items(playlist_id, parallel=True)]
+        current, target = _sort_targets(items, key, reverse)
+        plan = plan_playlist_reorder(current, target, preserve_added_at)
+        return await self.execute_playlist_plan(playlist_id, plan, snapshot_id)
+
+    async def search_local(
+        self,
+        query: str,
+        search_types: List[str] = ("track", "album", "artist"),
+        limit: int = 20,
+        fallback: bool = True,
+        market: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Asynchronous variant of SpotifyAPI.search_local."""
+        local = self._search_index_or_raise().search(query, search_types, limit)
+        if fallback and query.strip() and not any(page["items"] for page in local.values()):
+            return await self.search(query, list(search_types), market=market, limit=limit)
+        return self._to_models("/search", local)
+
+    async def upload_playlist_cover_image(
+        self,
+        playlist_id: str,
+        image_data: str
+    ) -> Dict[str, Any]:
+        """
+        Replace the image used to represent a specific playlist.
+
+        Args:
+            playlist_id: The Spotify ID for the playlist
+            image_data: Base64 encoded JPEG image data (max 256KB)
+        """
+        headers = await self._get_async_headers()
+        headers["Content-Type"] = "image/jpeg"
+
+        url = f"{self.BASE_URL}/playlists/{playlist_id}/images"
+        response = await self._send("PUT", url, headers=headers, content=image_data)
+
+        return self._handle_response(response)
 
 
 # ==================== DEPRECATED/REMOVED ENDPOINTS DOCUMENTATION ====================
@@ -1588,36 +6170,43 @@ REMOVED ENDPOINTS:
     OLD: GET /albums?ids=...
     STATUS: Removed February 2026
     ALTERNATIVE: Make individual requests to GET /albums/{id}
+                 (SpotifyAPI.get_albums does this concurrently)
 
 11. Get Several Artists (Batch)
     OLD: GET /artists?ids=...
     STATUS: Removed February 2026
     ALTERNATIVE: Make individual requests to GET /artists/{id}
+                 (SpotifyAPI.get_artists does this concurrently)
 
 12. Get Several Tracks (Batch)
     OLD: GET /tracks?ids=...
     STATUS: Removed February 2026
     ALTERNATIVE: Make individual requests to GET /tracks/{id}
+                 (SpotifyAPI.get_tracks does this concurrently)
 
 13. Get Several Shows (Batch)
     OLD: GET /shows?ids=...
     STATUS: Removed February 2026
     ALTERNATIVE: Make individual requests to GET /shows/{id}
+                 (SpotifyAPI.get_shows does this concurrently)
 
 14. Get Several Episodes (Batch)
     OLD: GET /episodes?ids=...
     STATUS: Removed February 2026
     ALTERNATIVE: Make individual requests to GET /episodes/{id}
+                 (SpotifyAPI.get_episodes does this concurrently)
 
 15. Get Several Audiobooks (Batch)
     OLD: GET /audiobooks?ids=...
     STATUS: Removed February 2026
     ALTERNATIVE: Make individual requests to GET /audiobooks/{id}
+                 (SpotifyAPI.get_audiobooks does this concurrently)
 
 16. Get Several Chapters (Batch)
     OLD: GET /chapters?ids=...
     STATUS: Removed February 2026
     ALTERNATIVE: Make individual requests to GET /chapters/{id}
+                 (SpotifyAPI.get_chapters does this concurrently)
 
 17. Get Several Categories (Batch)
     OLD: GET /browse/categories?ids=...